@@ -0,0 +1,293 @@
+"""
+Vectorized sales analytics for the manager dashboard.
+
+load_sales_columns() reads order lines and completed services into a
+SalesColumns (one NumPy array per column, one element per line / service)
+and the functions below aggregate it with bincount group-bys instead of
+Python loops, so a million rows take milliseconds, not seconds (see
+benchmarks/analytics_benchmark.py).
+
+Times are seconds since 1970-01-01 on the shop's wall clock (what the
+database stores), so days are local days; weeks start on Monday. Amounts
+are integer cents. Services have product_id -1, order_id 0 and payment -1;
+unknown products / customers are 0.
+
+NumPy is only needed here: import this module when the numbers are asked
+for, not at startup (benchmarks/import_budget.py checks that).
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from database import get_connection, instrumented
+
+analytics_config = {
+    "batch_size": 50000
+}
+
+SECONDS_PER_DAY = 86400
+
+LINES_QUERY = """
+    SELECT o.order_date, COALESCE(l.product_id, 0), COALESCE(o.customer_id, 0), l.quantity,
+           CAST(ROUND(l.line_total * 100) AS SIGNED), COALESCE(o.payment_method, ''), o.order_id
+    FROM order_lines l
+    JOIN orders o ON o.order_id = l.order_id
+"""
+
+SERVICES_QUERY = """
+    SELECT completed_at, COALESCE(customer_id, 0), CAST(ROUND(price * 100) AS SIGNED)
+    FROM completed_services
+"""
+
+
+class SalesColumns:
+    """Parallel column arrays; payment indexes payment_methods"""
+
+    def __init__(self, when, product_id, customer_id, quantity, cents, payment, order_id, payment_methods):
+        self.when = when
+        self.product_id = product_id
+        self.customer_id = customer_id
+        self.quantity = quantity
+        self.cents = cents
+        self.payment = payment
+        self.order_id = order_id
+        self.payment_methods = payment_methods
+        self._order_rows = None
+
+    def __len__(self):
+        return len(self.when)
+
+    @property
+    def is_service(self):
+        return self.product_id < 0
+
+    @property
+    def order_rows(self):
+        """Index of one row (line) per order"""
+        if self._order_rows is None:
+            sales = np.flatnonzero(self.order_id > 0)
+            _, first = np.unique(self.order_id[sales], return_index=True)
+            self._order_rows = sales[first]
+        return self._order_rows
+
+
+def _empty_columns():
+    empty = np.zeros(0, dtype=np.int64)
+    return SalesColumns(empty, empty, empty, empty, empty, empty, empty, [])
+
+
+def _fetch_columns(cursor, batch_size):
+    """Yields each fetchmany batch transposed into column tuples"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield list(zip(*rows))
+
+
+def _epoch_seconds(values):
+    return np.array(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def _date_range(column, start, end):
+    where, params = [], []
+    if start is not None:
+        where.append(f"{column} >= %s")
+        params.append(start)
+    if end is not None:
+        where.append(f"{column} < %s")
+        params.append(end)
+    return (" WHERE " + " AND ".join(where) if where else ""), params
+
+
+@instrumented
+def load_sales_columns(start=None, end=None, include_services=True):
+    """Order lines (and completed services) dated in [start, end) as SalesColumns"""
+    batch_size = analytics_config["batch_size"]
+    parts = {name: [] for name in ("when", "product_id", "customer_id", "quantity", "cents", "payment", "order_id")}
+    methods = {}
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        where, params = _date_range("o.order_date", start, end)
+        cursor.execute(LINES_QUERY + where, params)
+        for when, product_id, customer_id, quantity, cents, payment, order_id in _fetch_columns(cursor, batch_size):
+            parts["when"].append(_epoch_seconds(when))
+            parts["product_id"].append(np.array(product_id, dtype=np.int64))
+            parts["customer_id"].append(np.array(customer_id, dtype=np.int64))
+            parts["quantity"].append(np.array(quantity, dtype=np.int64))
+            parts["cents"].append(np.array(cents, dtype=np.int64))
+            parts["payment"].append(np.array([methods.setdefault(m, len(methods)) for m in payment], dtype=np.int64))
+            parts["order_id"].append(np.array(order_id, dtype=np.int64))
+
+        if include_services:
+            where, params = _date_range("completed_at", start, end)
+            cursor.execute(SERVICES_QUERY + where, params)
+            for when, customer_id, cents in _fetch_columns(cursor, batch_size):
+                n = len(when)
+                parts["when"].append(_epoch_seconds(when))
+                parts["product_id"].append(np.full(n, -1, dtype=np.int64))
+                parts["customer_id"].append(np.array(customer_id, dtype=np.int64))
+                parts["quantity"].append(np.ones(n, dtype=np.int64))
+                parts["cents"].append(np.array(cents, dtype=np.int64))
+                parts["payment"].append(np.full(n, -1, dtype=np.int64))
+                parts["order_id"].append(np.zeros(n, dtype=np.int64))
+    finally:
+        if conn:
+            conn.close()
+
+    if not parts["when"]:
+        return _empty_columns()
+    columns = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+    return SalesColumns(payment_methods=list(methods), **columns)
+
+
+# --- GROUP-BYS ---
+def _period_keys(when, period):
+    """Integer period number of each timestamp: days, Monday weeks or months since 1970"""
+    days = when // SECONDS_PER_DAY
+    if period == "day":
+        return days
+    if period == "week":
+        return (days + 3) // 7  # 1970-01-01 was a Thursday
+    if period == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def _period_starts(keys, period):
+    if period == "day":
+        return keys.astype("datetime64[D]")
+    if period == "week":
+        return (keys * 7 - 3).astype("datetime64[D]")
+    return keys.astype("datetime64[M]").astype("datetime64[D]")
+
+
+def totals_by_period(columns, period="day"):
+    """
+    Returns (period start dates as datetime64[D], revenue cents, product units)
+    for every period from the first to the last sale, empty periods included
+    """
+    if not len(columns):
+        return np.zeros(0, dtype="datetime64[D]"), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keys = _period_keys(columns.when, period)
+    first = keys.min()
+    index = keys - first
+    size = int(index.max()) + 1
+    revenue = np.bincount(index, weights=columns.cents, minlength=size)
+    units = np.bincount(index, weights=np.where(columns.is_service, 0, columns.quantity), minlength=size)
+    starts = _period_starts(np.arange(first, first + size), period)
+    return starts, np.rint(revenue).astype(np.int64), np.rint(units).astype(np.int64)
+
+
+def moving_average(values, window):
+    """Trailing mean over window periods; NaN until there are window values"""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        result[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+def _top(scores, n):
+    """Indexes of the n largest positive scores, largest first"""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > n:
+        candidates = candidates[np.argpartition(-scores[candidates], n - 1)[:n]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def top_products(columns, n=10, by="revenue"):
+    """[(product_id, revenue cents, units)] of the n best-selling products by revenue or units"""
+    sold = columns.product_id > 0
+    ids = columns.product_id[sold]
+    if not len(ids):
+        return []
+    revenue = np.bincount(ids, weights=columns.cents[sold])
+    units = np.bincount(ids, weights=columns.quantity[sold])
+    return [(int(i), int(round(revenue[i])), int(units[i])) for i in _top(units if by == "units" else revenue, n)]
+
+
+def top_customers(columns, n=10):
+    """[(customer_id, revenue cents, orders, services)] of the n customers who spent the most"""
+    known = columns.customer_id > 0
+    ids = columns.customer_id[known]
+    if not len(ids):
+        return []
+    size = int(ids.max()) + 1
+    revenue = np.bincount(ids, weights=columns.cents[known], minlength=size)
+    services = np.bincount(ids, weights=columns.is_service[known], minlength=size)
+    order_customers = columns.customer_id[columns.order_rows]
+    orders = np.bincount(order_customers[order_customers > 0], minlength=size)
+    return [(int(i), int(round(revenue[i])), int(orders[i]), int(services[i])) for i in _top(revenue, n)]
+
+
+def payment_mix(columns):
+    """[(payment method, revenue cents, orders, share of product revenue)], largest first"""
+    sales = columns.payment >= 0
+    if not sales.any():
+        return []
+    size = len(columns.payment_methods)
+    revenue = np.bincount(columns.payment[sales], weights=columns.cents[sales], minlength=size)
+    orders = np.bincount(columns.payment[columns.order_rows], minlength=size)
+    total = revenue.sum()
+    return [(columns.payment_methods[i] or "Unknown", int(round(revenue[i])), int(orders[i]),
+             float(revenue[i] / total) if total else 0.0)
+            for i in np.argsort(-revenue, kind="stable")]
+
+
+# --- DASHBOARD ---
+def _names(cursor, query, ids):
+    if not ids:
+        return {}
+    cursor.execute(query.format(", ".join(["%s"] * len(ids))), ids)
+    return dict(cursor.fetchall())
+
+
+def _pesos(cents):
+    return cents / 100
+
+
+@instrumented
+def get_dashboard_trends(days=365, top_n=10, window=7, today=None):
+    """
+    Trends over the last days days for the manager dashboard: daily totals with
+    a window-day moving average, weekly and monthly totals, top products and
+    customers, payment-method mix. Amounts are in pesos.
+    """
+    columns = load_sales_columns(start=(today or date.today()) - timedelta(days=days - 1))
+
+    periods = {}
+    for period in ("day", "week", "month"):
+        starts, revenue, units = totals_by_period(columns, period)
+        average = moving_average(revenue, window) if period == "day" else np.full(len(revenue), np.nan)
+        periods[period] = [(start, _pesos(int(r)), int(u), None if np.isnan(a) else _pesos(a))
+                           for start, r, u, a in zip(starts.astype(object), revenue, units, average)]
+
+    products = top_products(columns, top_n)
+    customers = top_customers(columns, top_n)
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        product_names = _names(cursor, "SELECT product_id, name FROM products WHERE product_id IN ({})",
+                               [pid for pid, _, _ in products])
+        customer_names = _names(cursor, "SELECT user_id, full_name FROM users WHERE user_id IN ({})",
+                                [cid for cid, _, _, _ in customers])
+    finally:
+        if conn:
+            conn.close()
+
+    return {
+        "rows": len(columns),
+        "daily": periods["day"],
+        "weekly": periods["week"],
+        "monthly": periods["month"],
+        "top_products": [(product_names.get(pid, f"#{pid}"), _pesos(cents), units) for pid, cents, units in products],
+        "top_customers": [(customer_names.get(cid, f"#{cid}"), _pesos(cents), orders, services)
+                          for cid, cents, orders, services in customers],
+        "payment_mix": [(method, _pesos(cents), orders, share)
+                        for method, cents, orders, share in payment_mix(columns)],
+    }
@@ -0,0 +1,123 @@
+"""
+Password hashing service.
+
+bcrypt runs on a small dedicated thread pool (bcrypt releases the GIL), so
+concurrent logins are bounded to auth_config["workers"] hashes at a time
+instead of oversubscribing the CPU, and the calling thread only waits.
+The bcrypt cost is calibrated once per process to take about target_ms on
+this machine (never below min_rounds); stored hashes with another cost are
+rehashed in the background after a successful login.
+"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+auth_config = {
+    "workers": 2,
+    "target_ms": 250.0,
+    "min_rounds": 10,
+    "max_rounds": 15,
+    "calibration_rounds": 10
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_calibration_lock = threading.Lock()
+_calibration = None  # Future -> rounds
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=auth_config["workers"], thread_name_prefix="auth")
+    return _executor
+
+
+def _calibrate():
+    probe = auth_config["calibration_rounds"]
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=probe))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    # Each extra round doubles the work
+    rounds = probe + round(math.log2(auth_config["target_ms"] / max(elapsed_ms, 0.001)))
+    return max(auth_config["min_rounds"], min(auth_config["max_rounds"], rounds))
+
+
+def start_calibration():
+    """Measures the bcrypt cost for target_ms in the background (idempotent)"""
+    global _calibration
+    with _calibration_lock:
+        if _calibration is None:
+            _calibration = _get_executor().submit(_calibrate)
+    return _calibration
+
+
+def target_rounds():
+    """bcrypt cost used for new hashes; waits for calibration if it is still running"""
+    try:
+        return start_calibration().result()
+    except Exception as e:
+        print("Auth Calibration Error:", e)
+        return auth_config["min_rounds"]
+
+
+def hash_rounds(hashed):
+    """Cost factor of a stored bcrypt hash ("$2b$12$..." -> 12), or None"""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    return hash_rounds(hashed) != target_rounds()
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _verify(password, hashed):
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def hash_password(password, rounds=None):
+    """Hashes on the auth pool with the calibrated cost"""
+    rounds = rounds or target_rounds()
+    return _get_executor().submit(_hash, password, rounds).result()
+
+
+def verify_password(password, hashed):
+    """Checks a password on the auth pool"""
+    return _get_executor().submit(_verify, password, hashed).result()
+
+
+def rehash_later(password, store):
+    """
+    Hashes password with the calibrated cost on the auth pool without waiting,
+    then calls store(new_hash) there. (Pool tasks must not wait on other pool
+    tasks, so the cost is resolved here on the calling thread.)
+    """
+    rounds = target_rounds()
+
+    def rehash():
+        try:
+            store(_hash(password, rounds))
+        except Exception as e:
+            print("Rehash Error:", e)
+
+    return _get_executor().submit(rehash)
+
+
+def shutdown():
+    global _executor, _calibration
+    with _calibration_lock, _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+            _calibration = None
@@ -0,0 +1,140 @@
+"""
+Sales analytics throughput.
+
+Builds --rows seeded synthetic sales rows (order lines over --days days, a
+--services fraction of completed services) as analytics.SalesColumns and
+times every dashboard aggregate on them (best of --repeat). Fails (exit 1)
+when the whole set takes longer than --budget-ms:
+
+    python benchmarks/analytics_benchmark.py --rows 1000000
+    python benchmarks/analytics_benchmark.py --rows 1000000 --baseline --json analytics.json
+
+With --from-db the rows are loaded from a database filled by
+synthetic_data.py instead, and the load time is reported separately:
+
+    python benchmarks/analytics_benchmark.py --from-db --engine sqlite --path bench.db
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analytics
+import database
+import synthetic_data
+
+PAYMENT_METHODS = ["Cash", "Bank Transfer"]
+
+
+def synthetic_columns(rows, days, services, products=100_000, customers=50_000, seed=7):
+    """About 2.5 lines per order; lines of an order share its time, customer and payment method"""
+    rng = np.random.default_rng(seed)
+    start = int(np.datetime64("2024-01-01T00:00:00", "s").astype(np.int64))
+    order = np.arange(rows, dtype=np.int64) * 2 // 5
+    orders = int(order[-1]) + 1 if rows else 0
+    when = (start + rng.integers(0, days * analytics.SECONDS_PER_DAY, orders))[order]
+    customer_id = rng.integers(1, customers + 1, orders)[order]
+    payment = rng.integers(0, len(PAYMENT_METHODS), orders)[order]
+    is_service = rng.random(rows) < services
+    product_id = np.where(is_service, -1, rng.zipf(1.3, rows) % products + 1)
+    quantity = np.where(is_service, 1, rng.integers(1, 5, rows))
+    cents = quantity * rng.integers(12_500, 3_750_000, rows)
+    return analytics.SalesColumns(when, product_id, customer_id, quantity, cents,
+                                  np.where(is_service, -1, payment), np.where(is_service, 0, order + 1),
+                                  list(PAYMENT_METHODS))
+
+
+def python_daily_revenue(rows):
+    """The loop the dashboard would need without analytics: revenue per day from row tuples"""
+    totals = defaultdict(int)
+    for when, cents in rows:
+        totals[when // analytics.SECONDS_PER_DAY] += cents
+    return totals
+
+
+def best_ms(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def fresh(columns):
+    """Copy without the cached per-order index, so every run pays for it"""
+    return analytics.SalesColumns(columns.when, columns.product_id, columns.customer_id, columns.quantity,
+                                  columns.cents, columns.payment, columns.order_id, columns.payment_methods)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    synthetic_data.add_engine_arguments(parser)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--services", type=float, default=0.1, help="fraction of rows that are services")
+    parser.add_argument("--from-db", action="store_true", help="load the rows from the configured database")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="limit for all aggregates together")
+    parser.add_argument("--baseline", action="store_true", help="also time a pure-Python daily revenue loop")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    load_ms = None
+    if args.from_db:
+        synthetic_data.configure_engine(args)
+        start = time.perf_counter()
+        columns = analytics.load_sales_columns()
+        load_ms = (time.perf_counter() - start) * 1000
+        database.close_pool()
+    else:
+        columns = synthetic_columns(args.rows, args.days, args.services)
+
+    cases = {
+        "by_day": lambda c: analytics.totals_by_period(c, "day"),
+        "by_week": lambda c: analytics.totals_by_period(c, "week"),
+        "by_month": lambda c: analytics.totals_by_period(c, "month"),
+        "moving_average_7d": lambda c: analytics.moving_average(analytics.totals_by_period(c, "day")[1], 7),
+        "top_products": lambda c: analytics.top_products(c, 10),
+        "top_customers": lambda c: analytics.top_customers(c, 10),
+        "payment_mix": analytics.payment_mix,
+    }
+
+    def everything():
+        c = fresh(columns)
+        for fn in cases.values():
+            fn(c)
+
+    timings = {name: best_ms(lambda: fn(fresh(columns)), args.repeat) for name, fn in cases.items()}
+    total_ms = best_ms(everything, args.repeat)
+
+    print(f"{len(columns):,} rows" + (f" loaded in {load_ms:.0f} ms" if load_ms is not None else " (synthetic)"))
+    for name, ms in timings.items():
+        print(f"  {name:<20} {ms:8.1f} ms")
+    print(f"  {'all aggregates':<20} {total_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    baseline_ms = None
+    if args.baseline:
+        rows = list(zip(columns.when.tolist(), columns.cents.tolist()))
+        baseline_ms = best_ms(lambda: python_daily_revenue(rows), 1)
+        print(f"  {'python by_day loop':<20} {baseline_ms:8.1f} ms ({baseline_ms / timings['by_day']:.0f}x by_day)")
+
+    over = total_ms > args.budget_ms
+    print("\nOVER BUDGET" if over else "\nwithin budget")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": len(columns), "load_ms": load_ms, "timings_ms": timings, "total_ms": total_ms,
+                       "python_baseline_ms": baseline_ms, "budget_ms": args.budget_ms}, f, indent=2)
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
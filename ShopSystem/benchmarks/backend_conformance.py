@@ -0,0 +1,563 @@
+"""
+Conformance and performance checks for a database backend.
+
+Runs the same checks against either engine through the public database.py
+functions, and times each one:
+
+    python benchmarks/backend_conformance.py --engine sqlite
+    python benchmarks/backend_conformance.py --engine mysql --database shop_conformance
+
+The SQLite run uses a fresh temporary file. The MySQL run drops and
+recreates --database, so never point it at the real shop database.
+Exits with status 1 if any check fails.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics
+import database
+import reports
+import reservations
+import stock_ledger
+
+CHECKS = []
+
+
+def check(fn):
+    CHECKS.append(fn)
+    return fn
+
+
+def expect(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def product(code):
+    return next((p for p in database.get_products() if p[1] == code), None)
+
+
+def cart_item(code, qty):
+    p = product(code)
+    return {"code": p[1], "name": p[2], "price": p[3], "qty": qty}
+
+
+# --- CHECKS (run in order; later checks use data from earlier ones) ---
+@check
+def schema_is_initialized():
+    expect(database.is_schema_current(), "schema_version is behind migrations.LATEST_VERSION")
+    database.initialize_db()  # second run must be a no-op
+    expect(database.is_schema_current(), "second initialize_db() changed the schema version")
+
+
+@check
+def login_and_register():
+    expect(database.check_login("manager", "admin123")[1] == "manager", "default manager can't log in")
+    expect(database.check_login("manager", "wrong") is None, "wrong password accepted")
+    expect(database.register_user("till_a", "pw", "Till A", "a@x.com", "1") == (True, "Success"), "register failed")
+    expect(database.register_user("till_a", "pw", "Till A", "a@x.com", "1")[0] is False, "duplicate username accepted")
+
+
+@check
+def add_and_list_products():
+    database.add_product("K-16", "Kingston Fury 16GB", 3500.50, 10, "RAM", "DDR4")
+    database.add_product("S-980", "Samsung 980 SSD", 4200, 3, "Storage", "")
+    database.add_product("C-RGB", "Corsair RGB Fan", 850, 0, "Cooling", "")
+    try:
+        database.add_product("K-16", "Duplicate", 1, 1, "RAM", "")
+        raise AssertionError("duplicate product code accepted")
+    except Exception as e:
+        expect("already taken" in str(e), f"unexpected duplicate error: {e}")
+
+    codes = [p[1] for p in database.get_products()]
+    expect(codes == sorted(codes) and {"K-16", "S-980", "C-RGB"} <= set(codes), f"get_products: {codes}")
+    expect([p[1] for p in database.get_products("RAM")] == ["K-16"], "category filter")
+    expect([p[1] for p in database.get_products(None, "samsung")] == ["S-980"], "LIKE search")
+    expect(database.get_categories() == ["Cooling", "RAM", "Storage"], "get_categories")
+    p = product("K-16")
+    expect(float(p[3]) == 3500.50 and p[4] == 10, f"price/stock round trip: {p}")
+
+
+@check
+def indexed_search():
+    expect([p[1] for p in database.search_products("fury")] == ["K-16"], "substring search")
+    expect([p[1] for p in database.search_products("kingstn")] == ["K-16"], "typo-tolerant search")
+    expect(database.search_products("fury", "Storage") == [], "search category filter")
+
+
+@check
+def restock():
+    database.restock_product(product("C-RGB")[0], 5)
+    expect(product("C-RGB")[4] == 5, "restock did not add stock")
+
+
+@check
+def checkout():
+    stats_before = database.get_stats()
+    result = database.checkout_cart("user", [cart_item("K-16", 2), cart_item("S-980", 1)], "Cash")
+    expect(result == "Success", f"checkout failed: {result}")
+    expect(product("K-16")[4] == 8 and product("S-980")[4] == 2, "stock not decremented")
+
+    sales = database.get_all_sales()
+    expect(len(sales) == 2 and isinstance(sales[0][0], datetime), f"sales rows: {sales}")
+    expect(len(database.get_user_sales("user")) == 2, "get_user_sales")
+
+    revenue, orders, stock, customers = database.get_stats()
+    expect(float(revenue) - float(stats_before[0]) == 3500.50 * 2 + 4200, f"revenue: {revenue}")
+    expect(orders - stats_before[1] == 2, f"order count: {orders}")
+
+
+@check
+def orders_hold_their_lines():
+    orders = database.get_customer_orders("user")
+    expect(len(orders) == 1 and orders[0][3] == 2 and float(orders[0][5]) == 3500.50 * 2 + 4200,
+           f"checkout did not write one order with two lines: {orders}")
+    order = database.get_order(orders[0][0])
+    expect([(line["name"], line["qty"]) for line in order["lines"]] ==
+           [(product("K-16")[2], 2), (product("S-980")[2], 1)], f"order lines: {order}")
+    expect(database.get_orders_by_day(order["order_date"].date())[0][0] == order["order_id"], "orders by day")
+    expect(len(database.get_orders_by_payment_method("Cash")) == 1, "orders by payment method")
+    expect(database.get_orders_by_payment_method("Bank Transfer") == [], "orders by payment method")
+
+
+@check
+def failed_checkout_changes_nothing():
+    stock = product("S-980")[4]
+    result = database.checkout_cart("user", [cart_item("K-16", 1), cart_item("S-980", stock + 1)], "Cash")
+    expect(result.startswith("Not enough stock"), f"oversized checkout: {result}")
+    expect(product("K-16")[4] == 8 and product("S-980")[4] == stock, "partial checkout was committed")
+
+
+@check
+def concurrent_checkouts_do_not_oversell():
+    database.add_product("LIM-1", "Limited Edition GPU", 999, 5, "GPU", "")
+    item = cart_item("LIM-1", 1)
+    results = []
+
+    def till():
+        results.append(database.checkout_cart("user", [dict(item)], "Cash"))
+
+    threads = [threading.Thread(target=till) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sold = results.count("Success")
+    expect(sold == 5, f"{sold} of 5 units sold: {results}")
+    expect(product("LIM-1")[4] == 0, "stock went negative or wasn't decremented")
+
+
+@check
+def concurrent_multi_sku_checkouts():
+    # Every till buys the same three SKUs, half of them listing the cart in reverse order:
+    # lock ordering by product_id must keep that from deadlocking, and stock must not go below zero
+    codes = ["MULTI-A", "MULTI-B", "MULTI-C"]
+    for code in codes:
+        database.add_product(code, f"Contended {code}", 100, 20, "Multi", "")
+    results, latencies = [], []
+
+    def till(index):
+        cart = [cart_item(code, 1) for code in (codes if index % 2 else reversed(codes))]
+        for _ in range(10):
+            start = time.perf_counter()
+            result = database.checkout_cart("user", [dict(i) for i in cart], "Cash")
+            latencies.append((time.perf_counter() - start) * 1000)
+            results.append(result)
+
+    threads = [threading.Thread(target=till, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    expect(results.count("Success") == 20, f"{results.count('Success')} of 20 carts sold")
+    others = [r for r in results if r != "Success" and not r.startswith("Not enough stock")]
+    expect(not others, f"unexpected checkout failures (deadlock / lock timeout?): {others[:3]}")
+    expect([product(code)[4] for code in codes] == [0, 0, 0], "stock oversold or not decremented")
+    latencies.sort()
+    print(f"    {len(latencies)} checkouts by 8 tills: p50 {latencies[len(latencies) // 2]:.2f} ms, "
+          f"p99 {latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]:.2f} ms")
+
+
+@database.instrumented
+def per_line_checkout(username, cart_items, payment_method):
+    """
+    The checkout loop before batching, kept as a baseline: one locking SELECT,
+    one UPDATE and one INSERT per cart line (plus its stock movement), writing
+    the same order, lines, movements and rollup as checkout_cart
+    """
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id, full_name FROM users WHERE username = %s", (username,))
+        user_id, full_name = cursor.fetchone()
+        total = sum(item['price'] * item['qty'] for item in cart_items)
+        units = sum(item['qty'] for item in cart_items)
+        lines = []
+        for item in cart_items:
+            cursor.execute("SELECT product_id, stock_qty, name FROM products WHERE code = %s FOR UPDATE",
+                           (item['code'],))
+            pid, stock, pname = cursor.fetchone()
+            if stock < item['qty']:
+                raise Exception(f"Not enough stock for {pname}")
+            cursor.execute("UPDATE products SET stock_qty = stock_qty - %s WHERE product_id = %s", (item['qty'], pid))
+            lines.append((pid, pname, item, stock - item['qty']))
+        cursor.execute(
+            "INSERT INTO orders (customer_id, full_name, payment_method, item_count, units, total_amount) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (user_id, full_name, payment_method, len(cart_items), units, total))
+        order_id = cursor.lastrowid
+        for pid, pname, item, balance in lines:
+            cursor.execute(
+                "INSERT INTO order_lines (order_id, product_id, product_name, quantity, unit_price, line_total) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (order_id, pid, pname, item['qty'], item['price'], item['price'] * item['qty']))
+            cursor.execute(
+                "INSERT INTO stock_movements (product_id, delta, balance_after, reason, order_id) "
+                "VALUES (%s, %s, %s, 'sale', %s)",
+                (pid, -item['qty'], balance, order_id))
+        database._add_to_daily_rollup(cursor, revenue=total, orders=len(cart_items), units=units)
+        conn.commit()
+        database.invalidate_catalog_cache()
+        return "Success"
+    except Exception as e:
+        conn.rollback()
+        return str(e)
+    finally:
+        conn.close()
+
+
+@check
+def batched_checkout_vs_per_line():
+    # Both paths on the same carts from 4 concurrent tills: statements per cart and
+    # per-cart latency, and the stock left must match the units sold
+    codes = [f"LINES-{i}" for i in range(20)]
+    for code in codes:
+        database.add_product(code, f"Line Item {code}", 1, 10 ** 6, "Lines", "")
+    paths = {"per-line": per_line_checkout, "batched": database.checkout_cart}
+    names = {"per-line": "per_line_checkout", "batched": "checkout_cart"}
+    sold, statements = 0, {}
+    for size in (1, 5, 20):
+        cart = [cart_item(code, 1) for code in codes[:size]]
+        for path, fn in paths.items():
+            before = database.get_query_stats()["functions"].get(names[path], {"count": 0, "statements": 0})
+            results, latencies = [], []
+
+            def till():
+                for _ in range(10):
+                    start = time.perf_counter()
+                    results.append(fn("user", [dict(i) for i in cart], "Cash"))
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            threads = [threading.Thread(target=till) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            expect(results == ["Success"] * 40, f"{path} checkouts of {size} lines: {set(results)}")
+            sold += 40
+            after = database.get_query_stats()["functions"][names[path]]
+            statements[path, size] = (after["statements"] - before["statements"]) / (after["count"] - before["count"])
+            latencies.sort()
+            print(f"    {path:<8} {size:>2} lines: {statements[path, size]:5.1f} statements/cart, "
+                  f"p50 {latencies[len(latencies) // 2]:6.2f} ms, p99 {latencies[len(latencies) * 99 // 100]:6.2f} ms")
+        expect(product(codes[0])[4] == 10 ** 6 - sold, f"stock after {sold} carts: {product(codes[0])[4]}")
+    expect(statements["batched", 1] == statements["batched", 20], f"batched statements grow with the cart: {statements}")
+    expect(statements["batched", 20] < statements["per-line", 20], f"statements per cart: {statements}")
+
+@check
+def replayed_checkout_charges_once():
+    database.add_product("IDEM-1", "Idempotent PSU", 80, 10, "PSU", "")
+    orders_before = len(database.get_customer_orders("user"))
+    cart = [cart_item("IDEM-1", 2)]
+    results = []
+
+    def till():
+        results.append(database.checkout_cart("user", [dict(i) for i in cart], "Cash", idempotency_key="idem-1"))
+
+    threads = [threading.Thread(target=till) for _ in range(4)]  # double submits racing each other
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.append(database.checkout_cart("user", cart, "Cash", idempotency_key="idem-1"))  # retry after a lost reply
+    expect(results == ["Success"] * 5, f"replays: {results}")
+    expect(product("IDEM-1")[4] == 8, f"stock charged more than once: {product('IDEM-1')[4]}")
+    expect(len(database.get_customer_orders("user")) == orders_before + 1, "replay wrote another order")
+
+
+@check
+def stock_reservations():
+    database.add_product("RES-1", "Reserved SSD", 150, 4, "Storage", "")
+    expect(reservations.reserve("cart-a", "RES-1", 3) == (True, 4), "first hold refused")
+    expect(reservations.reserve("cart-b", "RES-1", 2) == (False, 1), "second hold ignored the first")
+    expect(reservations.get_available_to_sell("RES-1") == 1, "available-to-sell ignores holds")
+    result = database.checkout_cart("user", [cart_item("RES-1", 2)], "Cash")
+    expect(result.startswith("Not enough stock"), f"unreserved checkout took held units: {result}")
+
+    result = database.checkout_cart("user", [cart_item("RES-1", 3)], "Cash", cart_id="cart-a")
+    expect(result == "Success", f"checkout of a held cart failed: {result}")
+    expect(product("RES-1")[4] == 1 and reservations.get_available_to_sell("RES-1") == 1,
+           "checkout did not convert the holds")
+
+    expect(reservations.reserve("cart-c", "RES-1", 1, ttl=1)[0], "hold on the last unit refused")
+    time.sleep(2.1)  # NOW() has one-second resolution
+    expect(reservations.get_available_to_sell("RES-1") == 1, "expired hold still counted")
+    expect(reservations.sweep_expired() == 1, "sweeper did not delete the expired hold")
+
+
+@check
+def stock_ledger_history():
+    movements = stock_ledger.get_stock_movements("K-16")
+    expect([(m[1], m[2], m[3]) for m in movements] == [(-2, 8, "sale"), (10, 10, "opening")],
+           f"K-16 movements: {movements}")
+    expect([m[3] for m in stock_ledger.get_stock_movements("C-RGB")] == ["restock", "opening"], "restock movement")
+
+    stock_ledger.ledger_config["settle_seconds"] = 0
+    try:
+        first = stock_ledger.create_checkpoint()
+        expect(first is not None and not stock_ledger.checkpoint_due(), f"checkpoint: {first}")
+        expect(database.checkout_cart("user", [cart_item("K-16", 1)], "Cash") == "Success", "checkout")
+        now = stock_ledger.get_stock_movements("K-16")[0][0]
+        expect(stock_ledger.get_stock_as_of("K-16", now) == 7, "checkpoint + tail")
+        expect(stock_ledger.get_stock_as_of("K-16", now - timedelta(days=1)) == 0, "stock before the product existed")
+        expect(stock_ledger.create_checkpoint() == first + 1, "second checkpoint")
+        expect(stock_ledger.create_checkpoint() is None, "checkpoint without new movements")
+    finally:
+        stock_ledger.ledger_config["settle_seconds"] = 60
+    expect(stock_ledger.get_category_stock_as_of("RAM", now) == {"K-16": 7}, "category as of")
+    for p in database.get_products():
+        expect(stock_ledger.get_stock_as_of(p[1], now) == p[4], f"ledger disagrees with stock of {p[1]}")
+
+    low = stock_ledger.get_low_stock_products(5)
+    expect([r[1] for r in low] == [p[1] for p in sorted(database.get_products(), key=lambda p: (p[4], p[0]))
+                                   if p[4] <= 5], f"low stock: {low}")
+
+
+@check
+def services_and_history():
+    for i in range(25):
+        database.book_service("user", "Repair", f"job {i}", 100 + i)
+    pending = database.get_all_services_joined()
+    expect(len(pending) >= 25, "book_service")
+    for sid in [s[0] for s in pending][:23]:
+        database.update_service_status(sid, "Completed")
+
+    first = database.get_completed_services_page(limit=10, with_total=True)
+    expect(len(first["rows"]) == 10 and first["next"] and first["prev"] is None, "first page")
+    expect(first["total"] is not None and first["total"] >= 23, f"total: {first['total']}")
+    second = database.get_completed_services_page(first["next"], "next", limit=10)
+    back = database.get_completed_services_page(second["prev"], "prev", limit=10)
+    expect([r[0] for r in back["rows"]] == [r[0] for r in first["rows"]], "prev page differs from first page")
+    everything = database.get_completed_services()
+    expect([r[0] for r in everything[10:20]] == [r[0] for r in second["rows"]], "second page differs from rows 10-20")
+
+
+@check
+def streaming_reads():
+    batches = list(database.iter_all_sales(batch_size=2))
+    expect(all(len(b) <= 2 for b in batches), "batch size not respected")
+    expect(sum(len(b) for b in batches) == len(database.get_all_sales()), "streamed row count")
+    # Stopping early must return the connection to the pool
+    for _ in database.iter_completed_services(batch_size=1):
+        break
+    stats = database.get_pool_stats()
+    expect(stats["in_use"] == 0, f"connection leaked: {stats}")
+
+
+@check
+def reports_match_rollup():
+    revenue, orders, stock, customers = database.get_stats()
+    by_source = dict(reports.get_revenue_by_source())
+    expect(abs(float(by_source["Product Sales"]) + float(by_source["Services"]) - float(revenue)) < 0.01,
+           f"revenue by source {by_source} vs stats {revenue}")
+    before = database.get_stats()
+    database.rebuild_daily_rollup()
+    expect(database.get_stats() == before, "rebuilt rollup differs from incrementally maintained one")
+    activity = reports.get_customer_activity(include_inactive=True)
+    expect(any(name == "Till A" and orders == 0 for name, orders, spent in activity), "inactive customers")
+    stock_by_category = reports.get_stock_by_category()
+    expect(stock_by_category["GPU"]["low_stock"] == 1, f"stock report: {stock_by_category}")
+    low_stock = stock_ledger.get_low_stock_products(5)
+    expect(len(low_stock) == sum(c["low_stock"] for c in stock_by_category.values()),
+           f"low stock products {low_stock} vs stock report {stock_by_category}")
+
+
+@check
+def paged_detail_reports():
+    # Walking the stock and customer pages visits every row of the unpaged reports once
+    seen, after = [], None
+    while True:
+        page = reports.get_stock_page(after=after, limit=3)
+        seen += [row[1] for row in page["rows"]]
+        if page["next"] is None:
+            break
+        after = page["next"]
+    expect(sorted(seen) == sorted(p[1] for p in database.get_products()), f"stock pages: {seen}")
+    expect([r[1] for r in reports.get_stock_page(search="fury")["rows"]] == ["K-16"], "stock page search")
+
+    names, after = [], None
+    first = reports.get_customer_activity_page(limit=2, include_inactive=True, with_total=True)
+    page = first
+    while True:
+        names += [row[0] for row in page["rows"]]
+        if page["next"] is None:
+            break
+        page = reports.get_customer_activity_page(page["next"], limit=2, include_inactive=True)
+    everyone = reports.get_customer_activity(include_inactive=True)
+    expect(names == [row[0] for row in everyone], f"customer pages {names} vs {everyone}")
+    expect(first["total"] == len(everyone), f"customer total: {first['total']}")
+    found = reports.get_customer_activity_page(search="till", include_inactive=True, with_total=True)
+    expect([row[0] for row in found["rows"]] == ["Till A"] and found["total"] == 1, f"customer search: {found}")
+
+@check
+def sales_analytics():
+    columns = analytics.load_sales_columns()
+    by_source = dict(reports.get_revenue_by_source())
+    expect(abs(columns.cents.sum() / 100 - float(by_source["Product Sales"]) - float(by_source["Services"])) < 0.01,
+           f"analytics revenue {columns.cents.sum()} vs rollup {by_source}")
+    for period in ("day", "week", "month"):
+        starts, revenue, units = analytics.totals_by_period(columns, period)
+        expect(revenue.sum() == columns.cents.sum(), f"{period} totals lose revenue")
+    orders = sum(len(database.get_orders_by_payment_method(method)) for method in ("Cash", "Bank Transfer"))
+    trends = analytics.get_dashboard_trends()
+    expect(sum(o for _, _, o, _ in trends["payment_mix"]) == orders, f"payment mix: {trends['payment_mix']}")
+    expect(trends["top_customers"][0][0] == "Juan Dela Cruz", f"top customers: {trends['top_customers']}")
+
+
+@check
+def delete_product_hides_it():
+    database.delete_product(product("C-RGB")[0])
+    expect(product("C-RGB") is None, "deleted product still listed")
+    expect(database.search_products("corsair") == [], "deleted product still searchable")
+
+
+@check
+def legacy_sales_become_orders():
+    import migrations
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id FROM users WHERE username = %s", ("user",))
+        user_id = cursor.fetchone()[0]
+        # Two same-second checkouts by one customer (K-16 in both) and one walk-in sale
+        sales = [(900001, user_id, "K-16"), (900002, user_id, "S-980"), (900003, user_id, "K-16"),
+                 (900004, None, "K-16")]
+        for sale_id, customer_id, code in sales:
+            cursor.execute("INSERT INTO sales (sale_id, customer_id, full_name, product_id, quantity, total_price, "
+                           "payment_method, sale_date) VALUES (%s, %s, %s, %s, 1, 100.00, 'Cash', %s)",
+                           (sale_id, customer_id, "Legacy", product(code)[0], datetime(2020, 1, 1, 9, 0)))
+        for statement in migrations.LEGACY_ORDERS_BACKFILL * 2:
+            cursor.execute(statement)
+        migrations.verify_migration(cursor, 4)
+        cursor.execute("SELECT order_id, customer_id, item_count FROM orders WHERE order_id >= 900001 "
+                       "ORDER BY order_id")
+        orders = [tuple(row) for row in cursor.fetchall()]
+        expect(orders == [(900001, user_id, 2), (900003, user_id, 1), (900004, None, 1)], f"legacy orders: {orders}")
+        cursor.execute("SELECT line_id, order_id FROM order_lines WHERE line_id >= 900001 ORDER BY line_id")
+        lines = [tuple(row) for row in cursor.fetchall()]
+        expect(lines == [(900001, 900001), (900002, 900001), (900003, 900003), (900004, 900004)],
+               f"legacy order lines: {lines}")
+    finally:
+        # The backfill's DDL commits on MySQL, so remove the rows instead of rolling back
+        conn.rollback()
+        cursor = conn.cursor()
+        for table, key in (("order_lines", "line_id"), ("orders", "order_id"), ("sales", "sale_id")):
+            cursor.execute(f"DELETE FROM {table} WHERE {key} >= 900001")
+        conn.commit()
+        conn.close()
+
+
+# --- PERFORMANCE ---
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"median_ms": samples[len(samples) // 2], "max_ms": samples[-1]}
+
+
+def run_performance(repeat):
+    database.add_product("PERF-1", "Benchmark Part", 10, 10 ** 6, "Perf", "")
+    for i in range(200):
+        database.add_product(f"PERF-{i + 2}", f"Benchmark Part {i}", 10 + i, 100, "Perf", "")
+    item = cart_item("PERF-1", 1)
+
+    def sell():
+        result = database.checkout_cart("user", [dict(item)], "Cash")
+        expect(result == "Success", f"checkout failed: {result}")
+
+    return {
+        "get_products": timed(lambda: (database.invalidate_catalog_cache(), database.get_products()), repeat),
+        "search_products": timed(lambda: (database.invalidate_catalog_cache(), database.search_products("part 1")), repeat),
+        "checkout_cart": timed(sell, repeat),
+        "get_stats": timed(database.get_stats, repeat),
+        "completed_services_page": timed(lambda: database.get_completed_services_page(limit=10), repeat),
+        "get_user_sales": timed(lambda: database.get_user_sales("user"), repeat),
+    }
+
+
+def setup(args):
+    if args.engine == "sqlite":
+        path = args.path or os.path.join(tempfile.mkdtemp(prefix="shop_conformance_"), "shop.db")
+        database.configure("sqlite", path=path)
+    else:
+        database.configure("mysql", host=args.host, user=args.user, password=args.password, database=args.database)
+        import mysql.connector
+        conn = mysql.connector.connect(host=args.host, user=args.user, password=args.password)
+        conn.cursor().execute(f"DROP DATABASE IF EXISTS {args.database}")
+        conn.close()
+    database.initialize_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--path", help="SQLite file (default: a new temporary file)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="shop_conformance")
+    parser.add_argument("--repeat", type=int, default=50, help="iterations per timed operation")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    setup(args)
+    results = {"engine": args.engine, "checks": {}, "performance": {}}
+    failures = 0
+    for fn in CHECKS:
+        start = time.perf_counter()
+        try:
+            fn()
+            status = "ok"
+        except Exception as e:
+            status = f"FAIL: {e}"
+            failures += 1
+        elapsed = (time.perf_counter() - start) * 1000
+        results["checks"][fn.__name__] = {"status": status, "ms": elapsed}
+        print(f"{fn.__name__:<40} {elapsed:9.1f} ms  {status}")
+
+    if not failures:
+        print()
+        results["performance"] = run_performance(args.repeat)
+        for name, timing in results["performance"].items():
+            print(f"{name:<40} median {timing['median_ms']:8.2f} ms   max {timing['max_ms']:8.2f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    database.close_pool()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
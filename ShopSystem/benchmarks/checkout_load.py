@@ -0,0 +1,275 @@
+"""
+Multi-till checkout load generator.
+
+Simulates N tills (threads) each running customers through the real
+UserController.add_to_cart -> process_checkout path against a scratch
+database, then reconciles products.stock_qty against the sales written
+during the run and the stock ledger to detect overselling, unrecorded stock
+changes and leftover stock reservations:
+
+    python benchmarks/checkout_load.py --engine sqlite --tills 8 --orders 200 --hot-skus 3 --hot-fraction 0.6
+    python benchmarks/checkout_load.py --engine mysql --database shop_load --tills 16 --duration 60 --skew 1.2
+
+Product choice: with --hot-fraction f, f of all picks go to the first
+--hot-skus products and the rest follow a Zipf distribution with exponent
+--skew over the whole catalog (0 = uniform).
+add_to_cart reserves the units, so a pick that other tills hold or have sold
+is refused there (hold_refused); an order whose picks were all refused is
+counted as empty_cart and not checked out.
+Checkouts that fail with a transient error (deadlock, lock wait timeout,
+"database is locked", stock changed) are retried up to --retries times, on
+top of checkout_cart's own deadlock / lock timeout retries (database.retry_config).
+"""
+import argparse
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import synthetic_data
+from controllers.user_controller import UserController
+from db_benchmark import percentile
+
+TRANSIENT_ERRORS = {
+    "deadlock": ("Deadlock found", "deadlock"),
+    "lock_timeout": ("Lock wait timeout", "database is locked", "PoolTimeoutError", "No connection available"),
+    "stock_changed": ("Stock changed during checkout",),
+}
+
+
+def classify(message):
+    if message == "Checkout successful":
+        return "success"
+    if "Not enough stock" in message:
+        return "out_of_stock"
+    for kind, needles in TRANSIENT_ERRORS.items():
+        if any(n in message for n in needles):
+            return kind
+    return "error"
+
+
+class ProductPicker:
+    """Seeded product choice with hot SKUs and Zipf skew"""
+
+    def __init__(self, products, skew, hot_skus, hot_fraction):
+        self.products = products
+        self.hot = products[:hot_skus]
+        self.hot_fraction = hot_fraction if self.hot else 0.0
+        weights = [1.0 / math.pow(rank, skew) for rank in range(1, len(products) + 1)]
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def pick(self, rng):
+        if rng.random() < self.hot_fraction:
+            return rng.choice(self.hot)
+        x = rng.random() * self.cumulative[-1]
+        return self.products[min(bisect.bisect_left(self.cumulative, x), len(self.products) - 1)]
+
+
+def setup_catalog(args):
+    """Creates the load-test products and customers; returns (products, customers, first order line id)"""
+    prefix = f"LOAD{args.seed}-"
+    for i in range(args.products):
+        try:
+            database.add_product(f"{prefix}{i:05d}", f"Load Test Part {i}", 100 + i, args.stock, "LoadTest", "")
+        except Exception:
+            pass  # already there from an earlier run; stock is reset below
+
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        # Recorded in the stock ledger like any other stock change
+        cursor.execute("INSERT INTO stock_movements (product_id, delta, balance_after, reason) "
+                       "SELECT product_id, %s - stock_qty, %s, 'adjustment' FROM products "
+                       "WHERE code LIKE %s AND stock_qty <> %s",
+                       (args.stock, args.stock, prefix + "%", args.stock))
+        cursor.execute("UPDATE products SET stock_qty = %s, is_active = 1 WHERE code LIKE %s",
+                       (args.stock, prefix + "%"))
+        conn.commit()
+        cursor.execute("SELECT COALESCE(MAX(line_id), 0) FROM order_lines")
+        first_line_id = cursor.fetchone()[0] + 1
+    finally:
+        conn.close()
+    database.invalidate_catalog_cache()
+
+    products = [p for p in database.get_products("LoadTest") if p[1].startswith(prefix)]
+    customers = []
+    for i in range(args.tills):
+        username = f"till_{args.seed}_{i}"
+        database.register_user(username, "load", f"Till Customer {i}", f"{username}@example.com", "0")
+        user = database.check_login(username, "load")
+        customers.append((user[0], username, user[2]))
+    return products, customers, first_line_id
+
+
+def till(index, args, picker, customer, deadline, stats, lock):
+    rng = random.Random(args.seed * 1000 + index)
+    user_id, username, full_name = customer
+    controller = UserController(None, user_id, username, full_name)
+    latencies, outcomes, retries = [], Counter(), 0
+
+    for order in itertools.count():
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        if deadline is None and order >= args.orders:
+            break
+
+        controller.clear_cart()
+        for _ in range(rng.randint(1, args.max_lines)):
+            pid, code, name, price, stock, category, details = picker.pick(rng)
+            # Reserves the units; refused when other tills hold or sold what's left
+            ok, message = controller.add_to_cart(code, name, price, rng.randint(1, args.max_qty))
+            if not ok:
+                outcomes["hold_refused"] += 1
+        if not controller.get_cart_items():
+            outcomes["empty_cart"] += 1
+            continue
+
+        start = time.perf_counter()
+        for attempt in range(args.retries + 1):
+            ok, message, receipt = controller.process_checkout("Cash")
+            kind = classify(message)
+            if kind in TRANSIENT_ERRORS and attempt < args.retries:
+                retries += 1
+                outcomes[f"retried_{kind}"] += 1
+                time.sleep(rng.uniform(0, 0.002 * (2 ** attempt)))
+                continue
+            break
+        elapsed = time.perf_counter() - start
+        outcomes[kind] += 1
+        if kind == "success":
+            latencies.append(elapsed)
+
+    controller.logout()  # releases what the last failed checkout still holds
+    with lock:
+        stats["latencies"].extend(latencies)
+        stats["outcomes"].update(outcomes)
+        stats["retries"] += retries
+
+
+def reconcile(products, initial_stock, first_line_id):
+    """
+    Checks final stock == initial stock - units sold during the run, never below
+    zero, and equal to the stock ledger's latest balance and sum of movements
+    """
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        ids = [p[0] for p in products]
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"SELECT product_id, stock_qty FROM products WHERE product_id IN ({placeholders})", ids)
+        final = dict(cursor.fetchall())
+        cursor.execute(
+            f"SELECT product_id, SUM(quantity) FROM order_lines WHERE line_id >= %s AND product_id IN ({placeholders}) "
+            "GROUP BY product_id",
+            [first_line_id] + ids)
+        sold = {pid: int(units) for pid, units in cursor.fetchall()}
+        cursor.execute(f"SELECT COUNT(*) FROM stock_reservations WHERE product_id IN ({placeholders})", ids)
+        leftover_holds = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT m.product_id, m.balance_after, t.total FROM stock_movements m "
+            f"JOIN (SELECT product_id, MAX(movement_id) AS last_id, SUM(delta) AS total FROM stock_movements "
+            f"WHERE product_id IN ({placeholders}) GROUP BY product_id) t ON t.last_id = m.movement_id",
+            ids)
+        ledger = {pid: (balance, int(total)) for pid, balance, total in cursor.fetchall()}
+    finally:
+        conn.close()
+
+    problems = []
+    for pid in ids:
+        units = sold.get(pid, 0)
+        if final[pid] < 0:
+            problems.append(f"product {pid}: stock is negative ({final[pid]})")
+        if units > initial_stock:
+            problems.append(f"product {pid}: oversold {units} of {initial_stock} units")
+        if final[pid] != initial_stock - units:
+            problems.append(f"product {pid}: stock {final[pid]} != {initial_stock} - {units} sold")
+        if ledger.get(pid) != (final[pid], final[pid]):
+            problems.append(f"product {pid}: stock {final[pid]} != ledger (balance, sum) {ledger.get(pid)}")
+    if leftover_holds:
+        problems.append(f"{leftover_holds} stock reservations were not converted or released")
+    return {"units_sold": sum(sold.values()), "sold_out_skus": sum(1 for v in final.values() if v == 0),
+            "problems": problems}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    synthetic_data.add_engine_arguments(parser)
+    parser.set_defaults(path="load.db", database="shop_load")
+    parser.add_argument("--tills", type=int, default=8, help="concurrent customers")
+    parser.add_argument("--orders", type=int, default=100, help="checkouts per till (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="run for this many seconds instead")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=500, help="initial stock of every load-test product")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent (0 = uniform)")
+    parser.add_argument("--hot-skus", type=int, default=3)
+    parser.add_argument("--hot-fraction", type=float, default=0.5)
+    parser.add_argument("--max-lines", type=int, default=3, help="max cart lines per order")
+    parser.add_argument("--max-qty", type=int, default=2, help="max quantity per cart line")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    database.pool_config["size"] = max(database.pool_config["size"], args.tills)
+    synthetic_data.configure_engine(args)
+    products, customers, first_line_id = setup_catalog(args)
+    picker = ProductPicker(products, args.skew, args.hot_skus, args.hot_fraction)
+
+    stats = {"latencies": [], "outcomes": Counter(), "retries": 0}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else None
+    threads = [threading.Thread(target=till, args=(i, args, picker, customers[i], deadline, stats, lock))
+               for i in range(args.tills)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    ms = sorted(x * 1000 for x in stats["latencies"])
+    check = reconcile(products, args.stock, first_line_id)
+    report = {
+        "engine": database.db_engine,
+        "tills": args.tills,
+        "elapsed_s": elapsed,
+        "orders_per_sec": len(ms) / elapsed if elapsed else 0.0,
+        "latency_ms": {"p50": percentile(ms, 50), "p90": percentile(ms, 90), "p99": percentile(ms, 99),
+                       "max": ms[-1] if ms else 0.0},
+        "outcomes": dict(stats["outcomes"]),
+        "retries": stats["retries"],
+        "reconciliation": check,
+        "pool": database.get_pool_stats(),
+    }
+
+    print(f"{args.tills} tills, {elapsed:.1f}s, {report['orders_per_sec']:.1f} orders/s")
+    print("latency ms: " + "  ".join(f"{k} {v:.2f}" for k, v in report["latency_ms"].items()))
+    print("outcomes:   " + "  ".join(f"{k}={v}" for k, v in sorted(report["outcomes"].items())))
+    print(f"retries:    {report['retries']}")
+    print(f"units sold: {check['units_sold']}   sold-out SKUs: {check['sold_out_skus']}")
+    if check["problems"]:
+        print("OVERSELL / STOCK MISMATCH:")
+        for problem in check["problems"]:
+            print("  " + problem)
+    else:
+        print("reconciliation: OK (no overselling, stock matches sales)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    database.close_pool()
+    sys.exit(1 if check["problems"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Latency and throughput benchmarks for the database.py hot paths.
+
+    # one-off: generate a 10% data set into bench.db and benchmark it
+    python benchmarks/db_benchmark.py --engine sqlite --path bench.db --generate --scale 0.1 --json before.json
+    # after a change: same database, compare against the earlier run
+    python benchmarks/db_benchmark.py --engine sqlite --path bench.db --json after.json --compare before.json
+
+Each case reports p50/p90/p99/max latency in ms, and rows/second for the
+rows the function returned. The catalog cache is cleared before every call
+(--warm-cache keeps it) so get_products measures the database.
+Results are stored as JSON with the git commit, engine and data set size.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import synthetic_data
+
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a sorted list"""
+    if not samples:
+        return 0.0
+    k = max(0, min(len(samples) - 1, math.ceil(p / 100 * len(samples)) - 1))
+    return samples[k]
+
+
+def table_counts():
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        counts = {}
+        for table in ("users", "products", "orders", "order_lines", "completed_services"):
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            counts[table] = cursor.fetchone()[0]
+        return counts
+    finally:
+        conn.close()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except Exception:
+        return None
+
+
+class Cases:
+    """Benchmark cases: name -> (callable returning a row count, default iterations)"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        conn = database.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT username FROM users WHERE role = 'customer'")
+            self.usernames = [r[0] for r in cursor.fetchall()]
+            cursor.execute("SELECT code, name, price FROM products WHERE is_active = 1 AND stock_qty > 100")
+            self.products = cursor.fetchall()
+            cursor.execute("SELECT COUNT(*) FROM completed_services")
+            self.completed = cursor.fetchone()[0]
+            cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+            self.max_order_id = cursor.fetchone()[0]
+            cursor.execute("SELECT DISTINCT DATE(order_date) FROM orders")
+            self.order_days = [date.fromisoformat(str(r[0])[:10]) for r in cursor.fetchall()]  # SQLite: text
+        finally:
+            conn.close()
+        self.categories = database.get_categories()
+        words = sorted({word for _, name, _ in self.products[:2000] for word in name.split() if len(word) > 3})
+        self.terms = words or ["pro"]
+
+    def all(self):
+        return {
+            "checkout_cart": (self.checkout_cart, 200),
+            "get_products/all": (lambda: len(database.get_products()), 10),
+            "get_products/category": (lambda: len(database.get_products(self.rng.choice(self.categories))), 50),
+            "get_products/search": (lambda: len(database.get_products(None, self.rng.choice(self.terms))), 50),
+            "search_products": (lambda: len(database.search_products(self.rng.choice(self.terms))), 200),
+            "get_all_sales": (lambda: len(database.get_all_sales()), 3),
+            "get_stats": (lambda: (database.get_stats(), 1)[1], 200),
+            "get_completed_services/all": (lambda: len(database.get_completed_services()), 3),
+            "completed_services/offset_baseline": (self.offset_page_baseline, 200),
+            "get_completed_services_page": (self.keyset_page, 200),
+            "get_user_sales": (lambda: len(database.get_user_sales(self.rng.choice(self.usernames))), 200),
+            "get_customer_orders": (lambda: len(database.get_customer_orders(self.rng.choice(self.usernames))),
+                                    200),
+            "get_order": (self.order, 200),
+            "get_orders_by_day": (self.orders_by_day, 50),
+        }
+
+    def checkout_cart(self):
+        cart = []
+        for code, name, price in self.rng.sample(self.products, self.rng.randint(1, 3)):
+            cart.append({"code": code, "name": name, "price": price, "qty": 1})
+        result = database.checkout_cart(self.rng.choice(self.usernames), cart, "Cash")
+        if result != "Success":
+            raise RuntimeError(f"checkout failed: {result}")
+        return len(cart)
+
+    def order(self):
+        order = database.get_order(self.rng.randint(1, max(self.max_order_id, 1)))
+        return len(order["lines"]) if order else 0
+
+    def orders_by_day(self):
+        if not self.order_days:
+            return 0
+        return len(database.get_orders_by_day(self.rng.choice(self.order_days)))
+
+    def offset_page_baseline(self):
+        """The LIMIT/OFFSET paging the history tab used to do, to compare keyset_page against"""
+        offset = self.rng.randint(0, max(0, self.completed - 10))
+        conn = database.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT completed_id, full_name, service_type, description, started_at, completed_at, price
+                FROM completed_services
+                ORDER BY completed_at DESC, completed_id DESC LIMIT 10 OFFSET %s
+            """, (offset,))
+            return len(cursor.fetchall())
+        finally:
+            conn.close()
+
+    def keyset_page(self):
+        page = database.get_completed_services_page(limit=10)
+        for _ in range(self.rng.randint(0, 20)):
+            if not page["next"]:
+                break
+            page = database.get_completed_services_page(page["next"], "next", limit=10)
+        return len(page["rows"])
+
+
+def run_case(fn, iterations, warmup, warm_cache):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    rows = 0
+    for _ in range(iterations):
+        if not warm_cache:
+            database.invalidate_catalog_cache()
+        start = time.perf_counter()
+        rows += fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    ms = [s * 1000 for s in samples]
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1],
+        "mean_ms": total * 1000 / iterations,
+        "rows": rows,
+        "rows_per_sec": rows / total if total else 0.0,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\nvs {baseline_path}:")
+    for name, r in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ("p50_ms", "p99_ms"):
+            if before[key]:
+                changes.append(f"{key} {(r[key] - before[key]) / before[key] * 100:+6.1f}%")
+        print(f"  {name:<32} {'   '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    synthetic_data.add_engine_arguments(parser)
+    parser.add_argument("--generate", action="store_true", help="add synthetic data before benchmarking")
+    parser.add_argument("--scale", type=float, default=1.0, help="synthetic data size (1.0 = 1M sales)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="case names (prefix match) to run")
+    parser.add_argument("--iterations", type=int, help="override iterations for every case")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--warm-cache", action="store_true", help="keep the catalog cache between calls")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier --json file to compare against")
+    args = parser.parse_args()
+
+    synthetic_data.configure_engine(args)
+    if args.generate:
+        synthetic_data.generate(args.scale, args.seed)
+
+    cases = Cases(args.seed).all()
+    if args.only:
+        cases = {k: v for k, v in cases.items() if any(k.startswith(prefix) for prefix in args.only)}
+
+    results = {}
+    print(f"{'case':<32} {'iter':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'rows/s':>12}")
+    for name, (fn, iterations) in cases.items():
+        r = run_case(fn, args.iterations or iterations, args.warmup, args.warm_cache)
+        results[name] = r
+        print(f"{name:<32} {r['iterations']:>5} {r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+              f"{r['max_ms']:>9.2f} {r['rows_per_sec']:>12,.0f}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "engine": database.db_engine,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "warm_cache": args.warm_cache,
+            "tables": table_counts(),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+    database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Offscreen benchmarks for the ManagerView / UserView table refreshes.
+
+The views run under QT_QPA_PLATFORM=offscreen with stub controllers that
+return N synthetic rows from memory, so the numbers are the cost of the GUI
+side only (worker hand-off, model/table fill, first paint):
+
+    python benchmarks/gui_benchmark.py --rows 1000 10000 100000 --json gui.json
+
+Per refresh it reports wall time until the data is shown, the time to paint
+the visible tab, Python allocations during the refresh (tracemalloc) and the
+number of live widgets.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QEvent
+from PyQt6.QtWidgets import QApplication
+
+import views.manager_view as manager_view
+import views.user_view as user_view
+from controllers.manager_controller import ManagerController
+from controllers.user_controller import UserController
+
+CATEGORIES = ["CPU", "GPU", "RAM", "Storage", "Cooling", "Peripherals"]
+
+
+class FakeData:
+    """N rows shaped like the database.py results"""
+
+    def __init__(self, rows):
+        now = datetime(2026, 1, 1, 12, 0)
+        self.products = [
+            (i, f"P{i:06d}", f"Product {i}", Decimal("99.50") + i % 100, i % 7, CATEGORIES[i % len(CATEGORIES)], "")
+            for i in range(rows)
+        ]
+        self.sales = [
+            (now - timedelta(minutes=i), f"Customer {i % 500}", f"Product {i}", 1 + i % 3,
+             Decimal("99.50") * (1 + i % 3), "Cash" if i % 4 else "Bank Transfer", None if i % 4 else "BDO")
+            for i in range(rows)
+        ]
+        # Pending services stay a fraction of the catalog in practice
+        self.services = [
+            (i, f"Customer {i % 500}", "Repair", f"[Scheduled: 2026-01-01] job {i}", "Pending", Decimal("500"))
+            for i in range(max(1, rows // 10))
+        ]
+        self.history_page = {
+            "rows": [(i, "Customer", "Repair", "job", now, now, Decimal("500")) for i in range(10)],
+            "next": f"{now.isoformat()}|1", "prev": None, "total": rows,
+        }
+        self.user_sales = [(now, f"Product {i}", 1, Decimal("99.50"), "Cash") for i in range(min(rows, 1000))]
+        self.user_services = [(i, now, "Repair", "[Scheduled: 2026-01-01] job", "Pending", Decimal("500"))
+                              for i in range(min(rows, 100))]
+
+
+DATA = None
+
+
+class StubManagerController(ManagerController):
+    def get_all_products(self, category=None, search=None):
+        return [p for p in DATA.products if category is None or p[5] == category]
+
+    def get_categories(self):
+        return list(CATEGORIES)
+
+    def get_stats(self):
+        return Decimal("123456.78"), len(DATA.sales), sum(p[4] for p in DATA.products), 500
+
+    def get_next_product_code(self):
+        return f"P{len(DATA.products):06d}"
+
+    def get_all_services(self):
+        return list(DATA.services)
+
+    def get_all_sales(self):
+        return list(DATA.sales)
+
+    def fetch_history_page(self):
+        return dict(DATA.history_page)
+
+
+class StubUserController(UserController):
+    def get_all_products(self, category=None, search=None):
+        return [p for p in DATA.products if category is None or p[5] == category]
+
+    def get_categories(self):
+        return list(CATEGORIES)
+
+    def get_order_history(self):
+        return list(DATA.user_sales)
+
+    def get_my_bookings(self):
+        return list(DATA.user_services)
+
+
+def wait_idle(app, view, timeout=120.0, settle=0.0):
+    """Processes events until the view has no pending loads (after at least settle seconds)"""
+    deadline = time.perf_counter() + timeout
+    settle_until = time.perf_counter() + settle
+    while time.perf_counter() < settle_until:
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    while not view.tasks.is_idle():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("refresh did not finish")
+        app.processEvents()
+        time.sleep(0.0005)
+    app.processEvents()
+
+
+def dispose(app, view):
+    """Deletes a closed window now so widget counts don't carry over between runs"""
+    view.tasks.cancel_all()
+    view.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    app.processEvents()
+
+
+
+def measure(app, view, refresh, repeat):
+    """Runs refresh() repeat times; returns timings, allocations and widget counts"""
+    wall, paint = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        refresh()
+        wait_idle(app, view)
+        wall.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        view.grab()
+        paint.append((time.perf_counter() - start) * 1000)
+
+    # One more run under tracemalloc (kept separate: tracing slows everything down)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    refresh()
+    wait_idle(app, view)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms_median": statistics.median(wall),
+        "wall_ms_max": max(wall),
+        "paint_ms_median": statistics.median(paint),
+        "alloc_peak_kb": (peak - before) / 1024,
+        "alloc_retained_kb": (after - before) / 1024,
+        "widgets": len(app.allWidgets()),
+    }
+
+
+def run(app, rows, repeat):
+    global DATA
+    DATA = FakeData(rows)
+    results = {}
+
+    manager = manager_view.ManagerView()
+    wait_idle(app, manager, settle=0.3)  # initial loads (ManagerView defers refresh_all by 100 ms)
+    manager.resize(1200, 800)
+    manager.show()
+    manager.pages.show("inventory")
+    results["ManagerView.refresh_inventory"] = measure(app, manager, manager.refresh_inventory, repeat)
+    manager.pages.show("sales")
+    results["ManagerView.refresh_sales"] = measure(app, manager, manager.refresh_sales, repeat)
+    manager.pages.show("inventory")
+    results["ManagerView.refresh_all"] = measure(app, manager, manager.refresh_all, repeat)
+    manager.close()
+    dispose(app, manager)
+
+    user = user_view.UserView(2, "user", "Juan Dela Cruz")
+    wait_idle(app, user, settle=0.3)  # initial load of the visible tab
+    user.resize(1200, 800)
+    user.show()
+    user.pages.show("shop")
+    results["UserView.refresh_shop"] = measure(app, user, user.refresh_shop, repeat)
+    user.close()
+    dispose(app, user)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    manager_view.ManagerController = StubManagerController
+    user_view.UserController = StubUserController
+    app = QApplication(sys.argv[:1])
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        },
+        "results": {},
+    }
+    print(f"{'rows':>7}  {'refresh':<32} {'wall ms':>9} {'paint ms':>9} {'peak KB':>10} {'kept KB':>10} {'widgets':>8}")
+    for rows in args.rows:
+        results = run(app, rows, args.repeat)
+        report["results"][str(rows)] = results
+        for name, r in results.items():
+            print(f"{rows:>7}  {name:<32} {r['wall_ms_median']:>9.1f} {r['paint_ms_median']:>9.1f} "
+                  f"{r['alloc_peak_kb']:>10.0f} {r['alloc_retained_kb']:>10.0f} {r['widgets']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
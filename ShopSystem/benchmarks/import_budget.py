@@ -0,0 +1,129 @@
+"""
+Import-time and startup budget check.
+
+Runs fresh interpreters (QT_QPA_PLATFORM=offscreen) and fails (exit 1) when
+- importing what main.py needs for the login window takes longer than
+  --import-budget-ms (best of --repeat runs, from python -X importtime),
+- a module that should only load after login (or never at startup) is imported,
+- time to the first shown LoginView exceeds --window-budget-ms (median):
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --import-budget-ms 400 --window-budget-ms 1500 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SHOP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_IMPORTS = "import main, database, auth, metrics, profiling; import views.login_view"
+
+# Loaded on demand (after login, when exporting, when serving metrics, ...)
+NOT_AT_STARTUP = [
+    "views.manager_view",
+    "views.user_view",
+    "controllers.manager_controller",
+    "reports",
+    "http.server",
+    "logging.handlers",
+    "numpy",
+]
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {shop_dir!r})
+import database
+database.configure("sqlite", path={db_path!r})
+database.initialize_db()
+from PyQt6.QtWidgets import QApplication
+app = QApplication([])
+from views.login_view import LoginView
+window = LoginView()
+window.show()
+app.processEvents()
+print("FIRST_WINDOW_MS", (time.perf_counter() - start) * 1000)
+"""
+
+
+def run_python(args, cwd=SHOP_DIR):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+
+
+def measure_imports():
+    """Returns (total ms, {module: cumulative ms}) for one cold interpreter"""
+    result = run_python(["-X", "importtime", "-c", STARTUP_IMPORTS])
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        name = name[1:]  # nesting is shown by two spaces per level after "| "
+        modules[name.strip()] = int(cumulative_us) / 1000
+        if not name.startswith(" "):  # top-level import: its cumulative time includes its children
+            total_us += int(cumulative_us)
+    return total_us / 1000, modules
+
+
+def measure_first_window():
+    with tempfile.TemporaryDirectory() as tmp:
+        script = STARTUP_SCRIPT.format(shop_dir=SHOP_DIR, db_path=os.path.join(tmp, "startup.db"))
+        result = run_python(["-c", script])
+        for line in result.stdout.splitlines():
+            if line.startswith("FIRST_WINDOW_MS"):
+                return float(line.split()[1])
+        raise RuntimeError(result.stderr[-2000:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget-ms", type=float, default=400.0)
+    parser.add_argument("--window-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    runs = [measure_imports() for _ in range(args.repeat)]
+    import_ms, modules = min(runs, key=lambda r: r[0])
+    windows = [measure_first_window() for _ in range(args.repeat)]
+    window_ms = statistics.median(windows)
+    unexpected = [m for m in NOT_AT_STARTUP if m in modules]
+
+    print(f"startup imports: {import_ms:8.1f} ms (best of {args.repeat}, budget {args.import_budget_ms:.0f} ms)")
+    print(f"first window:    {window_ms:8.1f} ms (median, budget {args.window_budget_ms:.0f} ms)")
+    print("\nslowest modules (cumulative):")
+    for name, ms in sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"startup imports took {import_ms:.1f} ms > {args.import_budget_ms:.0f} ms")
+    if window_ms > args.window_budget_ms:
+        failures.append(f"first window took {window_ms:.1f} ms > {args.window_budget_ms:.0f} ms")
+    for name in unexpected:
+        failures.append(f"{name} is imported at startup")
+    if failures:
+        print("\nOVER BUDGET:")
+        for failure in failures:
+            print("  " + failure)
+    else:
+        print("\nwithin budget")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"import_ms": import_ms, "first_window_ms": window_ms, "first_window_runs": windows,
+                       "unexpected_imports": unexpected, "modules_ms": modules}, f, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
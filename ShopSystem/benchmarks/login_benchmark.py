@@ -0,0 +1,110 @@
+"""
+Concurrent login latency.
+
+Creates --users customer accounts in a scratch database, then has --clients
+threads log in through database.check_login for --rounds rounds each and
+reports the latency distribution. Hashing runs on the auth pool, so with
+more clients than auth_config["workers"] logins queue instead of
+oversubscribing the CPU:
+
+    python benchmarks/login_benchmark.py --clients 1 2 4 8 16
+    python benchmarks/login_benchmark.py --clients 8 --workers 4 --target-ms 100 --json logins.json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import auth
+import database
+import synthetic_data
+from db_benchmark import percentile
+
+PASSWORD = "loadtest123"
+
+
+def setup_users(count):
+    """Registers the benchmark accounts (once) and returns their usernames"""
+    usernames = [f"login{i:04d}" for i in range(count)]
+    for name in usernames:
+        database.register_user(name, PASSWORD, f"Login Test {name}", f"{name}@example.com", "")
+    return usernames
+
+
+def run_clients(usernames, clients, rounds):
+    """Returns (sorted latencies in ms, failed logins, elapsed seconds)"""
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    def client(index):
+        mine, failed = [], 0
+        for r in range(rounds):
+            name = usernames[(index + r * clients) % len(usernames)]
+            start = time.perf_counter()
+            user = database.check_login(name, PASSWORD)
+            mine.append((time.perf_counter() - start) * 1000)
+            failed += user is None
+        with lock:
+            latencies.extend(mine)
+            failures.append(failed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sorted(latencies), sum(failures), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    synthetic_data.add_engine_arguments(parser)
+    parser.set_defaults(path="login.db", database="shop_login")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=5, help="logins per client")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=auth.auth_config["workers"], help="auth pool size")
+    parser.add_argument("--target-ms", type=float, default=auth.auth_config["target_ms"],
+                        help="bcrypt calibration target")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    auth.auth_config["workers"] = args.workers
+    auth.auth_config["target_ms"] = args.target_ms
+    database.pool_config["size"] = max(database.pool_config["size"], max(args.clients))
+    synthetic_data.configure_engine(args)
+    usernames = setup_users(args.users)
+    rounds = auth.target_rounds()
+    # Accounts from an earlier run with another target are rehashed on their first login
+    run_clients(usernames, 1, len(usernames))
+    auth.shutdown()  # wait for background rehashes
+
+    print(f"bcrypt cost {rounds} (target {args.target_ms:.0f} ms), {args.workers} auth workers")
+    print(f"{'clients':>8} {'logins/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'failed':>7}")
+    results = []
+    for clients in args.clients:
+        ms, failed, elapsed = run_clients(usernames, clients, args.rounds)
+        row = {"clients": clients, "logins_per_sec": len(ms) / elapsed if elapsed else 0.0,
+               "p50": percentile(ms, 50), "p90": percentile(ms, 90), "p99": percentile(ms, 99),
+               "max": ms[-1] if ms else 0.0, "failed": failed}
+        results.append(row)
+        print(f"{clients:>8} {row['logins_per_sec']:>9.1f} {row['p50']:>8.1f} {row['p90']:>8.1f} "
+              f"{row['p99']:>8.1f} {row['max']:>8.1f} {failed:>7}")
+    auth.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"engine": database.db_engine, "bcrypt_rounds": rounds, "workers": args.workers,
+                       "target_ms": args.target_ms, "results": results}, f, indent=2)
+    sys.exit(1 if any(r["failed"] for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
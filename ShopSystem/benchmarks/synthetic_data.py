@@ -0,0 +1,209 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Fills the configured database with customers, products, orders (with their
+lines) and completed services. The same seed and scale always produce the same rows:
+
+    python benchmarks/synthetic_data.py --engine sqlite --path bench.db --scale 0.1
+
+Scale 1.0 = 100k products, 1M order lines (1-4 per order), 200k completed
+services, 50k customers.
+Only use it on a scratch database: existing rows are kept and new ones added.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+FULL_SIZE = {
+    "customers": 50_000,
+    "products": 100_000,
+    "order_lines": 1_000_000,
+    "completed_services": 200_000,
+}
+
+CATEGORIES = ["CPU", "GPU", "RAM", "Storage", "Motherboard", "PSU", "Cooling", "Case", "Peripherals", "Networking"]
+BRANDS = ["Kingston", "Corsair", "Samsung", "AMD", "Intel", "Nvidia", "Asus", "MSI", "Gigabyte", "Seagate",
+          "Western Digital", "Crucial", "Cooler Master", "Logitech", "TP-Link", "NZXT", "Noctua", "EVGA"]
+MODELS = ["Pro", "Ultra", "Fury", "Vengeance", "Evo", "Ryzen", "Core", "Strix", "Gaming", "Elite", "Plus",
+          "Max", "Lite", "RGB", "Silent", "Turbo", "X", "Prime", "Aorus", "Barracuda"]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Mark", "Grace", "Paolo", "Liza", "Carlo", "Bea", "Miguel",
+               "Andrea", "Rico", "Joy", "Enzo", "Kristine", "Noel", "Ivy", "Rafael", "Camille"]
+LAST_NAMES = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Torres", "Flores", "Villanueva",
+              "Ramos", "Castillo", "Aquino", "Bautista", "Navarro", "Domingo", "Lopez", "Rivera"]
+SERVICE_TYPES = ["Repair", "Cleaning", "Upgrade", "Installation", "Diagnostics", "Data Recovery"]
+PAYMENT_METHODS = ["Cash", "Cash", "Cash", "Bank Transfer"]
+BANKS = ["BDO", "BPI", "Metrobank", "Landbank"]
+
+# One bcrypt hash for every synthetic customer (password "bench"); hashing 50k would take minutes
+_PASSWORD_HASH = None
+
+
+def sizes(scale):
+    return {table: max(1, int(count * scale)) for table, count in FULL_SIZE.items()}
+
+
+def _insert(cursor, conn, query, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(query, rows[start:start + batch_size])
+        conn.commit()
+
+
+def _random_time(rng, now, days):
+    return (now - timedelta(seconds=rng.randint(0, days * 86400))).replace(microsecond=0)
+
+
+def generate(scale=1.0, seed=42, batch_size=5000, days=365, log=print):
+    """Inserts synthetic rows and rebuilds the daily rollup; returns the row counts added"""
+    global _PASSWORD_HASH
+    if _PASSWORD_HASH is None:
+        _PASSWORD_HASH = database.hash_password("bench")
+
+    rng = random.Random(seed)
+    counts = sizes(scale)
+    now = datetime.now()
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+
+        started = time.perf_counter()
+        customers = []
+        for i in range(counts["customers"]):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            customers.append((f"bench_{seed}_{i}", _PASSWORD_HASH, f"{first} {last}",
+                              f"{first.lower()}.{i}@example.com", f"09{rng.randint(100000000, 999999999)}"))
+        _insert(cursor, conn,
+                "INSERT INTO users (username, password, role, full_name, email, phone) "
+                "VALUES (%s, %s, 'customer', %s, %s, %s)",
+                customers, batch_size)
+        cursor.execute("SELECT user_id, full_name FROM users WHERE username LIKE %s ORDER BY user_id",
+                       (f"bench_{seed}_%",))
+        customer_rows = cursor.fetchall()
+        log(f"customers: {len(customers)} in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        products = []
+        for i in range(counts["products"]):
+            name = f"{rng.choice(BRANDS)} {rng.choice(MODELS)} {rng.choice(MODELS)} {rng.randint(100, 9999)}"
+            products.append((f"B{seed}-{i:07d}", name, Decimal(rng.randint(500, 150000)) / 4,
+                             rng.randint(0, 5000), rng.choice(CATEGORIES), f"Synthetic product {i}"))
+        _insert(cursor, conn,
+                "INSERT INTO products (code, name, price, stock_qty, category, details, is_active) "
+                "VALUES (%s, %s, %s, %s, %s, %s, 1)",
+                products, batch_size)
+        cursor.execute("SELECT product_id, name, price FROM products WHERE code LIKE %s ORDER BY product_id",
+                       (f"B{seed}-%",))
+        product_rows = cursor.fetchall()
+        cursor.execute("INSERT INTO stock_movements (product_id, delta, balance_after, reason) "
+                       "SELECT product_id, stock_qty, stock_qty, 'opening' FROM products WHERE code LIKE %s",
+                       (f"B{seed}-%",))
+        conn.commit()
+        log(f"products: {len(products)} in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        # Order ids are assigned here so the lines can reference them without reading them back
+        cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+        order_id = cursor.fetchone()[0]
+        lines_left = counts["order_lines"]
+        order_count = 0
+        while lines_left:
+            orders, lines = [], []
+            while lines_left and len(lines) < batch_size:
+                order_id += 1
+                customer_id, full_name = rng.choice(customer_rows)
+                method = rng.choice(PAYMENT_METHODS)
+                bank = rng.choice(BANKS) if method == "Bank Transfer" else None
+                account = str(rng.randint(10 ** 9, 10 ** 10 - 1)) if bank else None
+                total, units = Decimal(0), 0
+                line_count = min(rng.randint(1, 4), lines_left)
+                for _ in range(line_count):
+                    product_id, name, price = rng.choice(product_rows)
+                    qty = rng.randint(1, 4)
+                    lines.append((order_id, product_id, name, qty, price, price * qty))
+                    total += price * qty
+                    units += qty
+                orders.append((order_id, customer_id, full_name, method, bank, account, line_count, units, total,
+                               _random_time(rng, now, days)))
+                lines_left -= line_count
+            _insert(cursor, conn,
+                    "INSERT INTO orders (order_id, customer_id, full_name, payment_method, bank_name, "
+                    "account_number, item_count, units, total_amount, order_date) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    orders, batch_size)
+            _insert(cursor, conn,
+                    "INSERT INTO order_lines (order_id, product_id, product_name, quantity, unit_price, line_total) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    lines, batch_size)
+            order_count += len(orders)
+        log(f"orders: {order_count} with {counts['order_lines']} lines in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        rows = []
+        for i in range(counts["completed_services"]):
+            customer_id, full_name = rng.choice(customer_rows)
+            completed_at = _random_time(rng, now, days)
+            rows.append((customer_id, full_name, rng.choice(SERVICE_TYPES), f"Synthetic job {i}",
+                         Decimal(rng.randint(200, 20000)), completed_at - timedelta(hours=rng.randint(1, 96)),
+                         completed_at))
+        _insert(cursor, conn,
+                "INSERT INTO completed_services (customer_id, full_name, service_type, description, price, "
+                "started_at, completed_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                rows, batch_size)
+        log(f"completed services: {len(rows)} in {time.perf_counter() - started:.1f}s")
+
+        # Fresh optimizer statistics so plans match a long-running database
+        if database.db_engine == "sqlite":
+            cursor.execute("ANALYZE")
+        else:
+            cursor.execute("ANALYZE TABLE users, products, orders, order_lines, completed_services")
+            cursor.fetchall()
+        conn.commit()
+    finally:
+        conn.close()
+
+    days_rebuilt = database.rebuild_daily_rollup()
+    database.invalidate_catalog_cache()
+    database.rebuild_product_index()
+    log(f"daily rollup: {days_rebuilt} days")
+    return counts
+
+
+def add_engine_arguments(parser):
+    parser.add_argument("--engine", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--path", default="bench.db", help="SQLite file")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="shop_bench", help="MySQL database (scratch)")
+
+
+def configure_engine(args):
+    if args.engine == "sqlite":
+        database.configure("sqlite", path=os.path.abspath(args.path))
+    else:
+        database.configure("mysql", host=args.host, user=args.user, password=args.password, database=args.database)
+    database.initialize_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_engine_arguments(parser)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    configure_engine(args)
+    generate(args.scale, args.seed, args.batch_size)
+    database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 import re
 import database
+import reports
+import stock_ledger
 from datetime import datetime
-from PyQt6.QtGui import QTextDocument
-from PyQt6.QtPrintSupport import QPrinter
+from PyQt6.QtCore import Qt, QRectF, QMarginsF
+from PyQt6.QtGui import QPainter, QPdfWriter, QPageSize, QPageLayout, QFont, QFontMetrics, QColor
 
 
 class ManagerController:
@@ -11,6 +13,11 @@ class ManagerController:
         self.current_history_page = 0
         self.history_per_page = 10
 
+        # Keyset pagination state for the history tab
+        self._history_token = None
+        self._history_direction = "next"
+        self._history_page = {"rows": [], "next": None, "prev": None, "total": None}
+
     # --- PRODUCT MANAGEMENT ---
     def get_next_product_code(self):
         """Calculates the next available product code"""
@@ -56,7 +63,9 @@ class ManagerController:
 
     def get_all_products(self, category=None, search=None):
         """Returns all active products with optional filtering"""
-        return database.get_products(category, search)
+        if search:
+            return database.search_products(search, category)
+        return database.get_products(category)
 
     def get_categories(self):
         """Returns all product categories"""
@@ -82,25 +91,67 @@ class ManagerController:
         database.delete_service(service_id)
         return True, "Service deleted"
 
-    def get_completed_services(self, page=0):
-        """Returns completed services with pagination"""
-        offset = page * self.history_per_page
-        return database.get_completed_services(self.history_per_page, offset)
-
-    def get_completed_services_count(self):
-        """Returns total count of completed services"""
-        return database.get_completed_services_count()
-
     def get_total_history_pages(self):
-        """Calculate total pages for history"""
-        total = self.get_completed_services_count()
-        return max(1, (total + self.history_per_page - 1) // self.history_per_page)
+        """Approximate total pages for history (from the last loaded page, no COUNT(*))"""
+        total = self._history_page["total"] or 0
+        pages = max(1, (total + self.history_per_page - 1) // self.history_per_page)
+        return max(pages, self.current_history_page + 1)
+
+    def fetch_history_page(self):
+        """Queries the current history page by cursor (safe to call from a worker thread)"""
+        return database.get_completed_services_page(
+            self._history_token, self._history_direction, self.history_per_page, with_total=True)
+
+    def set_history_page(self, page):
+        """Makes a fetched page current and returns its rows"""
+        self._history_page = page
+        if not page["prev"]:
+            self.current_history_page = 0
+        return page["rows"]
+
+    def load_history_page(self):
+        """Fetches the current history page by cursor and returns its rows"""
+        return self.set_history_page(self.fetch_history_page())
+
+    def has_next_history_page(self):
+        return self._history_page["next"] is not None
+
+    def has_prev_history_page(self):
+        return self._history_page["prev"] is not None
+
+    def next_history_page(self):
+        """Moves the history cursor forward one page"""
+        if not self.has_next_history_page():
+            return False
+        self._history_token = self._history_page["next"]
+        self._history_direction = "next"
+        self.current_history_page += 1
+        return True
+
+    def prev_history_page(self):
+        """Moves the history cursor back one page"""
+        if not self.has_prev_history_page():
+            return False
+        self._history_token = self._history_page["prev"]
+        self._history_direction = "prev"
+        self.current_history_page = max(0, self.current_history_page - 1)
+        return True
 
     # --- SALES DATA ---
     def get_all_sales(self):
         """Returns all sales records"""
         return database.get_all_sales()
 
+    def iter_all_sales(self):
+        """Yields all sales records one at a time, streamed from the database in batches"""
+        for batch in database.iter_all_sales():
+            yield from batch
+
+    def iter_completed_services(self):
+        """Yields all completed services one at a time, streamed from the database in batches"""
+        for batch in database.iter_completed_services():
+            yield from batch
+
     # --- STATISTICS ---
     def get_stats(self):
         """Returns dashboard statistics"""
@@ -112,16 +163,7 @@ class ManagerController:
         Returns revenue breakdown by source
         Returns: list of tuples [(source_name, amount), ...]
         """
-        sales_revenue = sum([row[4] for row in self.get_all_sales()])
-
-        # Get completed services revenue from completed_services table
-        completed_services = self.get_completed_services()
-        services_revenue = sum([row[6] for row in completed_services])
-
-        return [
-            ("Product Sales", sales_revenue),
-            ("Services", services_revenue),
-        ]
+        return reports.get_revenue_by_source()
 
     # --- ORDERS BREAKDOWN ---
     def get_orders_breakdown(self):
@@ -129,15 +171,7 @@ class ManagerController:
         Returns orders breakdown by category
         Returns: list of tuples [(category_name, count), ...]
         """
-        sales_count = len(self.get_all_sales())
-        completed_services = len(self.get_completed_services())
-        pending_services = len([s for s in self.get_all_services() if s[4] != "Completed"])
-
-        return [
-            ("Product Sales", sales_count),
-            ("Completed Services", completed_services),
-            ("Pending Services", pending_services),
-        ]
+        return reports.get_orders_by_type()
 
     # --- STOCK BREAKDOWN ---
     def get_stock_breakdown(self, low_stock_threshold=5):
@@ -145,94 +179,116 @@ class ManagerController:
         Returns stock breakdown by category
         Returns: dict of {category: {items, total_stock, low_stock}}
         """
-        products = self.get_all_products()
-        categories = {}
+        return reports.get_stock_by_category(low_stock_threshold)
 
-        for product in products:
-            pid, code, name, price, stock, cat, details = product
-            if cat not in categories:
-                categories[cat] = {"items": 0, "total_stock": 0, "low_stock": 0}
-            categories[cat]["items"] += 1
-            categories[cat]["total_stock"] += stock
-            if stock <= low_stock_threshold:
-                categories[cat]["low_stock"] += 1
+    def get_low_stock_products(self, threshold=5):
+        """
+        Returns active products with stock at or below threshold, lowest first
+        Returns: list of tuples [(product_id, code, name, stock_qty, category), ...]
+        """
+        return stock_ledger.get_low_stock_products(threshold)
 
-        return categories
+    def get_stock_page(self, category=None, search=None, after=None, limit=50):
+        """
+        Returns one page of the stock list
+        Returns: dict of {rows, next} (next is passed back as after for the following page)
+        """
+        return reports.get_stock_page(category, search, after, limit)
 
     # --- CUSTOMER ANALYSIS ---
-    def get_customer_breakdown(self, limit=20):
+    def get_customer_breakdown(self, limit=20, include_inactive=False):
         """
         Returns customer activity breakdown
         Returns: list of tuples [(customer_name, orders_count, total_spent), ...] sorted by total_spent
         """
-        customers = {}
-
-        # From sales
-        for sale in self.get_all_sales():
-            date, cust, item, qty, total, payment, bank = sale
-            if cust not in customers:
-                customers[cust] = {"orders": 0, "spent": 0}
-            customers[cust]["orders"] += 1
-            customers[cust]["spent"] += total
-
-        # From completed services
-        completed_services = self.get_completed_services()
-        for service in completed_services:
-            cust = service[1]  # full_name
-            if cust not in customers:
-                customers[cust] = {"orders": 0, "spent": 0}
-            customers[cust]["orders"] += 1
-            customers[cust]["spent"] += service[6]  # price
-
-        # Sort by total spent
-        sorted_customers = sorted(customers.items(), key=lambda x: x[1]["spent"], reverse=True)
-
-        # Return all if limit is None, otherwise return top N
-        if limit is None:
-            return [(cust, data["orders"], data["spent"]) for cust, data in sorted_customers]
-        else:
-            return [(cust, data["orders"], data["spent"]) for cust, data in sorted_customers[:limit]]
+        return reports.get_customer_activity(limit, include_inactive)
+
+    def get_customer_page(self, search=None, after=None, limit=50):
+        """
+        Returns one page of customer activity, registered customers included
+        Returns: dict of {rows, next, total} (total is only counted for the first page)
+        """
+        return reports.get_customer_activity_page(after, limit, search, include_inactive=True,
+                                                  with_total=after is None)
+
+    # --- SALES TRENDS ---
+    def get_sales_trends(self, days=365):
+        """
+        Returns daily / weekly / monthly totals, top products and customers and
+        the payment-method mix of the last days days (see analytics.get_dashboard_trends)
+        """
+        import analytics  # loads NumPy, so only when trends are asked for
+        return analytics.get_dashboard_trends(days)
 
     # --- PDF EXPORT ---
     def export_to_pdf(self, title, headers, data, filename):
-        """Generates a PDF report"""
+        """
+        Generates a PDF report.
+        data can be any iterable of rows (including a streaming generator); rows are
+        painted page by page, so memory use does not grow with the number of rows.
+        """
+        painter = QPainter()
         try:
             date_str = datetime.now().strftime("%B %d, %Y | %I:%M %p")
 
-            html = f"""
-            <div style="font-family: 'Segoe UI', Helvetica, sans-serif; padding: 20px; color: #334155;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #009688; margin: 0; padding: 0; font-size: 28px; font-weight: 800;">{title}</h1>
-                    <p style="color: #64748b; margin-top: 5px; font-size: 12px;">Generated on: {date_str}</p>
-                </div>
-                <table width="100%" cellpadding="10" cellspacing="0" style="border-collapse: collapse; border: 1px solid #e2e8f0;">
-                    <thead>
-                        <tr style="background-color: #f1f5f9; color: #1e293b;">
-            """
-
-            for h in headers:
-                html += f"<th align='left' style='padding: 12px; font-weight: 700; border-bottom: 2px solid #e2e8f0; font-size: 12px; text-transform: uppercase;'>{h}</th>"
-
-            html += "</tr></thead><tbody>"
+            writer = QPdfWriter(filename)
+            writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+            writer.setPageMargins(QMarginsF(12, 12, 12, 12), QPageLayout.Unit.Millimeter)
+            writer.setResolution(96)
+
+            if not painter.begin(writer):
+                return False, f"Could not write to {filename}"
+
+            width = writer.width()
+            height = writer.height()
+            col_w = width / max(1, len(headers))
+            row_h = 30
+            pad = 8
+
+            title_font = QFont("Segoe UI", 20, QFont.Weight.Bold)
+            small_font = QFont("Segoe UI", 8)
+            header_font = QFont("Segoe UI", 8, QFont.Weight.Bold)
+            cell_font = QFont("Segoe UI", 9)
+            cell_metrics = QFontMetrics(cell_font)
+            align = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+            def draw_header(y):
+                painter.fillRect(QRectF(0, y, width, row_h), QColor("#f1f5f9"))
+                painter.setPen(QColor("#1e293b"))
+                painter.setFont(header_font)
+                for c, h in enumerate(headers):
+                    painter.drawText(QRectF(c * col_w + pad, y, col_w - 2 * pad, row_h), align, str(h).upper())
+                painter.fillRect(QRectF(0, y + row_h - 2, width, 2), QColor("#e2e8f0"))
+                painter.setFont(cell_font)
+                return y + row_h
+
+            # Title block on the first page
+            painter.setPen(QColor("#009688"))
+            painter.setFont(title_font)
+            painter.drawText(QRectF(0, 0, width, 40), Qt.AlignmentFlag.AlignCenter, title)
+            painter.setPen(QColor("#64748b"))
+            painter.setFont(small_font)
+            painter.drawText(QRectF(0, 40, width, 20), Qt.AlignmentFlag.AlignCenter, f"Generated on: {date_str}")
+            y = draw_header(80)
 
             for i, row in enumerate(data):
-                bg_color = "#ffffff" if i % 2 == 0 else "#f8fafc"
-                html += f"<tr style='background-color: {bg_color};'>"
-                for v in row:
-                    html += f"<td style='padding: 12px; border-bottom: 1px solid #f1f5f9; color: #334155; font-size: 13px;'>{str(v)}</td>"
-                html += "</tr>"
-
-            html += "</tbody></table></div>"
-
-            doc = QTextDocument()
-            doc.setHtml(html)
-            printer = QPrinter()
-            printer.setOutputFormat(QPrinter.OutputFormat.PdfFormat)
-            printer.setOutputFileName(filename)
-            doc.print(printer)
-
+                if y + row_h > height:
+                    writer.newPage()
+                    y = draw_header(0)
+
+                painter.fillRect(QRectF(0, y, width, row_h), QColor("#ffffff" if i % 2 == 0 else "#f8fafc"))
+                painter.setPen(QColor("#334155"))
+                for c, v in enumerate(row):
+                    text = cell_metrics.elidedText(str(v), Qt.TextElideMode.ElideRight, int(col_w - 2 * pad))
+                    painter.drawText(QRectF(c * col_w + pad, y, col_w - 2 * pad, row_h), align, text)
+                painter.fillRect(QRectF(0, y + row_h - 1, width, 1), QColor("#f1f5f9"))
+                y += row_h
+
+            painter.end()
             return True, f"Exported to {filename}"
         except Exception as e:
+            if painter.isActive():
+                painter.end()
             return False, str(e)
 
     # --- LOGOUT ---
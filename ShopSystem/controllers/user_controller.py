@@ -1,5 +1,7 @@
 import re
+import uuid
 import database
+import reservations
 from PyQt6.QtCore import QDateTime
 
 
@@ -10,30 +12,40 @@ class UserController:
         self.username = username
         self.full_name = full_name
         self.cart = []
+        self.cart_id = uuid.uuid4().hex  # owner of this session's stock reservations
+        self.checkout_key = None  # idempotency key of the current cart's checkout
 
     # --- PRODUCT OPERATIONS ---
     def get_all_products(self, category=None, search=None):
-        """Returns all available products with filtering"""
-        return database.get_products(category, search)
+        """Returns all available products with filtering; stock is what's left after active holds"""
+        if search:
+            return reservations.apply_holds(database.search_products(search, category))
+        return reservations.apply_holds(database.get_products(category))
 
     def get_categories(self):
         """Returns all product categories"""
         return database.get_categories()
 
     # --- CART OPERATIONS ---
-    def add_to_cart(self, code, name, price, max_stock, qty):
-        """Adds items to cart with stock validation"""
+    # Cart quantities are held in stock_reservations (see reservations.py) so
+    # other customers can't buy them before this cart checks out.
+    def add_to_cart(self, code, name, price, qty):
+        """Adds items to cart, reserving the stock for them"""
         if qty <= 0:
             return False, "Invalid quantity"
 
+        item = next((i for i in self.cart if i['code'] == code), None)
+        in_cart = item['qty'] if item else 0
+        ok, available = reservations.reserve(self.cart_id, code, in_cart + qty)
+        if not ok:
+            return False, self._stock_message(available, in_cart)
+
+        self.checkout_key = None  # different cart, different order
         # Check if item already in cart
-        for item in self.cart:
-            if item['code'] == code:
-                if item['qty'] + qty > max_stock:
-                    return False, f"Stock limit reached. You have {item['qty']} in cart."
-                item['qty'] += qty
-                item['total'] = item['qty'] * item['price']
-                return True, f"Updated quantity to {item['qty']}"
+        if item:
+            item['qty'] += qty
+            item['total'] = item['qty'] * item['price']
+            return True, f"Updated quantity to {item['qty']}"
 
         # Add new item
         self.cart.append({
@@ -45,25 +57,35 @@ class UserController:
         })
         return True, f"Added {qty} x {name}"
 
-    def update_cart_quantity(self, code, new_qty, max_stock):
+    def update_cart_quantity(self, code, new_qty):
         """Updates quantity of an item in cart"""
         if new_qty <= 0:
             return self.remove_from_cart(code)
 
-        if new_qty > max_stock:
-            return False, f"Cannot exceed stock limit of {max_stock}"
-
         for item in self.cart:
             if item['code'] == code:
+                ok, available = reservations.reserve(self.cart_id, code, new_qty)
+                if not ok:
+                    return False, self._stock_message(available, item['qty'])
                 item['qty'] = new_qty
                 item['total'] = item['qty'] * item['price']
+                self.checkout_key = None
                 return True, "Quantity updated"
 
         return False, "Item not found in cart"
 
+    def _stock_message(self, available, in_cart):
+        if available is None:
+            return "Could not reserve stock, please try again"
+        if in_cart:
+            return f"Stock limit reached. You have {in_cart} in cart, {max(available - in_cart, 0)} more available."
+        return f"Only {available} left in stock"
+
     def remove_from_cart(self, code):
         """Removes an item from cart"""
+        reservations.reserve(self.cart_id, code, 0)
         self.cart = [item for item in self.cart if item['code'] != code]
+        self.checkout_key = None
         return True, "Item removed"
 
     def get_cart_items(self):
@@ -76,7 +98,10 @@ class UserController:
 
     def clear_cart(self):
         """Empties the shopping cart"""
+        if self.cart:
+            reservations.release(self.cart_id)
         self.cart = []
+        self.checkout_key = None
         return True, "Cart cleared"
 
     # --- CHECKOUT ---
@@ -93,15 +118,28 @@ class UserController:
         receipt_items = list(self.cart)
         grand_total = sum(i['total'] for i in receipt_items)
 
-        result = database.checkout_cart(self.username, self.cart, payment_method, bank_name, account_number)
+        # Retrying after a failure reuses the key, so a checkout that did commit
+        # (reply lost) is not charged again
+        if self.checkout_key is None:
+            self.checkout_key = uuid.uuid4().hex
+        result = database.checkout_cart(self.username, self.cart, payment_method, bank_name, account_number,
+                                        cart_id=self.cart_id, idempotency_key=self.checkout_key)
 
         if result == "Success":
             timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm AP")
+            receipt_text = self._format_receipt(timestamp, payment_method, bank_name, account_number,
+                                                receipt_items, grand_total)
+            self.cart = []
+            self.checkout_key = None
+            return True, "Checkout successful", receipt_text
+        else:
+            return False, f"Checkout Failed: {result}", None
 
-            line = "-" * 40
-            dbl_line = "=" * 40
+    def _format_receipt(self, timestamp, payment_method, bank_name, account_number, items, grand_total):
+        line = "-" * 40
+        dbl_line = "=" * 40
 
-            receipt_text = f"""
+        receipt_text = f"""
 {dbl_line}
             OFFICIAL RECEIPT
 {dbl_line}
@@ -110,37 +148,44 @@ Customer: {self.full_name}
 Payment:  {payment_method}
 """
 
-            if payment_method == "Bank Transfer":
-                receipt_text += f"Bank:     {bank_name}\nAccount:  {account_number}\n"
+        if payment_method == "Bank Transfer":
+            receipt_text += f"Bank:     {bank_name}\nAccount:  {account_number}\n"
 
-            receipt_text += f"""
+        receipt_text += f"""
 {line}
 {'ITEM':<18} {'QTY':>3} {'PRICE':>7} {'TOTAL':>8}
 {line}
 """
-            for item in receipt_items:
-                name = item['name'][:16] + ".." if len(item['name']) > 18 else item['name']
-                qty = item['qty']
-                price = item['price']
-                total = item['total']
-                receipt_text += f"{name:<18} {qty:>3} {price:>7.0f} {total:>8.0f}\n"
-
-            receipt_text += f"""
+        for item in items:
+            name = item['name'][:16] + ".." if len(item['name']) > 18 else item['name']
+            qty = item['qty']
+            price = item['price']
+            total = item['total']
+            receipt_text += f"{name:<18} {qty:>3} {price:>7.0f} {total:>8.0f}\n"
+
+        receipt_text += f"""
 {line}
 GRAND TOTAL: {'₱' + f'{grand_total:,.2f}':>24}
 {dbl_line}
        THANK YOU FOR SHOPPING!
 {dbl_line}
 """
-            self.cart = []
-            return True, "Checkout successful", receipt_text
-        else:
-            return False, f"Checkout Failed: {result}", None
+        return receipt_text
 
     # --- ORDER HISTORY ---
-    def get_order_history(self):
-        """Returns user's purchase history"""
-        return database.get_user_sales(self.username)
+    def get_orders(self):
+        """Returns user's orders (one row per checkout)"""
+        return database.get_customer_orders(self.username)
+
+    def reprint_receipt(self, order_id):
+        """Rebuilds the receipt of one of this user's orders"""
+        order = database.get_order(order_id)
+        if not order or order['customer_id'] != self.user_id:
+            return False, "Order not found", None
+        timestamp = order['order_date'].strftime("%Y-%m-%d %I:%M %p")
+        receipt_text = self._format_receipt(timestamp, order['payment_method'], order['bank_name'],
+                                            order['account_number'], order['lines'], order['total'])
+        return True, "Receipt reprinted", receipt_text
 
     # --- SERVICE BOOKING ---
     def book_service(self, service_type, scheduled_date, description):
@@ -180,6 +225,5 @@ GRAND TOTAL: {'₱' + f'{grand_total:,.2f}':>24}
 
     # --- LOGOUT ---
     def logout(self):
-        """Returns to login screen"""
-        # Will be handled by view
-        pass
\ No newline at end of file
+        """Releases the cart's stock reservations (the view returns to the login screen)"""
+        self.clear_cart()
\ No newline at end of file
@@ -1,7 +1,22 @@
-import mysql.connector
-import bcrypt
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+import auth
+import metrics
+import migrations
+import db_backends
+from cache import TTLCache
+from db_pool import ConnectionPool
+from query_stats import QueryStats, TimedConnection
+from search_index import TrigramIndex, MIN_TERM_LENGTH
 
 # --- CONFIGURATION ---
+# Database engine: "mysql" (server, db_config) or "sqlite" (embedded file, sqlite_config)
+db_engine = "mysql"
+
 db_config = {
     "host": "localhost",
     "user": "root",
@@ -9,27 +24,194 @@ db_config = {
     "database": "Computerpartsandservices"
 }
 
+sqlite_config = {
+    "path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "computerpartsandservices.db"),
+    "busy_timeout": 5.0
+}
+
+# Connection pool settings (seconds for timeouts/intervals)
+pool_config = {
+    "size": 5,
+    "checkout_timeout": 5.0,
+    "health_check_interval": 30.0
+}
+
+# Read-through cache for catalog queries (get_products / get_categories)
+cache_config = {
+    "catalog_size": 256,
+    "catalog_ttl": 30.0
+}
+
+# In-memory product search index; rebuilt from the database when older than
+# max_age seconds so products added by other clients show up
+search_index_config = {
+    "max_age": 300.0,
+    "fuzzy_threshold": 0.5
+}
+
+# Per-function / per-statement timing; statements slower than slow_query_ms
+# go to a rotating log file (parameter types only, never values)
+stats_config = {
+    "enabled": True,
+    "slow_query_ms": 200.0,
+    "slow_log_path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_queries.log"),
+    "max_bytes": 1_000_000,
+    "backup_count": 3
+}
+
+# Deadlocks and lock wait timeouts in checkout_cart: up to attempts tries, sleeping
+# a random 0..min(max_delay, base_delay * 2**n) seconds before try n + 1
+retry_config = {
+    "attempts": 4,
+    "base_delay": 0.005,
+    "max_delay": 0.2
+}
+
+_backend = None
+_pool = None
+_pool_lock = threading.Lock()
+catalog_cache = TTLCache(maxsize=cache_config["catalog_size"], ttl=cache_config["catalog_ttl"])
+product_index = TrigramIndex(fuzzy_threshold=search_index_config["fuzzy_threshold"])
+_index_lock = threading.Lock()
+db_stats = QueryStats(slow_query_ms=stats_config["slow_query_ms"], slow_log_path=stats_config["slow_log_path"],
+                      max_bytes=stats_config["max_bytes"], backup_count=stats_config["backup_count"])
+db_stats.enabled = stats_config["enabled"]
+instrumented = db_stats.instrument
+
+
+def get_backend():
+    """Returns the backend for db_engine (see db_backends)"""
+    global _backend
+    if _backend is None:
+        with _pool_lock:
+            if _backend is None:
+                options = sqlite_config if db_engine == "sqlite" else db_config
+                _backend = db_backends.create_backend(db_engine, **options)
+    return _backend
+
+
+def configure(engine, **options):
+    """
+    Switches to another database engine, e.g. configure("sqlite", path="bench.db").
+    Options override sqlite_config / db_config. Closes the pool and drops cached data.
+    """
+    global db_engine, _backend
+    close_pool()
+    config = sqlite_config if engine == "sqlite" else db_config
+    config.update(options)
+    db_engine = engine
+    _backend = db_backends.create_backend(engine, **config)
+    invalidate_catalog_cache()
+    rebuild_product_index()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        backend = get_backend()
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    backend.connect,
+                    size=pool_config["size"],
+                    checkout_timeout=pool_config["checkout_timeout"],
+                    health_check_interval=pool_config["health_check_interval"])
+    return _pool
+
 
 def get_connection():
-    return mysql.connector.connect(**db_config)
+    """Borrows a connection from the pool; conn.close() returns it"""
+    if not db_stats.enabled:
+        return _get_pool().acquire()
+    start = time.perf_counter()
+    conn = _get_pool().acquire()
+    db_stats.record_acquire(time.perf_counter() - start)
+    return TimedConnection(db_stats, conn)
+
+
+def get_pool_stats():
+    """Returns connection pool usage counters"""
+    return _get_pool().stats()
+
+
+def get_cache_stats():
+    """Returns catalog cache hit/miss counters"""
+    return catalog_cache.stats()
+
+
+def get_query_stats():
+    """Returns per-function, per-statement and per-source timing counters (see query_stats)"""
+    return db_stats.snapshot()
+
+
+def reset_query_stats():
+    """Zeroes the timing counters, e.g. before measuring one screen"""
+    db_stats.reset()
+
+
+def invalidate_catalog_cache():
+    """Drops cached catalog results; called by every write that changes products"""
+    catalog_cache.invalidate()
+
+
+def close_pool():
+    """Closes all idle pooled connections (e.g. on application exit)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
 
 
 def hash_password(password):
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt (on the auth pool, with the calibrated cost)"""
+    return auth.hash_password(password)
 
 
 def verify_password(password, hashed):
     """Verify a password against a hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    return auth.verify_password(password, hashed)
 
 
-def initialize_db():
+def _store_password_hash(user_id, old_hash, new_hash):
+    """Replaces a stored hash unless the password changed in the meantime"""
+    conn = None
     try:
-        conn = mysql.connector.connect(host=db_config["host"], user=db_config["user"], password=db_config["password"])
+        conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config['database']}")
-        conn.close()
+        cursor.execute("UPDATE users SET password = %s WHERE user_id = %s AND password = %s",
+                       (new_hash, user_id, old_hash))
+        conn.commit()
+    except Exception as e:
+        print("Rehash Error:", e)
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def is_schema_current():
+    """Single cheap query used at startup to decide whether any DDL is needed"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        return migrations.get_schema_version(cursor) >= migrations.LATEST_VERSION
+    except Exception:
+        # Missing database or schema_version table: run the full initialization
+        return False
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def initialize_db():
+    if is_schema_current():
+        return
+
+    try:
+        get_backend().create_database()
 
         conn = get_connection()
         cursor = conn.cursor()
@@ -61,7 +243,8 @@ def initialize_db():
             )
         """)
 
-        # Sales table (enhanced)
+        # Sales table (one row per cart line; replaced by orders / order_lines in migration 4
+        # and no longer written, kept so older databases can be migrated)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sales (
                 sale_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -126,13 +309,15 @@ def initialize_db():
                 ('user', hashed_pw))
 
         conn.commit()
+
+        migrations.run_migrations(conn, get_backend())
         print("Database initialized successfully.")
 
     except Exception as e:
         print(f"DB Init Error: {e}")
     finally:
         try:
-            if 'conn' in locals() and conn.is_connected():
+            if 'conn' in locals():
                 cursor.close()
                 conn.close()
         except:
@@ -140,6 +325,7 @@ def initialize_db():
 
 
 # --- USER OPERATIONS ---
+@instrumented
 def check_login(username, password):
     conn = None
     try:
@@ -148,39 +334,55 @@ def check_login(username, password):
         cursor.execute("SELECT user_id, role, full_name, username, password FROM users WHERE username = %s",
                        (username,))
         user = cursor.fetchone()
+        # bcrypt takes a few hundred ms; don't hold a pooled connection meanwhile
+        conn.close()
+        conn = None
         if user and verify_password(password, user[4]):
+            if auth.needs_rehash(user[4]):
+                # Bring the stored cost to this machine's target without delaying the login
+                user_id, old_hash = user[0], user[4]
+                auth.rehash_later(password, lambda new_hash: _store_password_hash(user_id, old_hash, new_hash))
             return (user[0], user[1], user[2], user[3])  # Return without password hash
         return None
     except Exception as e:
         print("Login Error:", e)
         return None
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def register_user(username, password, full_name, email, phone):
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT user_id FROM users WHERE username = %s", (username,))
-        if cursor.fetchone():
+        taken = cursor.fetchone()
+        conn.close()
+        conn = None
+        if taken:
             return False, "Username already taken"
 
         hashed_pw = hash_password(password)
+        conn = get_connection()
+        cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO users (username, password, full_name, email, phone, role) VALUES (%s, %s, %s, %s, %s, 'customer')",
             (username, hashed_pw, full_name, email, phone))
         conn.commit()
         return True, "Success"
     except Exception as e:
+        if get_backend().is_duplicate_key(e):
+            return False, "Username already taken"  # registered by someone else while hashing
         return False, str(e)
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def get_all_customers():
     """Get all customers (role = 'customer') from users table"""
     conn = None
@@ -193,12 +395,21 @@ def get_all_customers():
         print("Get All Customers Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
 # --- PRODUCT OPERATIONS ---
+@instrumented
 def get_products(category=None, search=None):
+    if category == "All":
+        category = None
+    key = ("products", category or None, search or None)
+    hit, rows = catalog_cache.get(key)
+    if hit:
+        return list(rows)
+
+    generation = catalog_cache.generation
     conn = None
     try:
         conn = get_connection()
@@ -218,30 +429,121 @@ def get_products(category=None, search=None):
         query += " ORDER BY code ASC"
 
         cursor.execute(query, params)
-        return cursor.fetchall() or []
+        rows = cursor.fetchall() or []
+        catalog_cache.set(key, tuple(rows), generation)
+        return rows
     except Exception as e:
         print("Get Products Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def get_categories():
+    hit, categories = catalog_cache.get(("categories",))
+    if hit:
+        return list(categories)
+
+    generation = catalog_cache.generation
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT DISTINCT category FROM products WHERE is_active = 1 ORDER BY category")
         rows = cursor.fetchall()
-        return [r[0] for r in rows] if rows else []
+        categories = [r[0] for r in rows] if rows else []
+        catalog_cache.set(("categories",), tuple(categories), generation)
+        return categories
     except Exception:
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
+            conn.close()
+
+
+def _get_product_index():
+    """Builds (or rebuilds a stale) product_index from the active products"""
+    with _index_lock:
+        built_at = product_index.built_at
+        if built_at is None or time.monotonic() - built_at > search_index_config["max_age"]:
+            conn = None
+            try:
+                conn = get_connection()
+                cursor = conn.cursor()
+                cursor.execute("SELECT product_id, code, name, category FROM products WHERE is_active = 1")
+                product_index.build(cursor.fetchall())
+            finally:
+                if conn:
+                    conn.close()
+    return product_index
+
+
+def rebuild_product_index():
+    """Drops the search index; the next search rebuilds it"""
+    product_index.clear()
+
+
+@instrumented
+def get_products_by_ids(product_ids, batch_size=1000):
+    """Returns active products for product_ids, in the same order as product_ids"""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        found = {}
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            cursor.execute(
+                "SELECT product_id, code, name, price, stock_qty, category, details FROM products "
+                f"WHERE is_active = 1 AND product_id IN ({', '.join(['%s'] * len(batch))})",
+                batch)
+            for row in cursor.fetchall():
+                found[row[0]] = row
+        return [found[pid] for pid in product_ids if pid in found]
+    except Exception as e:
+        print("Get Products Error:", e)
+        return []
+    finally:
+        if conn:
             conn.close()
 
 
+@instrumented
+def search_products(search, category=None, limit=None):
+    """
+    Product search backed by the trigram index: ids come from memory, rows
+    (with current stock) from a primary-key lookup. Results are ranked and
+    typo-tolerant (see search_index.TrigramIndex). Terms shorter than
+    MIN_TERM_LENGTH or containing LIKE wildcards use get_products.
+    """
+    if category == "All":
+        category = None
+    term = (search or "").strip()
+    if len(term) < MIN_TERM_LENGTH or any(c in term for c in "%_\\"):
+        return get_products(category, search)
+
+    key = ("search", category or None, term.casefold(), limit)
+    hit, rows = catalog_cache.get(key)
+    if hit:
+        return list(rows)
+
+    generation = catalog_cache.generation
+    try:
+        product_ids = _get_product_index().search(term, category or None, limit)
+    except Exception as e:
+        print("Search Index Error:", e)
+        return get_products(category, search)
+    rows = get_products_by_ids(product_ids)
+    catalog_cache.set(key, tuple(rows), generation)
+    return rows
+
+
+@instrumented
 def get_all_codes():
     conn = None
     try:
@@ -253,10 +555,11 @@ def get_all_codes():
     except Exception:
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def add_product(code, name, price, stock, category, details):
     conn = None
     try:
@@ -265,17 +568,22 @@ def add_product(code, name, price, stock, category, details):
         cursor.execute(
             "INSERT INTO products (code, name, price, stock_qty, category, details, is_active) VALUES (%s, %s, %s, %s, %s, %s, 1)",
             (code, name, price, stock, category, details))
+        product_id = cursor.lastrowid
+        _record_stock_movement(cursor, product_id, stock, "opening")
         conn.commit()
-    except mysql.connector.Error as err:
-        if err.errno == 1062:
+        invalidate_catalog_cache()
+        product_index.add(product_id, code, name, category)
+    except Exception as err:
+        if get_backend().is_duplicate_key(err):
             raise Exception(f"Product Code '{code}' is already taken.")
         else:
             raise err
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def restock_product(product_id, quantity):
     """Add stock to an existing product"""
     conn = None
@@ -285,19 +593,30 @@ def restock_product(product_id, quantity):
         cursor.execute(
             "UPDATE products SET stock_qty = stock_qty + %s WHERE product_id = %s AND is_active = 1",
             (quantity, product_id))
-        conn.commit()
-
         if cursor.rowcount == 0:
             raise Exception("Product not found or inactive")
+        _record_stock_movement(cursor, product_id, quantity, "restock")
+        conn.commit()
+        invalidate_catalog_cache()
 
     except Exception as e:
+        if conn: conn.rollback()
         print(f"Restock Error: {e}")
         raise e
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+def _record_stock_movement(cursor, product_id, delta, reason, order_id=None):
+    """Appends one stock_movements row with the stock after the change; call inside the writer's transaction"""
+    cursor.execute(
+        "INSERT INTO stock_movements (product_id, delta, balance_after, reason, order_id) "
+        "SELECT product_id, %s, stock_qty, %s, %s FROM products WHERE product_id = %s",
+        (delta, reason, order_id, product_id))
+
+
+@instrumented
 def delete_product(pid):
     conn = None
     try:
@@ -305,15 +624,57 @@ def delete_product(pid):
         cursor = conn.cursor()
         cursor.execute("UPDATE products SET is_active = 0 WHERE product_id = %s", (pid,))
         conn.commit()
+        invalidate_catalog_cache()
+        product_index.remove(pid)
     except Exception as e:
         print(f"Delete Error: {e}")
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
 # --- SALES OPERATIONS ---
-def checkout_cart(username, cart_items, payment_method, bank_name=None, account_number=None):
+@instrumented
+def checkout_cart(username, cart_items, payment_method, bank_name=None, account_number=None, cart_id=None,
+                  idempotency_key=None):
+    """
+    Checks out a whole cart in one transaction with a fixed number of round trips.
+    Lines covered by the cart's active stock reservations (see reservations.py)
+    were checked when they were reserved and are only converted; the other lines
+    lock their products (ordered by product_id so concurrent tills always lock
+    in the same order) and are checked against stock minus other carts' holds.
+    Stock is decremented with one guarded UPDATE, the order header, its lines
+    and their stock movements are written with three INSERTs and the cart's
+    holds are dropped.
+
+    idempotency_key (one per checkout attempt of a cart, see UserController) is
+    stored with the order: calling again with the same key after a lost reply
+    returns "Success" without charging twice. Deadlocks and lock wait timeouts
+    roll back and retry the transaction (retry_config).
+    """
+    attempts = retry_config["attempts"]
+    for attempt in range(attempts):
+        result, retryable = _checkout_once(username, cart_items, payment_method, bank_name, account_number,
+                                           cart_id, idempotency_key)
+        if not retryable or attempt == attempts - 1:
+            break
+        if metrics.enabled:
+            metrics.record_checkout_retry()
+        # Full jitter keeps the tills that just collided from colliding again
+        time.sleep(random.uniform(0, min(retry_config["max_delay"], retry_config["base_delay"] * 2 ** attempt)))
+    if metrics.enabled:
+        metrics.record_checkout(result)
+    return result
+
+
+def _find_order_by_key(cursor, idempotency_key):
+    cursor.execute("SELECT order_id FROM orders WHERE idempotency_key = %s", (idempotency_key,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _checkout_once(username, cart_items, payment_method, bank_name, account_number, cart_id, idempotency_key):
+    """One checkout transaction; returns (result, retryable)"""
     conn = None
     try:
         conn = get_connection()
@@ -324,98 +685,315 @@ def checkout_cart(username, cart_items, payment_method, bank_name=None, account_
         if not user_row:
             raise Exception("User not found")
         user_id, full_name = user_row
+        if idempotency_key and _find_order_by_key(cursor, idempotency_key) is not None:
+            return "Success", False  # replay of a checkout that already committed
 
+        # Total quantity requested per product code
+        wanted = {}
         for item in cart_items:
-            cursor.execute("SELECT product_id, stock_qty, name FROM products WHERE code = %s", (item['code'],))
-            prod_row = cursor.fetchone()
-            if not prod_row:
-                raise Exception(f"Product {item['code']} not found")
-            pid, stock, pname = prod_row
-            if stock < item['qty']:
-                raise Exception(f"Not enough stock for {pname}")
-            cursor.execute("UPDATE products SET stock_qty = stock_qty - %s WHERE product_id = %s", (item['qty'], pid))
-            total_price = item['price'] * item['qty']
+            wanted[item['code']] = wanted.get(item['code'], 0) + item['qty']
+        if not wanted:
+            raise Exception("Cart is empty")
+        codes = list(wanted)
+
+        held = {}
+        products = {}
+        if cart_id:
+            # Locks the cart's holds so the sweeper can't drop them halfway through
+            cursor.execute("SELECT product_id, quantity FROM stock_reservations "
+                           "WHERE cart_id = %s AND expires_at > NOW() FOR UPDATE", (cart_id,))
+            held = dict(cursor.fetchall())
+        if held:
+            cursor.execute(
+                f"SELECT product_id, code, stock_qty, name FROM products WHERE code IN ({', '.join(['%s'] * len(codes))})",
+                codes)
+            products = {code: (pid, stock, pname) for pid, code, stock, pname in cursor.fetchall()}
+        unreserved = [code for code in codes
+                      if code not in products or held.get(products[code][0], 0) < wanted[code]]
+
+        if unreserved:
+            placeholders = ", ".join(["%s"] * len(unreserved))
             cursor.execute(
-                "INSERT INTO sales (customer_id, full_name, product_id, quantity, total_price, payment_method, bank_name, account_number) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-                (user_id, full_name, pid, item['qty'], total_price, payment_method, bank_name, account_number))
+                f"SELECT product_id, code, stock_qty, name FROM products WHERE code IN ({placeholders}) "
+                f"ORDER BY product_id FOR UPDATE",
+                unreserved)
+            products.update({code: (pid, stock, pname) for pid, code, stock, pname in cursor.fetchall()})
+            for code in unreserved:
+                if code not in products:
+                    raise Exception(f"Product {code} not found")
+            pids = [products[code][0] for code in unreserved]
+            cursor.execute(
+                f"SELECT product_id, SUM(quantity) FROM stock_reservations WHERE product_id IN ({placeholders}) "
+                "AND expires_at > NOW() AND cart_id <> %s GROUP BY product_id",
+                pids + [cart_id or ""])
+            others = {pid: int(qty) for pid, qty in cursor.fetchall()}
+            for code in unreserved:
+                pid, stock, pname = products[code]
+                if stock - others.get(pid, 0) < wanted[code]:
+                    raise Exception(f"Not enough stock for {pname}")
+
+        # Single guarded decrement; the stock check in WHERE keeps it safe even without the lock
+        placeholders = ", ".join(["%s"] * len(codes))
+        case_sql = " ".join(["WHEN %s THEN %s"] * len(codes))
+        case_params = []
+        for code in codes:
+            case_params.extend([products[code][0], wanted[code]])
+        pids = [products[code][0] for code in codes]
+        cursor.execute(
+            f"UPDATE products SET stock_qty = stock_qty - CASE product_id {case_sql} END "
+            f"WHERE product_id IN ({placeholders}) AND stock_qty >= CASE product_id {case_sql} END",
+            case_params + pids + case_params)
+        if cursor.rowcount != len(codes):
+            raise Exception("Stock changed during checkout, please try again")
+        if cart_id:
+            cursor.execute("DELETE FROM stock_reservations WHERE cart_id = %s", (cart_id,))
+
+        total = sum(item['price'] * item['qty'] for item in cart_items)
+        units = sum(item['qty'] for item in cart_items)
+        cursor.execute(
+            "INSERT INTO orders (customer_id, full_name, payment_method, bank_name, account_number, item_count, "
+            "units, total_amount, idempotency_key) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            (user_id, full_name, payment_method, bank_name, account_number, len(cart_items), units, total,
+             idempotency_key))
+        order_id = cursor.lastrowid
+
+        rows_sql = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(cart_items))
+        params = []
+        for item in cart_items:
+            pid, stock, pname = products[item['code']]
+            params.extend([order_id, pid, pname, item['qty'], item['price'], item['price'] * item['qty']])
+        cursor.execute(
+            f"INSERT INTO order_lines (order_id, product_id, product_name, quantity, unit_price, line_total) "
+            f"VALUES {rows_sql}",
+            params)
+        # The products are locked by the UPDATE above, so stock_qty is each line's balance
+        cursor.execute(
+            f"INSERT INTO stock_movements (product_id, delta, balance_after, reason, order_id) "
+            f"SELECT product_id, -CASE product_id {case_sql} END, stock_qty, 'sale', %s "
+            f"FROM products WHERE product_id IN ({placeholders})",
+            case_params + [order_id] + pids)
+
+        _add_to_daily_rollup(cursor, revenue=total, orders=len(cart_items), units=units)
+
         conn.commit()
-        return "Success"
+        invalidate_catalog_cache()
+        return "Success", False
     except Exception as e:
         if conn: conn.rollback()
-        return str(e)
+        backend = get_backend()
+        if idempotency_key and backend.is_duplicate_key(e):
+            # The same checkout was submitted twice at once and the other one committed
+            try:
+                if _find_order_by_key(conn.cursor(), idempotency_key) is not None:
+                    return "Success", False
+            except Exception:
+                pass
+        return str(e), backend.is_retryable(e)
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def get_user_sales(username):
+    """One row per purchased line: (order_date, product_name, quantity, line_total, payment_method)"""
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT s.sale_date, p.name, s.quantity, s.total_price, s.payment_method
-            FROM sales s
-            JOIN users u ON s.customer_id = u.user_id
-            JOIN products p ON s.product_id = p.product_id
+            SELECT o.order_date, l.product_name, l.quantity, l.line_total, o.payment_method
+            FROM orders o
+            JOIN users u ON o.customer_id = u.user_id
+            JOIN order_lines l ON l.order_id = o.order_id
             WHERE u.username = %s
-            ORDER BY s.sale_date DESC
+            ORDER BY o.order_date DESC, o.order_id DESC, l.line_id
         """, (username,))
         return cursor.fetchall() or []
     except Exception as e:
         print("User Sales Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+# Sales report rows, one per order line (get_all_sales / iter_all_sales)
+ALL_SALES_QUERY = """
+    SELECT o.order_date, o.full_name, l.product_name, l.quantity, l.line_total, o.payment_method, o.bank_name
+    FROM orders o
+    JOIN order_lines l ON l.order_id = o.order_id
+    ORDER BY o.order_date DESC, o.order_id DESC, l.line_id
+"""
+
+
+@instrumented
 def get_all_sales():
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT s.sale_date, s.full_name, p.name, s.quantity, s.total_price, s.payment_method, s.bank_name
-            FROM sales s
-            JOIN products p ON s.product_id = p.product_id
-            ORDER BY s.sale_date DESC
-        """)
+        cursor.execute(ALL_SALES_QUERY)
         return cursor.fetchall() or []
     except Exception as e:
         print("All Sales Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
+            conn.close()
+
+
+# --- ORDERS ---
+# Order-level rows: (order_id, order_date, full_name, item_count, units, total_amount, payment_method)
+ORDER_COLUMNS = "order_id, order_date, full_name, item_count, units, total_amount, payment_method"
+
+
+@instrumented
+def get_order(order_id):
+    """
+    One order with its lines (receipt reprint), read with a single join on the
+    order's primary key and idx_order_lines_order. Returns a dict or None.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT o.order_id, o.customer_id, o.full_name, o.order_date, o.payment_method, o.bank_name,
+                   o.account_number, o.total_amount, l.product_id, l.product_name, l.quantity, l.unit_price,
+                   l.line_total
+            FROM orders o
+            JOIN order_lines l ON l.order_id = o.order_id
+            WHERE o.order_id = %s
+            ORDER BY l.line_id
+        """, (order_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+        first = rows[0]
+        return {
+            "order_id": first[0], "customer_id": first[1], "full_name": first[2], "order_date": first[3],
+            "payment_method": first[4], "bank_name": first[5], "account_number": first[6], "total": first[7],
+            "lines": [{"product_id": r[8], "name": r[9], "qty": r[10], "price": r[11], "total": r[12]}
+                      for r in rows],
+        }
+    except Exception as e:
+        print("Get Order Error:", e)
+        return None
+    finally:
+        if conn:
             conn.close()
 
 
+def _get_orders(where, params, limit, label):
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        query = f"SELECT {ORDER_COLUMNS} FROM orders WHERE {where} ORDER BY order_date DESC, order_id DESC"
+        if limit:
+            query += " LIMIT %s"
+            params = list(params) + [limit]
+        cursor.execute(query, params)
+        return cursor.fetchall() or []
+    except Exception as e:
+        print(f"{label} Error:", e)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_customer_orders(username, limit=None):
+    """A customer's orders, newest first (idx_orders_customer_date)"""
+    return _get_orders("customer_id = (SELECT user_id FROM users WHERE username = %s)", [username], limit,
+                       "Customer Orders")
+
+
+@instrumented
+def get_orders_by_day(day, limit=None):
+    """Orders placed on one date, newest first (range on idx_orders_date)"""
+    return _get_orders("order_date >= %s AND order_date < %s", [day, day + timedelta(days=1)], limit,
+                       "Orders By Day")
+
+
+@instrumented
+def get_orders_by_payment_method(payment_method, start=None, end=None, limit=None):
+    """Orders paid with payment_method, optionally in [start, end) (idx_orders_payment_date)"""
+    where, params = "payment_method = %s", [payment_method]
+    if start is not None:
+        where += " AND order_date >= %s"
+        params.append(start)
+    if end is not None:
+        where += " AND order_date < %s"
+        params.append(end)
+    return _get_orders(where, params, limit, "Orders By Payment")
+
+
 # --- STATS ---
+@instrumented
 def get_stats():
+    """Dashboard totals; revenue and order count come from the daily rollup (one row per day)"""
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT SUM(total_price) FROM sales")
-        sales_rev = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT SUM(price) FROM completed_services")
-        svc_rev = cursor.fetchone()[0] or 0
-        total_rev = sales_rev + svc_rev
-        cursor.execute("SELECT COUNT(*) FROM sales")
-        cnt = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT SUM(stock_qty) FROM products WHERE is_active = 1")
-        stk = cursor.fetchone()[0] or 0
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'customer'")
-        custs = cursor.fetchone()[0] or 0
-        return total_rev, cnt, stk, custs
+        cursor.execute("""
+            SELECT
+                (SELECT COALESCE(SUM(revenue + service_revenue), 0) FROM daily_sales_rollup),
+                (SELECT COALESCE(SUM(order_count), 0) FROM daily_sales_rollup),
+                (SELECT COALESCE(SUM(stock_qty), 0) FROM products WHERE is_active = 1),
+                (SELECT COUNT(*) FROM users WHERE role = 'customer')
+        """)
+        total_rev, cnt, stk, custs = cursor.fetchone()
+        return total_rev, int(cnt), int(stk), custs
     except Exception:
         return 0, 0, 0, 0
     finally:
-        if conn and conn.is_connected():
+        if conn:
+            conn.close()
+
+
+# --- DAILY ROLLUP ---
+def _add_to_daily_rollup(cursor, revenue=0, orders=0, units=0, service_revenue=0, service_count=0):
+    """Adds today's deltas to daily_sales_rollup; call inside the writer's transaction"""
+    cursor.execute("""
+        INSERT INTO daily_sales_rollup (sale_day, revenue, order_count, units, service_revenue, service_count)
+        VALUES (CURDATE(), %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            revenue = revenue + VALUES(revenue),
+            order_count = order_count + VALUES(order_count),
+            units = units + VALUES(units),
+            service_revenue = service_revenue + VALUES(service_revenue),
+            service_count = service_count + VALUES(service_count)
+    """, (revenue, orders, units, service_revenue, service_count))
+
+
+@instrumented
+def rebuild_daily_rollup():
+    """Recomputes daily_sales_rollup from orders and completed_services (backfill / repair)"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM daily_sales_rollup")
+        for statement in migrations.DAILY_ROLLUP_BACKFILL:
+            cursor.execute(statement)
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) FROM daily_sales_rollup")
+        return cursor.fetchone()[0]
+    except Exception as e:
+        print("Rebuild Rollup Error:", e)
+        if conn: conn.rollback()
+        raise e
+    finally:
+        if conn:
             conn.close()
 
 
 # --- SERVICE OPERATIONS ---
+@instrumented
 def book_service(username, service_type, description, price):
     conn = None
     try:
@@ -433,10 +1011,11 @@ def book_service(username, service_type, description, price):
         print("Book Service Error:", e)
         raise e
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def get_all_services_joined():
     conn = None
     try:
@@ -449,10 +1028,11 @@ def get_all_services_joined():
         print("All Services Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def get_user_services(username):
     conn = None
     try:
@@ -470,10 +1050,11 @@ def get_user_services(username):
         print("User Services Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def delete_service(sid):
     conn = None
     try:
@@ -484,10 +1065,11 @@ def delete_service(sid):
     except Exception:
         pass
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def move_service_to_completed(service_id):
     conn = None
     try:
@@ -503,6 +1085,7 @@ def move_service_to_completed(service_id):
                 "INSERT INTO completed_services (customer_id, full_name, service_type, description, started_at, price) VALUES (%s, %s, %s, %s, %s, %s)",
                 (cust_id, full_name, svc_type, desc, start_date, price))
             cursor.execute("DELETE FROM services WHERE service_id = %s", (service_id,))
+            _add_to_daily_rollup(cursor, service_revenue=price, service_count=1)
             conn.commit()
             return True
         return False
@@ -511,17 +1094,18 @@ def move_service_to_completed(service_id):
         if conn: conn.rollback()
         return False
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
+@instrumented
 def update_service_status(sid, status):
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
         if status == "Completed":
-            if conn and conn.is_connected(): conn.close()
+            conn.close()
             move_service_to_completed(sid)
         else:
             cursor.execute("UPDATE services SET status = %s WHERE service_id = %s", (status, sid))
@@ -529,48 +1113,168 @@ def update_service_status(sid, status):
     except Exception as e:
         print("Update Status Error:", e)
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
-def get_completed_services(limit=None, offset=None):
+@instrumented
+def get_completed_services():
+    """Every completed service, newest first; page with get_completed_services_page"""
     conn = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
-
-        query = """
+        cursor.execute("""
             SELECT completed_id, full_name, service_type, description, started_at, completed_at, price
             FROM completed_services
-            ORDER BY completed_at DESC
-        """
-
-        if limit is not None and offset is not None:
-            query += f" LIMIT {limit} OFFSET {offset}"
-
-        cursor.execute(query)
+            ORDER BY completed_at DESC, completed_id DESC
+        """)
         return cursor.fetchall() or []
     except Exception as e:
         print("Completed Services Error:", e)
         return []
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
-def get_completed_services_count():
+# --- STREAMING READS ---
+STREAM_BATCH_SIZE = 1000
+
+
+def _stream_query(query, params=(), batch_size=STREAM_BATCH_SIZE, label="Stream"):
+    """
+    Yields lists of at most batch_size rows from an unbuffered cursor, so the
+    driver never materializes the whole result set. The pooled connection is
+    held until the generator is exhausted or closed.
+    """
     conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    except Exception as e:
+        print(f"{label} Error:", e)
+    finally:
+        if conn:
+            try:
+                # Drain anything left unread (caller stopped early) before returning the connection
+                conn.consume_results()
+            except Exception:
+                pass
+            conn.close()
+
+
+@instrumented
+def iter_all_sales(batch_size=STREAM_BATCH_SIZE):
+    """Streaming variant of get_all_sales(); yields row batches"""
+    return _stream_query(ALL_SALES_QUERY, batch_size=batch_size, label="Stream Sales")
+
+
+@instrumented
+def iter_all_customers(batch_size=STREAM_BATCH_SIZE):
+    """Streaming variant of get_all_customers(); yields row batches"""
+    return _stream_query(
+        "SELECT full_name, email, phone FROM users WHERE role = 'customer' ORDER BY full_name",
+        batch_size=batch_size, label="Stream Customers")
+
+
+@instrumented
+def iter_completed_services(batch_size=STREAM_BATCH_SIZE):
+    """Streaming variant of get_completed_services(); yields row batches"""
+    return _stream_query("""
+        SELECT completed_id, full_name, service_type, description, started_at, completed_at, price
+        FROM completed_services
+        ORDER BY completed_at DESC, completed_id DESC
+    """, batch_size=batch_size, label="Stream Completed Services")
+
+
+def encode_history_cursor(completed_at, completed_id):
+    """Builds an opaque page token from a completed_services sort key"""
+    return f"{completed_at.isoformat()}|{completed_id}"
+
+
+def decode_history_cursor(token):
+    completed_at, completed_id = token.rsplit("|", 1)
+    return datetime.fromisoformat(completed_at), int(completed_id)
+
+
+@instrumented
+def get_completed_services_page(cursor_token=None, direction="next", limit=10, with_total=False):
+    """
+    Keyset pagination over completed services, newest first.
+    - cursor_token: token from a previous page (None = first page)
+    - direction: "next" for rows after the token, "prev" for rows before it
+    Returns dict: rows, next (token or None), prev (token or None), total (approximate, or None)
+    Every page is an index range scan on (completed_at, completed_id), so page 5000 costs the same as page 1.
+    """
+    conn = None
+    result = {"rows": [], "next": None, "prev": None, "total": None}
     try:
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM completed_services")
-        return cursor.fetchone()[0] or 0
-    except Exception:
-        return 0
+
+        query = """
+            SELECT completed_id, full_name, service_type, description, started_at, completed_at, price
+            FROM completed_services
+        """
+        params = []
+
+        if cursor_token is None:
+            query += " ORDER BY completed_at DESC, completed_id DESC"
+        else:
+            at, cid = decode_history_cursor(cursor_token)
+            if direction == "prev":
+                query += " WHERE completed_at > %s OR (completed_at = %s AND completed_id > %s)"
+                query += " ORDER BY completed_at ASC, completed_id ASC"
+            else:
+                query += " WHERE completed_at < %s OR (completed_at = %s AND completed_id < %s)"
+                query += " ORDER BY completed_at DESC, completed_id DESC"
+            params.extend([at, at, cid])
+
+        # One extra row tells us whether another page exists in that direction
+        query += " LIMIT %s"
+        params.append(int(limit) + 1)
+
+        cursor.execute(query, params)
+        rows = cursor.fetchall() or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if cursor_token is not None and direction == "prev":
+            rows.reverse()
+            has_before, has_after = has_more, True
+        else:
+            has_before, has_after = cursor_token is not None, has_more
+
+        if rows:
+            if has_before:
+                result["prev"] = encode_history_cursor(rows[0][5], rows[0][0])
+            if has_after:
+                result["next"] = encode_history_cursor(rows[-1][5], rows[-1][0])
+        result["rows"] = rows
+
+        if with_total:
+            # Optimizer statistics instead of COUNT(*) where the engine has them
+            result["total"] = get_backend().estimate_rows(cursor, "completed_services")
+
+        return result
+    except Exception as e:
+        print("Completed Services Page Error:", e)
+        return result
     finally:
-        if conn and conn.is_connected():
+        if conn:
             conn.close()
 
 
 if __name__ == "__main__":
-    initialize_db()
\ No newline at end of file
+    import sys
+
+    initialize_db()
+    if "--rebuild-rollup" in sys.argv:
+        print(f"Daily rollup rebuilt: {rebuild_daily_rollup()} days")
\ No newline at end of file
@@ -0,0 +1,273 @@
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+# SQL in database.py, reports.py and migrations.py is written in MySQL's dialect
+# with %s placeholders. A backend opens raw DB-API connections for the pool and,
+# where the engine differs, rewrites statements and classifies errors.
+
+
+class MySQLBackend:
+    """MySQL server through mysql.connector (the reference dialect: no rewriting)"""
+    name = "mysql"
+
+    def __init__(self, host="localhost", user="root", password="", database="Computerpartsandservices", **options):
+        self.config = dict(host=host, user=user, password=password, database=database, **options)
+
+    def connect(self):
+        import mysql.connector
+        return mysql.connector.connect(**self.config)
+
+    def create_database(self):
+        import mysql.connector
+        config = {k: v for k, v in self.config.items() if k != "database"}
+        conn = mysql.connector.connect(**config)
+        try:
+            conn.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {self.config['database']}")
+        finally:
+            conn.close()
+
+    def is_duplicate_key(self, err):
+        return getattr(err, "errno", None) == 1062
+
+    def is_retryable(self, err):
+        """True when the transaction was rolled back by lock contention and can simply run again"""
+        return getattr(err, "errno", None) in (
+            1205,  # lock wait timeout exceeded
+            1213,  # deadlock found when trying to get lock
+        )
+
+    def is_already_applied(self, err):
+        """True for DDL errors meaning the statement already ran (migrations)"""
+        return getattr(err, "errno", None) in (
+            1050,  # table already exists
+            1060,  # duplicate column name
+            1061,  # duplicate key name
+        )
+
+    def estimate_rows(self, cursor, table):
+        """Approximate row count from optimizer statistics (constant time)"""
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (self.config["database"], table))
+        row = cursor.fetchone()
+        return int(row[0] or 0) if row else 0
+
+    def oldest_open_transaction(self, cursor):
+        """Start time of the oldest InnoDB transaction still open on another connection, or None"""
+        cursor.execute("SELECT MIN(trx_started) FROM information_schema.innodb_trx "
+                       "WHERE trx_mysql_thread_id <> CONNECTION_ID()")
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+
+# --- SQLITE ---
+def _adapt_datetime(value):
+    return value.isoformat(" ")
+
+
+def _convert_datetime(raw):
+    return datetime.fromisoformat(raw.decode())
+
+
+def _convert_date(raw):
+    return date.fromisoformat(raw.decode()[:10])
+
+
+def _convert_decimal(raw):
+    return Decimal(raw.decode()).quantize(Decimal("0.01"))
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DECIMAL", _convert_decimal)
+
+_LOCAL_NOW = "(datetime('now', 'localtime'))"
+
+# (pattern, replacement) applied in order to every statement
+_SQLITE_REWRITES = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bINT AUTO_INCREMENT PRIMARY KEY\b", re.I), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bDEFAULT CURRENT_TIMESTAMP\b", re.I), f"DEFAULT {_LOCAL_NOW}"),
+    (re.compile(r"\bDATE_ADD\(NOW\(\), INTERVAL \? SECOND\)", re.I), "datetime('now', 'localtime', ? || ' seconds')"),
+    (re.compile(r"\bCURDATE\(\)", re.I), "date('now', 'localtime')"),
+    (re.compile(r"\bNOW\(\)", re.I), "datetime('now', 'localtime')"),
+    (re.compile(r"\bVALUES\((\w+)\)", re.I), r"excluded.\1"),
+    (re.compile(r"<=>"), "IS"),
+    (re.compile(r"\s+FOR UPDATE\s*$", re.I), ""),
+]
+_FOR_UPDATE = re.compile(r"\bFOR UPDATE\s*$", re.I)
+_UPSERT = re.compile(r"\bON DUPLICATE KEY UPDATE\b", re.I)
+_INSERT_TABLE = re.compile(r"^\s*INSERT INTO (\w+)", re.I)
+
+
+class SQLiteCursor:
+    """DB-API cursor that accepts the MySQL-dialect statements used by this app"""
+
+    def __init__(self, backend, conn):
+        self._backend = backend
+        self._conn = conn
+        self._cursor = conn.cursor()
+
+    def execute(self, query, params=()):
+        sql, locking = self._backend.translate(query)
+        if locking and not self._conn.in_transaction:
+            # SELECT ... FOR UPDATE: take the database write lock up front instead of row locks
+            self._conn.execute("BEGIN IMMEDIATE")
+        self._cursor.execute(sql, tuple(params or ()))
+        return self
+
+    def executemany(self, query, seq_of_params):
+        sql, _ = self._backend.translate(query)
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+
+class SQLiteConnection:
+    """Gives a sqlite3 connection the parts of the mysql.connector API the app uses"""
+
+    def __init__(self, backend, raw):
+        self._backend = backend
+        self._raw = raw
+        self._closed = False
+
+    def cursor(self, buffered=None, **_):
+        # sqlite3 cursors always step through results lazily
+        return SQLiteCursor(self._backend, self._raw)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def consume_results(self):
+        pass
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self._raw.execute("SELECT 1").fetchone()
+
+    def is_connected(self):
+        return not self._closed
+
+    def close(self):
+        self._closed = True
+        self._raw.close()
+
+
+class SQLiteBackend:
+    """
+    Embedded SQLite database file for single-till installs, benchmarks and tests.
+    WAL journaling lets readers run while a checkout writes; SELECT ... FOR UPDATE
+    becomes BEGIN IMMEDIATE, which serializes writers the way row locks would.
+    """
+    name = "sqlite"
+
+    def __init__(self, path="computerpartsandservices.db", busy_timeout=5.0, synchronous="NORMAL", **_):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+
+    def connect(self):
+        raw = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute(f"PRAGMA synchronous = {self.synchronous}")
+        raw.execute("PRAGMA foreign_keys = ON")
+        return SQLiteConnection(self, raw)
+
+    def create_database(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+    def translate(self, query):
+        """Returns (sqlite_sql, takes_write_lock)"""
+        return _translate_sqlite(query)
+
+    def is_duplicate_key(self, err):
+        return isinstance(err, sqlite3.IntegrityError) and "UNIQUE" in str(err)
+
+    def is_retryable(self, err):
+        # busy_timeout ran out waiting for another writer
+        return isinstance(err, sqlite3.OperationalError) and "locked" in str(err)
+
+    def is_already_applied(self, err):
+        message = str(err)
+        return isinstance(err, sqlite3.OperationalError) and (
+            "already exists" in message or "duplicate column name" in message)
+
+    def estimate_rows(self, cursor, table):
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+    def oldest_open_transaction(self, cursor):
+        # One writer at a time: ids are committed in order, so no open transaction holds a lower one
+        return None
+
+
+@lru_cache(maxsize=512)
+def _translate_sqlite(query):
+    locking = bool(_FOR_UPDATE.search(query))
+    sql = query
+    match = _UPSERT.search(sql)
+    if match:
+        # ON DUPLICATE KEY UPDATE -> ON CONFLICT (<primary key>) DO UPDATE SET
+        table = _INSERT_TABLE.match(sql).group(1)
+        sql = sql[:match.start()] + f"ON CONFLICT ({_CONFLICT_KEYS[table]}) DO UPDATE SET" + sql[match.end():]
+    for pattern, replacement in _SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql, locking
+
+
+# Unique key an upsert conflicts on, per table (MySQL infers it, SQLite needs it spelled out)
+_CONFLICT_KEYS = {
+    "daily_sales_rollup": "sale_day",
+    "stock_reservations": "cart_id, product_id",
+}
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def create_backend(engine, **options):
+    """Builds the backend named engine ("mysql" or "sqlite") with its options"""
+    try:
+        return BACKENDS[engine](**options)
+    except KeyError:
+        raise ValueError(f"Unknown database engine '{engine}' (expected one of: {', '.join(BACKENDS)})")
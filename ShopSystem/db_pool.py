@@ -0,0 +1,180 @@
+import threading
+import time
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+    pass
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a driver connection borrowed from a ConnectionPool.
+    close() hands the connection back to the pool instead of closing the socket,
+    so existing code that does conn.close() in a finally block keeps working.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def is_connected(self):
+        if self._returned:
+            return False
+        return self._raw.is_connected()
+
+    def close(self):
+        if not self._returned:
+            self._returned = True
+            self._pool.release(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Fixed-size, thread-safe connection pool.
+    - size: maximum number of open connections
+    - checkout_timeout: seconds to wait for a free connection before PoolTimeoutError
+    - health_check_interval: idle seconds after which a connection is pinged before reuse
+    """
+
+    def __init__(self, connect, size=5, checkout_timeout=5.0, health_check_interval=30.0):
+        self._connect = connect
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.Condition()
+        self._idle = []  # list of (raw_connection, last_used_timestamp)
+        self._open = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+    def acquire(self):
+        """Borrow a connection, waiting up to checkout_timeout for one to be free"""
+        start = time.perf_counter()
+        deadline = start + self.checkout_timeout
+
+        with self._lock:
+            while True:
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    raw, last_used = None, None
+                    self._open += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.checkout_timeout}s "
+                        f"({self.size} in use)")
+                self._lock.wait(remaining)
+            self._in_use += 1
+
+        try:
+            if raw is not None and not self._is_healthy(raw, last_used):
+                self._close_quietly(raw)
+                with self._lock:
+                    self._discarded += 1
+                raw = None
+            if raw is None:
+                raw = self._connect()
+                with self._lock:
+                    self._created += 1
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Return a connection to the pool, discarding it if it is no longer usable"""
+        healthy = True
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._lock:
+            self._in_use -= 1
+            # After close_all() nothing borrows from or drains this pool again
+            keep = healthy and not self._closed
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._open -= 1
+                if not healthy:
+                    self._discarded += 1
+            self._lock.notify()
+
+        if not keep:
+            self._close_quietly(raw)
+
+    def _is_healthy(self, raw, last_used):
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Close every idle connection (borrowed ones are closed when returned)"""
+        with self._lock:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._open -= len(idle)
+        for raw, _ in idle:
+            self._close_quietly(raw)
+
+    def stats(self):
+        """Returns a snapshot of pool usage counters"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._wait_time / self._checkouts * 1000) if self._checkouts else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+            }
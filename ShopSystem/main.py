@@ -88,7 +88,7 @@ STYLESHEET = """
         border-bottom: 1px solid #ffffff;
     }
 
-    QTableWidget {
+    QTableView {
         background-color: #ffffff;
         alternate-background-color: #ffffff;
         border: none;
@@ -105,12 +105,12 @@ STYLESHEET = """
         font-size: 12px;
         letter-spacing: 0.5px;
     }
-    QTableWidget::item {
+    QTableView::item {
         padding-left: 10px;
         border-bottom: 1px solid #f1f5f9;
         color: #334155;
     }
-    QTableWidget::item:selected {
+    QTableView::item:selected {
         background-color: #009688;
         color: #ffffff;            
     }
@@ -120,22 +120,49 @@ if __name__ == "__main__":
     print("Starting application...")
 
     try:
+        # Optional field profiling (--profile [DIR] or SHOP_PROFILE)
+        import profiling
+        if profiling.enable_from_args(sys.argv):
+            print(f"Profiling to {profiling.run_directory}")
+
         # Initialize database FIRST
         import database
 
         print("Initializing database...")
-        database.initialize_db()
+        with profiling.profiled("initialize_db"):
+            database.initialize_db()
         print("Database initialized successfully!")
 
+        # Measure the bcrypt cost for this machine while the login window loads
+        import auth
+        auth.start_calibration()
+
         # Create app
         app = QApplication(sys.argv)
         app.setStyleSheet(STYLESHEET)
+        # Releases expired cart stock reservations in the background (stopped before the pool closes)
+        import reservations
+        reservations.start_sweeper()
+        app.aboutToQuit.connect(reservations.stop_sweeper)
+        # Stock ledger checkpoints keep as-of-date stock queries short
+        import stock_ledger
+        stock_ledger.start_checkpointer()
+        app.aboutToQuit.connect(stock_ledger.stop_checkpointer)
+        app.aboutToQuit.connect(database.close_pool)
+        app.aboutToQuit.connect(auth.shutdown)
+
+        # Optional Prometheus metrics (SHOP_METRICS_PORT / SHOP_METRICS_TEXTFILE)
+        import metrics
+        if metrics.start_from_env():
+            print("Metrics exporter started")
+        app.aboutToQuit.connect(metrics.stop)
 
         # Import and create login window
         print("Loading login window...")
         from views.login_view import LoginView
 
-        window = LoginView()
+        with profiling.profiled("LoginView.__init__"):
+            window = LoginView()
         print("Login window created!")
 
         window.show()
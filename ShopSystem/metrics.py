@@ -0,0 +1,287 @@
+"""
+Prometheus text-format metrics for the shop application.
+
+Off by default. When started, the exporter serves /metrics from a stdlib HTTP
+server on a daemon thread, and/or rewrites a textfile every interval seconds
+(for node_exporter's textfile collector):
+
+    SHOP_METRICS_PORT=9108 python main.py
+    SHOP_METRICS_TEXTFILE=/var/lib/node_exporter/shop.prom python main.py
+
+Values are read from the existing counters (database.get_query_stats,
+get_pool_stats, get_cache_stats) only when scraped. The only collection done
+on the hot path is record_checkout / record_checkout_retry / record_refresh,
+and callers skip those unless enabled is True.
+"""
+import os
+import threading
+
+from query_stats import BUCKETS_MS, Histogram
+
+metrics_config = {
+    "host": "127.0.0.1",
+    "port": None,
+    "textfile": None,
+    "interval": 15.0
+}
+
+enabled = False
+_exporter = None
+_lock = threading.Lock()
+_checkouts = {}  # outcome -> count
+_checkout_retries = 0
+_refreshes = {}  # source -> Histogram (ms)
+
+
+# --- RECORDING (callers check metrics.enabled first) ---
+def record_checkout(result):
+    """Counts a database.checkout_cart() result by outcome"""
+    if result == "Success":
+        outcome = "success"
+    elif result.startswith("Not enough stock"):
+        outcome = "out_of_stock"
+    elif "Stock changed" in result:
+        outcome = "stock_changed"
+    else:
+        outcome = "error"
+    with _lock:
+        _checkouts[outcome] = _checkouts.get(outcome, 0) + 1
+
+
+def record_checkout_retry():
+    """Counts a checkout transaction retried after a deadlock or lock wait timeout"""
+    global _checkout_retries
+    with _lock:
+        _checkout_retries += 1
+
+
+def record_refresh(source, seconds):
+    """Records how long a GUI load took from request until its result was shown"""
+    with _lock:
+        histogram = _refreshes.get(source)
+        if histogram is None:
+            histogram = _refreshes[source] = Histogram()
+        histogram.add(seconds * 1000)
+
+
+# --- EXPOSITION ---
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+
+    def header(self, name, kind, help_text):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, value, labels=None):
+        self.lines.append(f"{name}{_labels(labels)} {float(value):.6g}")
+
+    def histogram(self, name, snapshot, labels=None):
+        """Writes a query_stats.Histogram snapshot (ms buckets) as a seconds histogram"""
+        labels = labels or {}
+        cumulative = 0
+        for bound, count in zip(list(BUCKETS_MS) + [None], snapshot["buckets"].values()):
+            cumulative += count
+            le = "+Inf" if bound is None else f"{bound / 1000:g}"
+            self.sample(f"{name}_bucket", cumulative, dict(labels, le=le))
+        self.sample(f"{name}_sum", snapshot["total_ms"] / 1000, labels)
+        self.sample(f"{name}_count", snapshot["count"], labels)
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def render():
+    """Returns all metrics in the Prometheus text exposition format"""
+    import database
+
+    out = _Writer()
+    stats = database.get_query_stats()
+
+    out.header("shop_db_call_duration_seconds", "histogram", "Duration of database.py function calls")
+    for function, f in sorted(stats["functions"].items()):
+        out.histogram("shop_db_call_duration_seconds", f, {"function": function})
+    out.header("shop_db_call_errors_total", "counter", "Failed SQL statements per database function")
+    for function, f in sorted(stats["functions"].items()):
+        out.sample("shop_db_call_errors_total", f["errors"], {"function": function})
+    out.header("shop_db_rows_fetched_total", "counter", "Rows fetched per database function")
+    for function, f in sorted(stats["functions"].items()):
+        out.sample("shop_db_rows_fetched_total", f["rows"], {"function": function})
+    out.header("shop_db_connection_acquire_seconds_total", "counter",
+               "Time spent waiting for a pooled connection per database function")
+    for function, f in sorted(stats["functions"].items()):
+        out.sample("shop_db_connection_acquire_seconds_total", f["acquire_avg_ms"] * f["count"] / 1000,
+                   {"function": function})
+    out.header("shop_db_source_calls_total", "counter", "Database calls per screen/task")
+    for source, s in sorted(stats["sources"].items()):
+        out.sample("shop_db_source_calls_total", s["calls"], {"source": source})
+    out.header("shop_db_slow_queries_total", "counter", "Statements slower than the slow-query threshold")
+    out.sample("shop_db_slow_queries_total", stats["slow_queries"])
+
+    pool = database.get_pool_stats()
+    out.header("shop_db_pool_connections", "gauge", "Pooled connections by state")
+    for state in ("open", "in_use", "idle"):
+        out.sample("shop_db_pool_connections", pool[state], {"state": state})
+    out.header("shop_db_pool_size", "gauge", "Maximum pooled connections")
+    out.sample("shop_db_pool_size", pool["size"])
+    for key, help_text in (("checkouts", "Connections borrowed from the pool"),
+                           ("created", "Connections opened by the pool"),
+                           ("discarded", "Broken connections dropped by the pool"),
+                           ("timeouts", "Borrows that timed out waiting for a connection")):
+        out.header(f"shop_db_pool_{key}_total", "counter", help_text)
+        out.sample(f"shop_db_pool_{key}_total", pool[key])
+    out.header("shop_db_pool_wait_seconds_max", "gauge", "Longest wait for a pooled connection")
+    out.sample("shop_db_pool_wait_seconds_max", pool["max_wait_ms"] / 1000)
+
+    cache = database.get_cache_stats()
+    out.header("shop_cache_hits_total", "counter", "Catalog cache hits")
+    out.sample("shop_cache_hits_total", cache["hits"], {"cache": "catalog"})
+    out.header("shop_cache_misses_total", "counter", "Catalog cache misses")
+    out.sample("shop_cache_misses_total", cache["misses"], {"cache": "catalog"})
+    out.header("shop_cache_hit_ratio", "gauge", "Catalog cache hits / lookups")
+    out.sample("shop_cache_hit_ratio", cache["hit_ratio"], {"cache": "catalog"})
+    out.header("shop_cache_entries", "gauge", "Entries in the catalog cache")
+    out.sample("shop_cache_entries", cache["size"], {"cache": "catalog"})
+
+    with _lock:
+        checkouts = dict(_checkouts)
+        checkout_retries = _checkout_retries
+        refreshes = {source: h.snapshot() for source, h in _refreshes.items()}
+    out.header("shop_checkouts_total", "counter", "Checkouts by outcome")
+    for outcome in ("success", "out_of_stock", "stock_changed", "error"):
+        out.sample("shop_checkouts_total", checkouts.get(outcome, 0), {"outcome": outcome})
+    out.header("shop_checkout_retries_total", "counter", "Checkout transactions retried after lock contention")
+    out.sample("shop_checkout_retries_total", checkout_retries)
+    out.header("shop_gui_refresh_duration_seconds", "histogram", "GUI loads from request until shown")
+    for source, snapshot in sorted(refreshes.items()):
+        out.histogram("shop_gui_refresh_duration_seconds", snapshot, {"source": source})
+
+    return out.text()
+
+
+# --- EXPORTER ---
+def _make_server(host, port):
+    # http.server pulls in email/html/socketserver; only import it when serving
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            _serve(self)
+
+        def log_message(self, format, *args):
+            pass  # scrapes would otherwise print a line to the console every interval
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def _serve(handler):
+    """GET handler: /metrics returns render(), anything else 404"""
+    if handler.path.split("?")[0] != "/metrics":
+        handler.send_error(404)
+        return
+    try:
+        body = render().encode("utf-8")
+    except Exception as e:
+        handler.send_error(500, str(e))
+        return
+    handler.send_response(200)
+    handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+class MetricsExporter:
+    """Serves render() over HTTP and/or writes it to a textfile on background threads"""
+
+    def __init__(self, host="127.0.0.1", port=None, textfile=None, interval=15.0):
+        self.host = host
+        self.port = port
+        self.textfile = textfile
+        self.interval = interval
+        self._server = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.port is not None:
+            self._server = _make_server(self.host, self.port)
+            self.port = self._server.server_address[1]  # resolves port 0
+            self._threads.append(threading.Thread(target=self._server.serve_forever, name="metrics-http",
+                                                  daemon=True))
+        if self.textfile:
+            self._threads.append(threading.Thread(target=self._write_loop, name="metrics-textfile", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    def _write_loop(self):
+        while True:
+            try:
+                self.write_textfile()
+            except Exception as e:
+                print("Metrics Textfile Error:", e)
+            if self._stop.wait(self.interval):
+                break
+
+    def write_textfile(self):
+        # Written to a temp file and renamed so the collector never reads half a file
+        tmp = f"{self.textfile}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(render())
+        os.replace(tmp, self.textfile)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+
+def start(**options):
+    """Starts the exporter with metrics_config overridden by options; returns it"""
+    global _exporter, enabled
+    stop()
+    config = dict(metrics_config, **options)
+    if config["port"] is None and not config["textfile"]:
+        return None
+    _exporter = MetricsExporter(config["host"], config["port"], config["textfile"], config["interval"])
+    _exporter.start()
+    enabled = True
+    return _exporter
+
+
+def start_from_env():
+    """Starts the exporter if SHOP_METRICS_PORT or SHOP_METRICS_TEXTFILE is set"""
+    port = os.environ.get("SHOP_METRICS_PORT")
+    textfile = os.environ.get("SHOP_METRICS_TEXTFILE")
+    if not port and not textfile:
+        return None
+    return start(port=int(port) if port else None, textfile=textfile or None)
+
+
+def stop():
+    global _exporter, enabled
+    enabled = False
+    if _exporter is not None:
+        if _exporter.textfile:
+            try:
+                _exporter.write_textfile()  # final values on exit
+            except Exception:
+                pass
+        _exporter.stop()
+        _exporter = None
@@ -0,0 +1,291 @@
+# Recomputes daily_sales_rollup from orders and completed_services (used by
+# database.rebuild_daily_rollup). order_count counts order lines, as checkout does.
+DAILY_ROLLUP_BACKFILL = [
+    """
+    INSERT INTO daily_sales_rollup (sale_day, revenue, order_count, units)
+    SELECT DATE(order_date), SUM(total_amount), SUM(item_count), SUM(units)
+    FROM orders GROUP BY DATE(order_date)
+    ON DUPLICATE KEY UPDATE revenue = VALUES(revenue), order_count = VALUES(order_count), units = VALUES(units)
+    """,
+    """
+    INSERT INTO daily_sales_rollup (sale_day, service_revenue, service_count)
+    SELECT DATE(completed_at), SUM(price), COUNT(*)
+    FROM completed_services GROUP BY DATE(completed_at)
+    ON DUPLICATE KEY UPDATE service_revenue = VALUES(service_revenue), service_count = VALUES(service_count)
+    """,
+]
+
+# Migration 2 ran before orders existed and backfilled from the per-line sales table
+_SALES_ROLLUP_BACKFILL = [
+    """
+    INSERT INTO daily_sales_rollup (sale_day, revenue, order_count, units)
+    SELECT DATE(sale_date), SUM(total_price), COUNT(*), SUM(quantity)
+    FROM sales GROUP BY DATE(sale_date)
+    ON DUPLICATE KEY UPDATE revenue = VALUES(revenue), order_count = VALUES(order_count), units = VALUES(units)
+    """,
+    DAILY_ROLLUP_BACKFILL[1],
+]
+
+# Migration 4 turns the per-line sales table into orders and order lines.
+# checkout_cart wrote a cart's lines with one timestamp and the same customer and
+# payment details, and a cart never holds a product twice: the k-th sale of a
+# product with the same customer, timestamp and payment details belongs to the
+# k-th checkout of that group. Checkouts in the same second that share no product
+# can't be told apart and become one order. Each order is numbered by its first
+# sale_id and each line keeps its sale_id. Comparisons are NULL-safe (<=>) so sales
+# without a customer or bank details are not dropped.
+_SAME_CHECKOUT_GROUP = """
+    {a}.customer_id <=> {b}.customer_id AND {a}.sale_date <=> {b}.sale_date
+    AND {a}.payment_method <=> {b}.payment_method AND {a}.bank_name <=> {b}.bank_name
+    AND {a}.account_number <=> {b}.account_number
+"""
+
+LEGACY_ORDERS_BACKFILL = [
+    """
+    CREATE TABLE IF NOT EXISTS legacy_sale_checkouts (
+        sale_id INT PRIMARY KEY,
+        checkout_no INT NOT NULL
+    )
+    """,
+    f"""
+    INSERT INTO legacy_sale_checkouts (sale_id, checkout_no)
+    SELECT s.sale_id, (
+        SELECT COUNT(*) FROM sales p
+        WHERE {_SAME_CHECKOUT_GROUP.format(a="p", b="s")} AND p.product_id <=> s.product_id AND p.sale_id <= s.sale_id
+    )
+    FROM sales s
+    WHERE NOT EXISTS (SELECT 1 FROM legacy_sale_checkouts x WHERE x.sale_id = s.sale_id)
+    """,
+    """
+    INSERT INTO orders (order_id, customer_id, full_name, payment_method, bank_name, account_number,
+                        item_count, units, total_amount, order_date)
+    SELECT MIN(s.sale_id), s.customer_id, MAX(s.full_name), s.payment_method, s.bank_name, s.account_number,
+           COUNT(*), SUM(s.quantity), SUM(s.total_price), s.sale_date
+    FROM sales s
+    JOIN legacy_sale_checkouts k ON k.sale_id = s.sale_id
+    GROUP BY s.customer_id, s.sale_date, s.payment_method, s.bank_name, s.account_number, k.checkout_no
+    HAVING MIN(s.sale_id) NOT IN (SELECT order_id FROM orders)
+    """,
+    f"""
+    INSERT INTO order_lines (line_id, order_id, product_id, product_name, quantity, unit_price, line_total)
+    SELECT s.sale_id, (
+               SELECT MIN(s2.sale_id) FROM sales s2
+               JOIN legacy_sale_checkouts k2 ON k2.sale_id = s2.sale_id
+               WHERE k2.checkout_no = k.checkout_no AND {_SAME_CHECKOUT_GROUP.format(a="s2", b="s")}
+           ),
+           s.product_id, p.name, s.quantity,
+           CASE WHEN s.quantity > 0 THEN s.total_price / s.quantity ELSE s.total_price END, s.total_price
+    FROM sales s
+    JOIN legacy_sale_checkouts k ON k.sale_id = s.sale_id
+    LEFT JOIN products p ON p.product_id = s.product_id
+    WHERE NOT EXISTS (SELECT 1 FROM order_lines x WHERE x.line_id = s.sale_id)
+    """,
+    "DROP TABLE IF EXISTS legacy_sale_checkouts",
+]
+
+# (description, query, expected query) run after a migration's statements and before
+# its version is recorded; a mismatch stops startup and the migration re-runs next time
+MIGRATION_CHECKS = {
+    4: [
+        ("every sale became an order line",
+         "SELECT COUNT(*) FROM order_lines WHERE line_id IN (SELECT sale_id FROM sales)",
+         "SELECT COUNT(*) FROM sales"),
+    ],
+}
+
+# --- SCHEMA MIGRATIONS ---
+# Each entry is (version, description, [statements]). Versions must increase by one.
+# The base tables are created by database.initialize_db (version 0); everything
+# after that goes here so startup can skip DDL once the schema is current.
+# Data statements must be safe to run twice (insert only missing rows, or upsert
+# absolute values): MySQL commits DDL implicitly, so a run interrupted part-way
+# re-runs the whole migration.
+MIGRATIONS = [
+    (1, "Secondary indexes for listing and filtering queries", [
+        # get_all_sales: ORDER BY sale_date DESC
+        "CREATE INDEX idx_sales_sale_date ON sales (sale_date)",
+        # get_user_sales: WHERE customer_id = ? ORDER BY sale_date DESC
+        "CREATE INDEX idx_sales_customer_date ON sales (customer_id, sale_date)",
+        # get_products / get_categories: WHERE is_active = 1 [AND category = ?] ORDER BY code
+        "CREATE INDEX idx_products_active_category_code ON products (is_active, category, code)",
+        # get_user_services: WHERE customer_id = ? ORDER BY service_id DESC
+        "CREATE INDEX idx_services_customer ON services (customer_id, service_id)",
+        # get_completed_services: ORDER BY completed_at DESC
+        "CREATE INDEX idx_completed_services_completed ON completed_services (completed_at, completed_id)",
+    ]),
+    (2, "Daily sales rollup maintained by checkout and service completion", [
+        """
+        CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+            sale_day DATE PRIMARY KEY,
+            revenue DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+            order_count INT NOT NULL DEFAULT 0,
+            units INT NOT NULL DEFAULT 0,
+            service_revenue DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+            service_count INT NOT NULL DEFAULT 0
+        )
+        """,
+    ] + _SALES_ROLLUP_BACKFILL),
+    (3, "Stock reservations held by carts until they expire", [
+        """
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            reservation_id INT AUTO_INCREMENT PRIMARY KEY,
+            cart_id VARCHAR(64) NOT NULL,
+            product_id INT NOT NULL,
+            quantity INT NOT NULL,
+            expires_at DATETIME NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (cart_id, product_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """,
+        # reserve / checkout: units held on one product by active holds
+        "CREATE INDEX idx_reservations_product_expires ON stock_reservations (product_id, expires_at, quantity)",
+        # available-to-sell for the shop table and the sweeper: active (or expired) holds only
+        "CREATE INDEX idx_reservations_expires ON stock_reservations (expires_at, product_id, quantity)",
+    ]),
+    (4, "Orders and order lines; existing sales grouped into orders", [
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT,
+            full_name VARCHAR(255),
+            payment_method VARCHAR(50) DEFAULT 'Cash',
+            bank_name VARCHAR(100),
+            account_number VARCHAR(100),
+            item_count INT NOT NULL DEFAULT 0,
+            units INT NOT NULL DEFAULT 0,
+            total_amount DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+            order_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES users(user_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_lines (
+            line_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            product_id INT,
+            product_name VARCHAR(255),
+            quantity INT NOT NULL,
+            unit_price DECIMAL(10, 2),
+            line_total DECIMAL(12, 2),
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """,
+        # get_order / receipts: every line of one order
+        "CREATE INDEX idx_order_lines_order ON order_lines (order_id, line_id)",
+        # get_customer_orders / get_user_sales: WHERE customer_id = ? ORDER BY order_date DESC
+        "CREATE INDEX idx_orders_customer_date ON orders (customer_id, order_date)",
+        # get_orders_by_day / get_all_sales: order_date range or ORDER BY order_date DESC
+        "CREATE INDEX idx_orders_date ON orders (order_date)",
+        # get_orders_by_payment_method: WHERE payment_method = ? [AND order_date range]
+        "CREATE INDEX idx_orders_payment_date ON orders (payment_method, order_date)",
+    ] + LEGACY_ORDERS_BACKFILL),
+    (5, "Idempotency keys for checkouts", [
+        "ALTER TABLE orders ADD COLUMN idempotency_key VARCHAR(64)",
+        # One order per key; orders without a key (NULL) don't conflict
+        "CREATE UNIQUE INDEX uq_orders_idempotency_key ON orders (idempotency_key)",
+    ]),
+    (6, "Append-only stock ledger with checkpoints", [
+        # One row per stock change (reason: opening, restock, sale, adjustment); never updated
+        """
+        CREATE TABLE IF NOT EXISTS stock_movements (
+            movement_id INT AUTO_INCREMENT PRIMARY KEY,
+            product_id INT NOT NULL,
+            delta INT NOT NULL,
+            balance_after INT NOT NULL,
+            reason VARCHAR(20) NOT NULL,
+            order_id INT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
+        )
+        """,
+        # Stock of every product as of last_movement_id (see stock_ledger.create_checkpoint)
+        """
+        CREATE TABLE IF NOT EXISTS stock_checkpoints (
+            checkpoint_id INT NOT NULL,
+            product_id INT NOT NULL,
+            category VARCHAR(100),
+            stock_qty INT NOT NULL,
+            last_movement_id INT NOT NULL,
+            taken_at DATETIME NOT NULL,
+            PRIMARY KEY (checkpoint_id, product_id)
+        )
+        """,
+        # get_stock_as_of: one product's movements after a checkpoint
+        "CREATE INDEX idx_movements_product ON stock_movements (product_id, movement_id)",
+        # create_checkpoint: newest movement older than the settle time
+        "CREATE INDEX idx_movements_created ON stock_movements (created_at, movement_id)",
+        # nearest checkpoint at or before a date
+        "CREATE INDEX idx_checkpoints_taken ON stock_checkpoints (taken_at, checkpoint_id, last_movement_id)",
+        # get_category_stock_as_of: one category's rows of a checkpoint
+        "CREATE INDEX idx_checkpoints_category ON stock_checkpoints (checkpoint_id, category, product_id, stock_qty)",
+        # get_low_stock_products: WHERE is_active = 1 AND stock_qty <= ? ORDER BY stock_qty
+        "CREATE INDEX idx_products_active_stock ON products (is_active, stock_qty)",
+        # The ledger starts with the stock on hand when it is created
+        """
+        INSERT INTO stock_movements (product_id, delta, balance_after, reason)
+        SELECT product_id, stock_qty, stock_qty, 'opening' FROM products
+        WHERE NOT EXISTS (SELECT 1 FROM stock_movements m WHERE m.product_id = products.product_id)
+        """,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def create_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_schema_version(cursor):
+    """Returns the highest applied migration version (0 if none)"""
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def verify_migration(cursor, version):
+    """Runs MIGRATION_CHECKS[version]; raises if one of them doesn't match"""
+    for description, query, expected_query in MIGRATION_CHECKS.get(version, []):
+        cursor.execute(query)
+        actual = cursor.fetchone()[0]
+        cursor.execute(expected_query)
+        expected = cursor.fetchone()[0]
+        if actual != expected:
+            raise Exception(f"Migration {version} check failed: {description} ({actual} != {expected})")
+
+
+def run_migrations(conn, backend):
+    """
+    Applies every migration newer than the recorded schema version.
+    DDL the backend reports as already applied (by hand or by an interrupted
+    run) is skipped, and data statements only insert what is missing, so
+    re-running a partially applied migration finishes it.
+    """
+    cursor = conn.cursor()
+    create_version_table(cursor)
+    current = get_schema_version(cursor)
+
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Exception as err:
+                if not backend.is_already_applied(err):
+                    raise
+        verify_migration(cursor, version)
+        cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                       (version, description))
+        conn.commit()
+        print(f"Applied migration {version}: {description}")
+
+    cursor.close()
@@ -0,0 +1,185 @@
+"""
+Field profiling mode: cProfile + tracemalloc around startup and refreshes.
+
+Enabled with `python main.py --profile [DIR]` or SHOP_PROFILE=DIR (use 1 for
+the default directory). Every profiled operation writes to a new
+profiles/<timestamp>/ run directory:
+
+    0001-initialize_db.pstats     cProfile stats (python -m pstats, snakeviz, ...)
+    0001-initialize_db.txt        top functions by cumulative time + top allocations
+    summary.csv                   one line per operation: wall time, allocations
+
+Operations: initialize_db, LoginView/ManagerView/UserView construction, every
+refresh_* method, and for background loads the worker call (<Screen>.<task>.load)
+and the GUI-thread callback that shows the result (<Screen>.<task>.show).
+A section that starts inside another one on the same thread is written
+separately; the outer section's cProfile stats exclude its time and the outer
+wall/cpu times exclude its profiling overhead. Allocation peaks and the
+per-line allocation report are only recorded for operations that did not
+overlap another one (tracemalloc is process-wide).
+"""
+import cProfile
+import csv
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+profile_config = {
+    "directory": os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"),
+    "top": 25,
+    "traceback_frames": 1
+}
+
+enabled = False
+run_directory = None
+_sequence = itertools.count(1)
+_lock = threading.Lock()
+_local = threading.local()
+_active = 0  # sections running on any thread
+
+
+def enable(directory=None, top=None):
+    """Turns profiling on; output goes to a new timestamped folder under directory"""
+    global enabled, run_directory
+    if directory:
+        profile_config["directory"] = directory
+    if top:
+        profile_config["top"] = top
+    run_directory = os.path.join(profile_config["directory"], datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(run_directory, exist_ok=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(profile_config["traceback_frames"])
+    with open(os.path.join(run_directory, "summary.csv"), "w", newline="") as f:
+        csv.writer(f).writerow(["seq", "operation", "thread", "wall_ms", "cpu_ms", "alloc_kb", "peak_kb"])
+    enabled = True
+    return run_directory
+
+
+def enable_from_args(argv):
+    """Enables profiling for --profile [DIR] in argv or the SHOP_PROFILE environment variable"""
+    if "--profile" in argv:
+        i = argv.index("--profile")
+        directory = argv[i + 1] if i + 1 < len(argv) and not argv[i + 1].startswith("-") else None
+        return enable(directory)
+    value = os.environ.get("SHOP_PROFILE")
+    if value:
+        return enable(None if value == "1" else value)
+    return None
+
+
+def disable():
+    global enabled
+    enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextmanager
+def profiled(name):
+    """Profiles the block as one operation when profiling is enabled"""
+    global _active
+    if not enabled:
+        yield
+        return
+
+    # Only one profiler can be active per thread: pause the enclosing one.
+    # Each stack entry is [profiler, wall overhead, cpu overhead] of nested sections.
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    setup_wall, setup_cpu = time.perf_counter(), time.thread_time()
+    if stack:
+        stack[-1][0].disable()
+    profiler = cProfile.Profile()
+    frame = [profiler, 0.0, 0.0]
+    stack.append(frame)
+
+    # Diffing two snapshots of a large heap takes seconds, so allocations are
+    # attributed to lines only when no other section is running: the traces are
+    # cleared and the snapshot afterwards holds just what this operation kept.
+    with _lock:
+        exclusive = _active == 0
+        _active += 1
+        if exclusive:
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+    traced_before, _ = tracemalloc.get_traced_memory()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        cpu = time.thread_time() - cpu - frame[2]
+        wall = time.perf_counter() - wall - frame[1]
+        traced_after, peak = tracemalloc.get_traced_memory()
+        with _lock:
+            _active -= 1
+            exclusive = exclusive and _active == 0
+        snapshot = tracemalloc.take_snapshot() if exclusive else None
+        stack.pop()
+        try:
+            _write(name, profiler, snapshot, wall, cpu, traced_after - traced_before,
+                   peak - traced_before if exclusive else None)
+        except Exception as e:
+            print("Profile Write Error:", e)
+        snapshot = None
+        if stack:
+            # Keep this section's snapshot and report writing out of the enclosing section's times
+            stack[-1][1] += time.perf_counter() - setup_wall - wall
+            stack[-1][2] += time.thread_time() - setup_cpu - cpu
+            stack[-1][0].enable()
+
+
+def profiled_method(fn):
+    """Decorator for view methods; the operation is named <Class>.<method>"""
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if not enabled:
+            return fn(self, *args, **kwargs)
+        with profiled(f"{type(self).__name__}.{fn.__name__}"):
+            return fn(self, *args, **kwargs)
+    return wrapper
+
+
+def _write(name, profiler, snapshot, wall, cpu, allocated, peak):
+    seq = next(_sequence)
+    safe_name = "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
+    base = os.path.join(run_directory, f"{seq:04d}-{safe_name}")
+    top = profile_config["top"]
+
+    profiler.dump_stats(base + ".pstats")
+
+    report = io.StringIO()
+    report.write(f"{name}\nthread: {threading.current_thread().name}\n")
+    report.write(f"wall: {wall * 1000:.1f} ms   cpu: {cpu * 1000:.1f} ms\n")
+    peak_text = f"{peak / 1024:.1f} KB" if peak is not None else "n/a (overlapped another operation)"
+    report.write(f"allocated: {allocated / 1024:.1f} KB   peak: {peak_text}\n\n")
+    report.write(f"--- top {top} functions by cumulative time ---\n")
+    pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+    report.write(f"\n--- top {top} allocations still alive at the end (by line) ---\n")
+    if snapshot is None:
+        report.write("n/a: overlapped another profiled operation\n")
+    else:
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                           tracemalloc.Filter(False, cProfile.__file__),
+                                           tracemalloc.Filter(False, pstats.__file__),
+                                           tracemalloc.Filter(False, __file__)])
+        for stat in snapshot.statistics("lineno")[:top]:
+            report.write(f"{stat}\n")
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(report.getvalue())
+
+    with _lock:
+        with open(os.path.join(run_directory, "summary.csv"), "a", newline="") as f:
+            csv.writer(f).writerow([seq, name, threading.current_thread().name, f"{wall * 1000:.1f}",
+                                    f"{cpu * 1000:.1f}", f"{allocated / 1024:.1f}",
+                                    f"{peak / 1024:.1f}" if peak is not None else ""])
@@ -0,0 +1,399 @@
+import re
+import threading
+import time
+import types
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+# Latency histogram bucket upper bounds in ms (the last bucket is open-ended)
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=512)
+def _normalize(query):
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with an exact count, sum and max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (max for the open bucket)"""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.counts)),
+        }
+
+
+class _Call:
+    """One in-flight call of an instrumented function on this thread"""
+    __slots__ = ("name", "acquire_ms", "rows", "statements", "errors")
+
+    def __init__(self, name):
+        self.name = name
+        self.acquire_ms = 0.0
+        self.rows = 0
+        self.statements = 0
+        self.errors = 0
+
+
+class _FunctionStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.acquire = Histogram()
+        self.rows = 0
+        self.statements = 0
+        self.errors = 0
+
+
+class QueryStats:
+    """
+    Collects call counts, latency histograms, rows fetched and connection
+    acquire time per database function, per SQL statement and per source
+    (the screen/task that issued the call). Statements slower than
+    slow_query_ms are written to a rotating slow-query log with the shape of
+    their parameters, never the values.
+    """
+
+    def __init__(self, slow_query_ms=200.0, slow_log_path=None, max_bytes=1_000_000, backup_count=3):
+        self.slow_query_ms = slow_query_ms
+        self.slow_log_path = slow_log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._slow_logger = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._functions = {}
+            self._statements = {}
+            self._sources = {}
+            self._slow_count = 0
+            self._started = time.time()
+
+    # --- context (thread-local) ---
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_source(self):
+        return getattr(self._local, "source", None) or threading.current_thread().name
+
+    @contextmanager
+    def source(self, name):
+        """Tags database calls made inside the block with name (e.g. "ManagerView.inventory")"""
+        previous = getattr(self._local, "source", None)
+        self._local.source = name
+        try:
+            yield
+        finally:
+            self._local.source = previous
+
+    # --- recording ---
+    def instrument(self, fn):
+        """Decorator: records every call of fn (generators are timed until exhausted)"""
+        name = fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            call = _Call(name)
+            stack = self._stack()
+            stack.append(call)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                stack.pop()
+                call.errors += 1
+                self._finish(call, time.perf_counter() - start)
+                raise
+            stack.pop()
+            elapsed = time.perf_counter() - start
+            if isinstance(result, types.GeneratorType):
+                return self._timed_generator(result, call, elapsed)
+            self._finish(call, elapsed)
+            return result
+
+        return wrapper
+
+    def _timed_generator(self, gen, call, elapsed):
+        # Only time spent inside the generator counts, not the consumer's work between batches
+        stack = self._stack()
+        try:
+            while True:
+                stack.append(call)
+                start = time.perf_counter()
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    break
+                finally:
+                    stack.pop()
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            gen.close()
+            self._finish(call, elapsed)
+
+    def _finish(self, call, elapsed):
+        ms = elapsed * 1000
+        source = self.current_source()
+        with self._lock:
+            stats = self._functions.get(call.name)
+            if stats is None:
+                stats = self._functions[call.name] = _FunctionStats()
+            stats.latency.add(ms)
+            stats.acquire.add(call.acquire_ms)
+            stats.rows += call.rows
+            stats.statements += call.statements
+            stats.errors += call.errors
+
+            per_source = self._sources.get(source)
+            if per_source is None:
+                per_source = self._sources[source] = {"calls": 0, "total_ms": 0.0, "functions": {}}
+            per_source["calls"] += 1
+            per_source["total_ms"] += ms
+            per_source["functions"][call.name] = per_source["functions"].get(call.name, 0) + 1
+
+    def record_acquire(self, seconds):
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].acquire_ms += seconds * 1000
+
+    def record_rows(self, count):
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].rows += count
+
+    def record_statement(self, query, params, seconds, error=None):
+        ms = seconds * 1000
+        sql = _normalize(query)
+        stack = getattr(self._local, "stack", None)
+        function = stack[-1].name if stack else None
+        if stack:
+            stack[-1].statements += 1
+            if error is not None:
+                stack[-1].errors += 1
+        with self._lock:
+            stats = self._statements.get(sql)
+            if stats is None:
+                stats = self._statements[sql] = {"latency": Histogram(), "errors": 0, "function": function}
+            stats["latency"].add(ms)
+            if error is not None:
+                stats["errors"] += 1
+            slow = ms >= self.slow_query_ms
+            if slow:
+                self._slow_count += 1
+        if slow:
+            self._log_slow(sql, params, ms, function, error)
+
+    def _log_slow(self, sql, params, ms, function, error):
+        logger = self._get_slow_logger()
+        if logger is not None:
+            logger.warning("%.1f ms | %s | %s | params=%s%s | %s", ms, self.current_source(), function or "-",
+                           param_shape(params), f" | error={type(error).__name__}" if error else "", sql)
+
+    def _get_slow_logger(self):
+        if self._slow_logger is None and self.slow_log_path:
+            with self._lock:
+                if self._slow_logger is None:
+                    import logging.handlers  # only once something is actually slow
+                    logger = logging.getLogger("shop.slow_queries")
+                    logger.propagate = False
+                    handler = logging.handlers.RotatingFileHandler(
+                        self.slow_log_path, maxBytes=self.max_bytes, backupCount=self.backup_count,
+                        encoding="utf-8", delay=True)
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                    logger.addHandler(handler)
+                    self._slow_logger = logger
+        return self._slow_logger
+
+    def close(self):
+        """Closes the slow-query log file (it is reopened on the next slow query)"""
+        with self._lock:
+            if self._slow_logger is not None:
+                for handler in list(self._slow_logger.handlers):
+                    self._slow_logger.removeHandler(handler)
+                    handler.close()
+                self._slow_logger = None
+
+    # --- reading ---
+    def snapshot(self):
+        """Returns a copy of all counters as plain dicts (safe to json.dump)"""
+        with self._lock:
+            functions = {}
+            for name, s in self._functions.items():
+                entry = s.latency.snapshot()
+                entry.update({
+                    "rows": s.rows,
+                    "statements": s.statements,
+                    "errors": s.errors,
+                    "acquire_avg_ms": s.acquire.total_ms / s.acquire.count if s.acquire.count else 0.0,
+                    "acquire_max_ms": s.acquire.max_ms,
+                })
+                functions[name] = entry
+            statements = {}
+            for sql, s in self._statements.items():
+                entry = s["latency"].snapshot()
+                entry.update({"errors": s["errors"], "function": s["function"]})
+                statements[sql] = entry
+            sources = {name: {"calls": s["calls"], "total_ms": s["total_ms"], "functions": dict(s["functions"])}
+                       for name, s in self._sources.items()}
+            return {
+                "since": self._started,
+                "uptime_s": time.time() - self._started,
+                "slow_query_ms": self.slow_query_ms,
+                "slow_queries": self._slow_count,
+                "functions": functions,
+                "statements": statements,
+                "sources": sources,
+            }
+
+
+class TimedCursor:
+    """Cursor wrapper that reports statement timings and fetched row counts to a QueryStats"""
+
+    def __init__(self, stats, cursor):
+        self._stats = stats
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.record_rows(1)
+            yield row
+
+    def _timed(self, method, query, params):
+        start = time.perf_counter()
+        try:
+            result = method(query, params)
+        except Exception as e:
+            self._stats.record_statement(query, params, time.perf_counter() - start, e)
+            raise
+        self._stats.record_statement(query, params, time.perf_counter() - start)
+        return result
+
+    def execute(self, query, params=()):
+        return self._timed(self._cursor.execute, query, params)
+
+    def executemany(self, query, seq_of_params):
+        return self._timed(self._cursor.executemany, query, seq_of_params)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.record_rows(1)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        self._stats.record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.record_rows(len(rows))
+        return rows
+
+
+class TimedConnection:
+    """Connection wrapper whose cursors are TimedCursors; everything else is passed through"""
+
+    def __init__(self, stats, conn):
+        self._stats = stats
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._stats, self._conn.cursor(*args, **kwargs))
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def param_shape(params):
+    """Describes query parameters by type only, e.g. "(str, int, None)" or "[12 x (int, str)]" """
+    if params is None:
+        return "None"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        if params and all(isinstance(p, (list, tuple)) for p in params):
+            return f"[{len(params)} x {param_shape(params[0])}]"  # executemany batch
+        names = [type(p).__name__ if p is not None else "None" for p in params]
+        if len(names) > 8 and len(set(names)) == 1:
+            return f"({len(names)} x {names[0]})"
+        return "(" + ", ".join(names) + ")"
+    return type(params).__name__
+
+
+def format_snapshot(snapshot, top=15):
+    """Plain-text report of a snapshot(), slowest functions and busiest sources first"""
+    lines = [f"{'function':<32} {'calls':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} {'total ms':>10} "
+             f"{'rows':>9} {'acq ms':>7} {'err':>4}"]
+    functions = sorted(snapshot["functions"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    for name, f in functions[:top]:
+        lines.append(f"{name:<32} {f['count']:>7} {f['p50_ms']:>8.1f} {f['p99_ms']:>8.1f} {f['max_ms']:>9.1f} "
+                     f"{f['total_ms']:>10.1f} {f['rows']:>9} {f['acquire_avg_ms']:>7.2f} {f['errors']:>4}")
+    lines.append("")
+    lines.append(f"{'source':<40} {'calls':>7} {'total ms':>10}  top functions")
+    sources = sorted(snapshot["sources"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+    for name, s in sources[:top]:
+        busiest = sorted(s["functions"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+        lines.append(f"{name:<40} {s['calls']:>7} {s['total_ms']:>10.1f}  "
+                     + ", ".join(f"{fn} x{n}" for fn, n in busiest))
+    lines.append("")
+    lines.append(f"slow queries (>= {snapshot['slow_query_ms']:.0f} ms): {snapshot['slow_queries']}")
+    return "\n".join(lines)
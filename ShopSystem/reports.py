@@ -0,0 +1,261 @@
+from database import get_connection, instrumented
+
+
+# --- DASHBOARD AGGREGATES ---
+# All totals are computed by the database with SUM/COUNT ... GROUP BY, so the
+# dashboard dialogs hold a handful of rows no matter how large the tables get.
+
+@instrumented
+def get_revenue_by_source():
+    """Returns [(source_name, amount), ...] for product sales and completed services"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COALESCE(SUM(revenue), 0), COALESCE(SUM(service_revenue), 0)
+            FROM daily_sales_rollup
+        """)
+        sales_revenue, services_revenue = cursor.fetchone()
+        return [
+            ("Product Sales", sales_revenue),
+            ("Services", services_revenue),
+        ]
+    except Exception as e:
+        print("Revenue Report Error:", e)
+        return [("Product Sales", 0), ("Services", 0)]
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_orders_by_type():
+    """Returns [(category_name, count), ...] for sales, completed and pending services"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                (SELECT COALESCE(SUM(order_count), 0) FROM daily_sales_rollup),
+                (SELECT COALESCE(SUM(service_count), 0) FROM daily_sales_rollup),
+                (SELECT COUNT(*) FROM services WHERE status <> 'Completed')
+        """)
+        sales_count, completed_count, pending_count = cursor.fetchone()
+        return [
+            ("Product Sales", int(sales_count)),
+            ("Completed Services", int(completed_count)),
+            ("Pending Services", pending_count),
+        ]
+    except Exception as e:
+        print("Orders Report Error:", e)
+        return [("Product Sales", 0), ("Completed Services", 0), ("Pending Services", 0)]
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_revenue_between(start_date, end_date):
+    """
+    Returns per-day totals from the daily rollup for start_date..end_date (inclusive):
+    [(day, revenue, order_count, units, service_revenue), ...]
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT sale_day, revenue, order_count, units, service_revenue
+            FROM daily_sales_rollup
+            WHERE sale_day BETWEEN %s AND %s
+            ORDER BY sale_day
+        """, (start_date, end_date))
+        return cursor.fetchall() or []
+    except Exception as e:
+        print("Revenue Range Error:", e)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
+def _customer_activity_query(include_inactive):
+    """(name, orders, spent) per customer, for the caller to filter and order"""
+    query = """
+        SELECT name, SUM(orders) AS orders, SUM(spent) AS spent
+        FROM (
+            SELECT full_name AS name, COUNT(*) AS orders, SUM(total_amount) AS spent
+            FROM orders GROUP BY full_name
+            UNION ALL
+            SELECT full_name, COUNT(*), SUM(price)
+            FROM completed_services GROUP BY full_name
+    """
+    if include_inactive:
+        query += """
+            UNION ALL
+            SELECT full_name, 0, 0 FROM users WHERE role = 'customer'
+        """
+    return query + """
+        ) activity
+        GROUP BY name
+    """
+
+
+def _activity_row(name, orders, spent):
+    return name, int(orders or 0), spent or 0
+
+
+@instrumented
+def get_customer_activity(limit=None, include_inactive=False):
+    """
+    Returns [(customer_name, orders_count, total_spent), ...] sorted by total_spent.
+    Orders and spend combine product sales and completed services.
+    include_inactive also lists registered customers with no activity yet.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        query = _customer_activity_query(include_inactive) + " ORDER BY spent DESC, name ASC"
+        params = []
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(int(limit))
+
+        cursor.execute(query, params)
+        return [_activity_row(*row) for row in cursor.fetchall()]
+    except Exception as e:
+        print("Customer Report Error:", e)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_customer_activity_page(after=None, limit=50, search=None, include_inactive=False, with_total=False):
+    """
+    One page of get_customer_activity, biggest spenders first.
+    - after: (total_spent, name) of the last row of the previous page (None = first page)
+    - search: only names containing it
+    Returns dict: rows, next ((total_spent, name) or None), total (customers matching, or None)
+    """
+    conn = None
+    result = {"rows": [], "next": None, "total": None}
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        having, params = [], []
+        if search:
+            having.append("name LIKE %s")
+            params.append(f"%{search}%")
+        filtered = _customer_activity_query(include_inactive)
+        if having:
+            filtered += " HAVING " + " AND ".join(having)
+
+        if with_total:
+            cursor.execute(f"SELECT COUNT(*) FROM ({filtered}) customers", params)
+            result["total"] = cursor.fetchone()[0]
+
+        query = f"SELECT name, orders, spent FROM ({filtered}) customers"
+        page_params = list(params)
+        if after is not None:
+            spent, name = after
+            query += " WHERE spent < %s OR (spent = %s AND name > %s)"
+            page_params.extend([spent, spent, name])
+        # One extra row tells us whether there is a next page
+        query += " ORDER BY spent DESC, name ASC LIMIT %s"
+        page_params.append(int(limit) + 1)
+
+        cursor.execute(query, page_params)
+        rows = [_activity_row(*row) for row in cursor.fetchall()]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            result["next"] = (rows[-1][2], rows[-1][0])
+        result["rows"] = rows
+        return result
+    except Exception as e:
+        print("Customer Page Error:", e)
+        return result
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_stock_page(category=None, search=None, after=None, limit=50):
+    """
+    One page of active products ordered by category and code, read as a range
+    on idx_products_active_category_code.
+    - search: only products whose name or code contains it (as database.get_products)
+    - after: (category, code) of the last row of the previous page (None = first page)
+    Returns dict: rows (as database.get_products), next ((category, code) or None)
+    """
+    conn = None
+    result = {"rows": [], "next": None}
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        query = ("SELECT product_id, code, name, price, stock_qty, category, details FROM products "
+                 "WHERE is_active = 1")
+        params = []
+        if category:
+            query += " AND category = %s"
+            params.append(category)
+        if search:
+            query += " AND (name LIKE %s OR code LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%"])
+        if after is not None:
+            after_category, after_code = after
+            query += " AND (category > %s OR (category = %s AND code > %s))"
+            params.extend([after_category, after_category, after_code])
+        query += " ORDER BY category, code LIMIT %s"
+        params.append(int(limit) + 1)
+
+        cursor.execute(query, params)
+        rows = cursor.fetchall() or []
+        if len(rows) > limit:
+            rows = rows[:limit]
+            result["next"] = (rows[-1][5], rows[-1][1])
+        result["rows"] = rows
+        return result
+    except Exception as e:
+        print("Stock Page Error:", e)
+        return result
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_stock_by_category(low_stock_threshold=5):
+    """Returns {category: {items, total_stock, low_stock}} for active products"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT category,
+                   COUNT(*),
+                   COALESCE(SUM(stock_qty), 0),
+                   SUM(CASE WHEN stock_qty <= %s THEN 1 ELSE 0 END)
+            FROM products
+            WHERE is_active = 1
+            GROUP BY category
+            ORDER BY category
+        """, (low_stock_threshold,))
+        return {
+            cat: {"items": int(items), "total_stock": int(total), "low_stock": int(low or 0)}
+            for cat, items, total, low in cursor.fetchall()
+        }
+    except Exception as e:
+        print("Stock Report Error:", e)
+        return {}
+    finally:
+        if conn:
+            conn.close()
@@ -0,0 +1,206 @@
+"""
+Stock reservations: quantities held for a cart until they expire.
+
+Adding to a cart reserves the units (stock minus other carts' active holds
+must cover them), so "not enough stock" shows up when the customer adds an
+item instead of at checkout. Every reservation change extends the cart's
+active holds by ttl_seconds; checkout_cart(cart_id=...) turns the holds into
+sales without re-checking those lines. Expired holds stop counting
+immediately (every query filters on expires_at) and a sweeper thread
+deletes them every sweep_interval seconds.
+"""
+import threading
+
+from database import get_connection, instrumented
+
+reservation_config = {
+    "ttl_seconds": 900,
+    "sweep_interval": 60.0
+}
+
+_sweeper = None
+
+
+@instrumented
+def reserve(cart_id, code, quantity, ttl=None):
+    """
+    Sets the cart's hold on product code to quantity (0 releases it) and
+    extends the cart's other active holds. Returns (ok, available) where
+    available is what this cart can hold in total (stock minus other carts'
+    active holds), or (False, None) on error.
+    """
+    ttl = ttl or reservation_config["ttl_seconds"]
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        # Locking the product row serializes reservations (and unreserved checkouts) of it
+        cursor.execute("SELECT product_id, stock_qty FROM products WHERE code = %s AND is_active = 1 FOR UPDATE",
+                       (code,))
+        row = cursor.fetchone()
+        if not row:
+            conn.rollback()
+            return False, None
+        product_id, stock = row
+        cursor.execute(
+            "SELECT COALESCE(SUM(quantity), 0) FROM stock_reservations "
+            "WHERE product_id = %s AND expires_at > NOW() AND cart_id <> %s",
+            (product_id, cart_id))
+        available = stock - int(cursor.fetchone()[0])
+        if quantity > available:
+            conn.rollback()
+            return False, max(available, 0)
+
+        if quantity > 0:
+            cursor.execute(
+                "INSERT INTO stock_reservations (cart_id, product_id, quantity, expires_at) "
+                "VALUES (%s, %s, %s, DATE_ADD(NOW(), INTERVAL %s SECOND)) "
+                "ON DUPLICATE KEY UPDATE quantity = VALUES(quantity), expires_at = VALUES(expires_at)",
+                (cart_id, product_id, quantity, ttl))
+        else:
+            cursor.execute("DELETE FROM stock_reservations WHERE cart_id = %s AND product_id = %s",
+                           (cart_id, product_id))
+        # Only holds that are still active: an expired one may already be promised to another cart
+        cursor.execute(
+            "UPDATE stock_reservations SET expires_at = DATE_ADD(NOW(), INTERVAL %s SECOND) "
+            "WHERE cart_id = %s AND expires_at > NOW()",
+            (ttl, cart_id))
+        conn.commit()
+        return True, available
+    except Exception as e:
+        if conn: conn.rollback()
+        print("Reserve Stock Error:", e)
+        return False, None
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def release(cart_id):
+    """Drops every hold of a cart (cleared cart, logout)"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM stock_reservations WHERE cart_id = %s", (cart_id,))
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        print("Release Reservations Error:", e)
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_active_holds():
+    """Returns {product_id: units held by active reservations} (range scan on expires_at)"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT product_id, SUM(quantity) FROM stock_reservations "
+                       "WHERE expires_at > NOW() GROUP BY product_id")
+        return {product_id: int(held) for product_id, held in cursor.fetchall()}
+    except Exception as e:
+        print("Active Holds Error:", e)
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+
+def apply_holds(products):
+    """
+    Replaces stock_qty in product rows (product_id, code, name, price,
+    stock_qty, ...) with the available-to-sell quantity
+    """
+    holds = get_active_holds()
+    if not holds:
+        return products
+    return [row[:4] + (max(row[4] - holds.get(row[0], 0), 0),) + tuple(row[5:]) for row in products]
+
+
+@instrumented
+def get_available_to_sell(code):
+    """Stock minus all active holds for one product, or None if it doesn't exist"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT p.stock_qty - COALESCE(SUM(r.quantity), 0)
+            FROM products p
+            LEFT JOIN stock_reservations r ON r.product_id = p.product_id AND r.expires_at > NOW()
+            WHERE p.code = %s
+            GROUP BY p.product_id, p.stock_qty
+        """, (code,))
+        row = cursor.fetchone()
+        return int(row[0]) if row else None
+    except Exception as e:
+        print("Available To Sell Error:", e)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def sweep_expired():
+    """Deletes expired holds; returns how many were removed"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM stock_reservations WHERE expires_at <= NOW()")
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        if conn: conn.rollback()
+        print("Reservation Sweep Error:", e)
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+class ReservationSweeper:
+    """Calls sweep_expired() every interval seconds on a daemon thread"""
+
+    def __init__(self, interval=60.0):
+        self.interval = interval
+        self.swept = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="reservation-sweeper", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.swept += sweep_expired()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def start_sweeper(interval=None):
+    """Starts the background sweeper (replacing a running one); returns it"""
+    global _sweeper
+    stop_sweeper()
+    _sweeper = ReservationSweeper(interval or reservation_config["sweep_interval"])
+    _sweeper.start()
+    return _sweeper
+
+
+def stop_sweeper():
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.stop()
+        _sweeper = None
@@ -0,0 +1,157 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+# Below this length a term has no trigrams to look up; callers fall back to LIKE
+MIN_TERM_LENGTH = 3
+
+
+def _grams(text):
+    """Trigrams of text as typed (used for substring matches)"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _word_grams(text):
+    """Trigrams of each word padded like "  word " (used for typo-tolerant matches)"""
+    grams = set()
+    for word in text.split():
+        grams |= _grams(f"  {word} ")
+    return grams
+
+
+def rank(term, code, name):
+    """
+    Sort key for a product matching term (casefolded):
+    exact name/code, then name/code prefix, then word prefix, then any substring
+    """
+    return _rank(term, str(code).casefold(), str(name).casefold())
+
+
+def _rank(term, code_cf, name_cf):
+    if term == code_cf or term == name_cf:
+        position = 0
+    elif code_cf.startswith(term) or name_cf.startswith(term):
+        position = 1
+    elif " " + term in name_cf:
+        position = 2
+    else:
+        position = 3
+    return position, code_cf
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over product names and codes.
+    Each product is stored as (product_id, code, name, category); search()
+    returns matching product ids ordered by rank() - the same matches as
+    "name LIKE %term% OR code LIKE %term%", found by intersecting trigram
+    posting lists instead of scanning every row.
+    When nothing contains the term, products sharing at least
+    fuzzy_threshold of its word trigrams are returned, most similar first,
+    so "grpahics" still finds "graphics".
+    """
+
+    def __init__(self, fuzzy_threshold=0.5):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._lock = threading.RLock()
+        self._docs = {}  # product_id -> (code, name, category, code_cf, name_cf)
+        self._postings = defaultdict(set)  # trigram -> {product_id}
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def build(self, products):
+        """Replaces the index with products: iterable of (product_id, code, name, category)"""
+        with self._lock:
+            self._docs = {}
+            self._postings = defaultdict(set)
+            for product_id, code, name, category in products:
+                self._add(product_id, code, name, category)
+            self.built_at = time.monotonic()
+
+    def add(self, product_id, code, name, category):
+        with self._lock:
+            self._remove(product_id)
+            self._add(product_id, code, name, category)
+
+    def remove(self, product_id):
+        with self._lock:
+            self._remove(product_id)
+
+    def clear(self):
+        with self._lock:
+            self._docs = {}
+            self._postings = defaultdict(set)
+            self.built_at = None
+
+    def _doc_grams(self, code_cf, name_cf):
+        return _grams(code_cf) | _grams(name_cf) | _word_grams(code_cf) | _word_grams(name_cf)
+
+    def _add(self, product_id, code, name, category):
+        code_cf, name_cf = str(code).casefold(), str(name).casefold()
+        self._docs[product_id] = (code, name, category, code_cf, name_cf)
+        for gram in self._doc_grams(code_cf, name_cf):
+            self._postings[gram].add(product_id)
+
+    def _remove(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        for gram in self._doc_grams(doc[3], doc[4]):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def search(self, term, category=None, limit=None, fuzzy=True):
+        """Returns product ids matching term (at least MIN_TERM_LENGTH characters)"""
+        term = term.casefold()
+        with self._lock:
+            ids = self._substring_matches(term)
+            if category is not None:
+                ids = [i for i in ids if self._docs[i][2] == category]
+            if ids:
+                key = lambda i: _rank(term, self._docs[i][3], self._docs[i][4])
+                if limit is not None:
+                    return heapq.nsmallest(limit, ids, key=key)
+                ids.sort(key=key)
+            elif fuzzy:
+                ids = self._fuzzy_matches(term, category)
+        return ids[:limit] if limit is not None else ids
+
+    def _substring_matches(self, term):
+        grams = _grams(term)
+        if not grams:
+            return []
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if len(term) == 3:
+            return list(candidates)
+        docs = self._docs
+        return [i for i in candidates if term in docs[i][3] or term in docs[i][4]]
+
+    def _fuzzy_matches(self, term, category):
+        grams = _word_grams(term)
+        if not grams:
+            return []
+        shared = defaultdict(int)
+        for gram in grams:
+            for product_id in self._postings.get(gram, ()):
+                shared[product_id] += 1
+
+        needed = self.fuzzy_threshold * len(grams)
+        scored = [
+            (-count, self._docs[i][3], i) for i, count in shared.items()
+            if count >= needed and (category is None or self._docs[i][2] == category)
+        ]
+        scored.sort()
+        return [i for _, _, i in scored]
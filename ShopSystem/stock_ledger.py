@@ -0,0 +1,266 @@
+"""
+Stock history: the append-only stock_movements ledger and its checkpoints.
+
+Every stock change (add_product, restock_product, checkout_cart) appends a
+movement with the change and the product's balance after it in the same
+transaction. create_checkpoint() snapshots every product's stock as of a
+movement id (previous checkpoint + the movements since), so stock as of any
+date is the nearest earlier checkpoint plus the movements after it, a tail
+kept short by taking checkpoints every checkpoint_interval seconds or after
+max_tail movements (StockCheckpointer). History starts at the "opening"
+movements written when the ledger was created.
+"""
+import threading
+from datetime import date, datetime, time, timedelta
+
+from database import get_backend, get_connection, instrumented
+
+ledger_config = {
+    "checkpoint_interval": 86400,
+    "max_tail": 50000,
+    "poll_interval": 300.0,
+    # Checkpoints stop at movements at least this old (and older than any open transaction)
+    "settle_seconds": 60
+}
+
+_checkpointer = None
+
+
+def _as_datetime(when):
+    """A date means the end of that day"""
+    if isinstance(when, date) and not isinstance(when, datetime):
+        return datetime.combine(when, time(23, 59, 59))
+    return when
+
+
+def _latest_checkpoint(cursor, when=None):
+    """Returns (checkpoint_id, last_movement_id) of the newest checkpoint (taken at or before when), or (0, 0)"""
+    if when is None:
+        cursor.execute("SELECT checkpoint_id, last_movement_id FROM stock_checkpoints "
+                       "ORDER BY checkpoint_id DESC LIMIT 1")
+    else:
+        cursor.execute("SELECT checkpoint_id, last_movement_id FROM stock_checkpoints WHERE taken_at <= %s "
+                       "ORDER BY taken_at DESC, checkpoint_id DESC LIMIT 1", (when,))
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+@instrumented
+def create_checkpoint():
+    """
+    Writes a checkpoint of every product's stock up to the newest movement
+    created settle_seconds ago and before the oldest transaction still open,
+    so a movement with a lower id can't commit after the checkpoint skipped
+    it. Returns the new checkpoint_id, or None when nothing changed since the
+    last one.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DATE_ADD(NOW(), INTERVAL %s SECOND)", (-ledger_config["settle_seconds"],))
+        taken_at = cursor.fetchone()[0]
+        oldest_open = get_backend().oldest_open_transaction(cursor)
+        if oldest_open is not None:
+            # created_at has one-second resolution
+            taken_at = min(taken_at, oldest_open - timedelta(seconds=1))
+        cursor.execute("SELECT movement_id FROM stock_movements WHERE created_at <= %s "
+                       "ORDER BY created_at DESC, movement_id DESC LIMIT 1", (taken_at,))
+        row = cursor.fetchone()
+        previous_id, previous_last = _latest_checkpoint(cursor)
+        if not row or row[0] <= previous_last:
+            conn.rollback()
+            return None
+
+        checkpoint_id, last_movement_id = previous_id + 1, row[0]
+        cursor.execute("""
+            INSERT INTO stock_checkpoints (checkpoint_id, product_id, category, stock_qty, last_movement_id, taken_at)
+            SELECT %s, p.product_id, p.category, COALESCE(c.stock_qty, 0) + COALESCE(t.delta, 0), %s, %s
+            FROM products p
+            LEFT JOIN stock_checkpoints c ON c.checkpoint_id = %s AND c.product_id = p.product_id
+            LEFT JOIN (
+                SELECT product_id, SUM(delta) AS delta FROM stock_movements
+                WHERE movement_id > %s AND movement_id <= %s GROUP BY product_id
+            ) t ON t.product_id = p.product_id
+            WHERE c.product_id IS NOT NULL OR t.product_id IS NOT NULL
+        """, (checkpoint_id, last_movement_id, taken_at, previous_id, previous_last, last_movement_id))
+        conn.commit()
+        return checkpoint_id
+    except Exception as e:
+        if conn: conn.rollback()
+        print("Stock Checkpoint Error:", e)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def checkpoint_due():
+    """True when the last checkpoint is older than checkpoint_interval or max_tail movements behind"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM stock_checkpoints WHERE taken_at > DATE_ADD(NOW(), INTERVAL %s SECOND) LIMIT 1",
+                       (-ledger_config["checkpoint_interval"],))
+        if cursor.fetchone() is None:
+            return True
+        checkpoint_id, last_movement_id = _latest_checkpoint(cursor)
+        cursor.execute("SELECT COUNT(*) FROM stock_movements WHERE movement_id > %s", (last_movement_id,))
+        return cursor.fetchone()[0] >= ledger_config["max_tail"]
+    except Exception as e:
+        print("Checkpoint Due Error:", e)
+        return False
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_stock_as_of(code, when):
+    """
+    Stock of one product at when (datetime, or date = end of that day): 0
+    before the product was added, None if no product has that code
+    """
+    when = _as_datetime(when)
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT product_id FROM products WHERE code = %s", (code,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        product_id = row[0]
+        checkpoint_id, last_movement_id = _latest_checkpoint(cursor, when)
+        cursor.execute("SELECT stock_qty FROM stock_checkpoints WHERE checkpoint_id = %s AND product_id = %s",
+                       (checkpoint_id, product_id))
+        row = cursor.fetchone()
+        cursor.execute("SELECT COALESCE(SUM(delta), 0) FROM stock_movements "
+                       "WHERE product_id = %s AND movement_id > %s AND created_at <= %s",
+                       (product_id, last_movement_id, when))
+        return (row[0] if row else 0) + int(cursor.fetchone()[0])
+    except Exception as e:
+        print("Stock As Of Error:", e)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_category_stock_as_of(category, when):
+    """{code: stock} at when for the products of a category that existed then"""
+    when = _as_datetime(when)
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        checkpoint_id, last_movement_id = _latest_checkpoint(cursor, when)
+        cursor.execute("""
+            SELECT p.code, c.stock_qty FROM stock_checkpoints c
+            JOIN products p ON p.product_id = c.product_id
+            WHERE c.checkpoint_id = %s AND c.category = %s
+        """, (checkpoint_id, category))
+        stock = dict(cursor.fetchall())
+        cursor.execute("""
+            SELECT p.code, SUM(m.delta) FROM stock_movements m
+            JOIN products p ON p.product_id = m.product_id
+            WHERE m.movement_id > %s AND m.created_at <= %s AND p.category = %s
+            GROUP BY p.code
+        """, (last_movement_id, when, category))
+        for code, delta in cursor.fetchall():
+            stock[code] = stock.get(code, 0) + int(delta)
+        return stock
+    except Exception as e:
+        print("Category Stock As Of Error:", e)
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_stock_movements(code, limit=50):
+    """A product's latest movements, newest first: (created_at, delta, balance_after, reason, order_id)"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT m.created_at, m.delta, m.balance_after, m.reason, m.order_id FROM stock_movements m
+            WHERE m.product_id = (SELECT product_id FROM products WHERE code = %s)
+            ORDER BY m.movement_id DESC LIMIT %s
+        """, (code, limit))
+        return cursor.fetchall() or []
+    except Exception as e:
+        print("Stock Movements Error:", e)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
+@instrumented
+def get_low_stock_products(threshold=5, limit=None):
+    """Active products with stock_qty <= threshold, lowest first (range on idx_products_active_stock)"""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        query = ("SELECT product_id, code, name, stock_qty, category FROM products "
+                 "WHERE is_active = 1 AND stock_qty <= %s ORDER BY stock_qty, product_id")
+        params = [threshold]
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+        cursor.execute(query, params)
+        return cursor.fetchall() or []
+    except Exception as e:
+        print("Low Stock Error:", e)
+        return []
+    finally:
+        if conn:
+            conn.close()
+
+
+class StockCheckpointer:
+    """Takes a checkpoint whenever one is due, checking every interval seconds on a daemon thread"""
+
+    def __init__(self, interval=300.0):
+        self.interval = interval
+        self.taken = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stock-checkpointer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if checkpoint_due() and create_checkpoint() is not None:
+                self.taken += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def start_checkpointer(interval=None):
+    """Starts the background checkpointer (replacing a running one); returns it"""
+    global _checkpointer
+    stop_checkpointer()
+    _checkpointer = StockCheckpointer(interval or ledger_config["poll_interval"])
+    _checkpointer.start()
+    return _checkpointer
+
+
+def stop_checkpointer():
+    global _checkpointer
+    if _checkpointer is not None:
+        _checkpointer.stop()
+        _checkpointer = None
@@ -0,0 +1,74 @@
+from PyQt6.QtCore import QObject
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+
+class LazyTabs(QObject):
+    """
+    QTabWidget pages that are built the first time they are shown.
+    Each page has a build() that returns its widget and an optional refresh()
+    that (re)loads its data. refresh(key) loads a visible page right away and
+    only marks a hidden one stale; it is reloaded when the user switches to it.
+    """
+
+    def __init__(self, tabs, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self._pages = {}  # key -> page dict
+        self._keys = []  # tab index -> key
+        tabs.currentChanged.connect(self._on_current_changed)
+
+    def add(self, key, title, build, refresh=None):
+        holder = QWidget()
+        layout = QVBoxLayout(holder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._pages[key] = {"holder": holder, "build": build, "refresh": refresh, "built": False, "stale": True}
+        self._keys.append(key)
+        self.tabs.blockSignals(True)  # the first addTab makes it current; build_current() handles that
+        self.tabs.addTab(holder, title)
+        self.tabs.blockSignals(False)
+
+    def current_key(self):
+        index = self.tabs.currentIndex()
+        return self._keys[index] if 0 <= index < len(self._keys) else None
+
+    def is_built(self, key):
+        return self._pages[key]["built"]
+
+    def build(self, key):
+        page = self._pages[key]
+        if not page["built"]:
+            page["built"] = True
+            page["holder"].layout().addWidget(page["build"]())
+        return page["holder"]
+
+    def build_current(self):
+        """Builds the visible page without loading it (e.g. at the end of the window's __init__)"""
+        key = self.current_key()
+        if key is not None:
+            self.build(key)
+
+    def show(self, key):
+        """Switches to a page, building and loading it if needed"""
+        self.tabs.setCurrentIndex(self._keys.index(key))
+        self._on_current_changed(self.tabs.currentIndex())
+
+    def refresh(self, key):
+        page = self._pages[key]
+        if page["built"] and key == self.current_key():
+            page["stale"] = False
+            if page["refresh"] is not None:
+                page["refresh"]()
+        else:
+            page["stale"] = True
+
+    def refresh_all(self):
+        for key in self._keys:
+            self.refresh(key)
+
+    def _on_current_changed(self, index):
+        if not 0 <= index < len(self._keys):
+            return
+        key = self._keys[index]
+        self.build(key)
+        if self._pages[key]["stale"]:
+            self.refresh(key)
@@ -7,13 +7,14 @@ from PyQt6.QtCore import Qt, QTimer, QRectF, QPropertyAnimation, QEasingCurve
 from PyQt6.QtGui import QColor, QPixmap, QFont, QPainter, QPainterPath, QPen
 
 from controllers.login_controller import LoginController
-import database
+from views.workers import TaskRunner
 
 
 class LoginView(QMainWindow):
     def __init__(self):
         super().__init__()
         self.controller = LoginController(self)
+        self.tasks = TaskRunner(self)
         self.setWindowTitle("LOGIN WINDOW")
         self.showMaximized()
 
@@ -26,7 +27,6 @@ class LoginView(QMainWindow):
             QPushButton { font-family: 'Segoe UI', sans-serif; }
         """)
 
-        database.initialize_db()
         self.mode = 'login'
 
         central = QWidget()
@@ -253,36 +253,56 @@ class LoginView(QMainWindow):
         self.animation2.start()
 
     def on_auth_clicked(self):
+        if self.tasks.is_busy("auth"):
+            return
+
         u_text = self.u.text().strip()
         p_text = self.p.text().strip()
         fn_text = self.fn.text().strip()
         em_text = self.em.text().strip()
         ph_text = self.ph.text().strip()
 
+        # Password hashing and the database round trip run off the GUI thread
+        self.btn.setEnabled(False)
         if self.mode == 'login':
-            success, user_data = self.controller.handle_login(u_text, p_text)
-            if success:
-                user_id, role, full_name, username = user_data
-
-                # Import here to avoid circular dependency
-                if role == "manager":
-                    from views.manager_view import ManagerView
-                    self.next_window = ManagerView()
-                else:
-                    from views.user_view import UserView
-                    self.next_window = UserView(user_id, username, full_name)
-
-                self.next_window.show()
-                self.close()
-            else:
-                self.show_custom_error("Incorrect Username or Password", is_error=True)
+            self.tasks.submit("auth", lambda: self.controller.handle_login(u_text, p_text),
+                              self.on_login_finished, self.on_auth_failed)
         else:
-            success, msg = self.controller.handle_register(u_text, p_text, fn_text, em_text, ph_text)
-            if success:
-                self.show_custom_error("Account Created! Please Login.", is_error=False)
-                self.toggle_mode()
+            self.tasks.submit("auth",
+                              lambda: self.controller.handle_register(u_text, p_text, fn_text, em_text, ph_text),
+                              self.on_register_finished, self.on_auth_failed)
+
+    def on_login_finished(self, result):
+        self.btn.setEnabled(True)
+        success, user_data = result
+        if success:
+            user_id, role, full_name, username = user_data
+
+            # Import here to avoid circular dependency
+            if role == "manager":
+                from views.manager_view import ManagerView
+                self.next_window = ManagerView()
             else:
-                self.show_custom_error(msg, is_error=True)
+                from views.user_view import UserView
+                self.next_window = UserView(user_id, username, full_name)
+
+            self.next_window.show()
+            self.close()
+        else:
+            self.show_custom_error("Incorrect Username or Password", is_error=True)
+
+    def on_register_finished(self, result):
+        self.btn.setEnabled(True)
+        success, msg = result
+        if success:
+            self.show_custom_error("Account Created! Please Login.", is_error=False)
+            self.toggle_mode()
+        else:
+            self.show_custom_error(msg, is_error=True)
+
+    def on_auth_failed(self, error):
+        self.btn.setEnabled(True)
+        self.show_custom_error(str(error), is_error=True)
 
     def show_custom_error(self, message, is_error=True):
         dlg = QDialog(self)
@@ -3,11 +3,16 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QTabWidget,
     QFrame, QLineEdit, QGridLayout, QAbstractItemView, QFileDialog,
-    QComboBox, QTextEdit, QDialog, QSpinBox
+    QComboBox, QTextEdit, QDialog, QSpinBox, QTableView
 )
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QColor, QFont, QCursor
+from PyQt6.QtGui import QFont, QCursor
 from controllers.manager_controller import ManagerController
+from views.workers import TaskRunner
+from views.lazy_tabs import LazyTabs
+from profiling import profiled_method
+from views.search import ProductSearch
+from views.table_models import RowTableModel, Column, ActionButton, ButtonDelegate, GREEN, RED
 
 
 class RestockDialog(QDialog):
@@ -206,10 +211,167 @@ class StatDetailDialog(QDialog):
         layout.addLayout(btn_layout)
 
 
+class PagedTable(QWidget):
+    """
+    Search box, read-only table and Previous/Next buttons over a keyset-paged query.
+    - fetch(search, after, limit, *params()) runs on the task pool and returns
+      {rows, next, ...}; next is passed back as after for the following page
+    - params(): extra filter values, read on the GUI thread
+    - on_page(page): called with every loaded page
+    Only the page on screen is kept; typing reloads the first page once it pauses.
+    """
+    page_size = 50
+
+    def __init__(self, tasks, key, columns, fetch, placeholder, params=None, on_page=None, delay_ms=250,
+                 parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.key = key
+        self.fetch = fetch
+        self.params = params or (lambda: ())
+        self.on_page = on_page
+        self._starts = [None]  # after of every page up to the one shown
+        self._next = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.filters = QHBoxLayout()
+        self.search = QLineEdit()
+        self.search.setPlaceholderText(placeholder)
+        self.search.setFixedHeight(40)
+        self.search.setStyleSheet("""
+            QLineEdit {
+                background: white;
+                border: 1px solid #e2e8f0;
+                border-radius: 6px;
+                padding: 10px;
+                font-size: 14px;
+            }
+            QLineEdit:focus {
+                border: 1px solid #009688;
+                outline: none;
+            }
+        """)
+        self.filters.addWidget(self.search)
+        layout.addLayout(self.filters)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.reload)
+        self.search.textChanged.connect(self.timer.start)
+
+        self.model = RowTableModel(columns, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.table.setStyleSheet("""
+            QTableView {
+                border: 1px solid #e2e8f0;
+                border-radius: 8px;
+                background-color: white;
+            }
+            QHeaderView::section {
+                background-color: #f8fafc;
+                padding: 12px;
+                border: none;
+                font-weight: bold;
+                color: #1e293b;
+            }
+        """)
+        layout.addWidget(self.table)
+
+        button_style = """
+            QPushButton {
+                background: white;
+                border: 1px solid #cbd5e1;
+                border-radius: 6px;
+                color: #475569;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #f1f5f9;
+            }
+            QPushButton:disabled {
+                background: #f8fafc;
+                color: #cbd5e1;
+            }
+        """
+        self.btn_prev = QPushButton("◀ Previous")
+        self.btn_next = QPushButton("Next ▶")
+        for btn in (self.btn_prev, self.btn_next):
+            btn.setFixedWidth(120)
+            btn.setFixedHeight(36)
+            btn.setEnabled(False)
+            btn.setStyleSheet(button_style)
+        self.btn_prev.clicked.connect(self.prev_page)
+        self.btn_next.clicked.connect(self.next_page)
+        self.lbl_page = QLabel("Page 1")
+        self.lbl_page.setStyleSheet("font-weight: bold; color: #334155; border: none;")
+
+        pager = QHBoxLayout()
+        pager.addStretch()
+        pager.addWidget(self.btn_prev)
+        pager.addWidget(self.lbl_page)
+        pager.addWidget(self.btn_next)
+        layout.addLayout(pager)
+
+    def reload(self, *_):
+        """Back to the first page with the current search and filters"""
+        self.timer.stop()
+        self._starts = [None]
+        self._load()
+
+    def next_page(self):
+        if self._next is not None:
+            self._starts.append(self._next)
+            self._load()
+
+    def prev_page(self):
+        if len(self._starts) > 1:
+            self._starts.pop()
+            self._load()
+
+    def cancel(self):
+        """Drops a page still loading (call when the dialog closes)"""
+        self.timer.stop()
+        self.tasks.cancel(self.key)
+
+    def _load(self):
+        search = self.search.text().strip() or None
+        after = self._starts[-1]
+        params = self.params()
+        self.btn_prev.setEnabled(False)
+        self.btn_next.setEnabled(False)
+        self.tasks.submit(self.key, lambda: self.fetch(search, after, self.page_size, *params), self._show,
+                          lambda e: print(f"Detail Page Error: {e}"))
+
+    def _show(self, page):
+        self.model.set_rows(page["rows"])
+        self._next = page["next"]
+        self.lbl_page.setText(f"Page {len(self._starts)}")
+        self.btn_prev.setEnabled(len(self._starts) > 1)
+        self.btn_next.setEnabled(self._next is not None)
+        if self.on_page:
+            self.on_page(page)
+
+
 class ManagerView(QMainWindow):
+    @profiled_method
     def __init__(self):
         super().__init__()
         self.controller = ManagerController(self)
+        self.tasks = TaskRunner(self)
+        self.inventory_search = ProductSearch(
+            self.tasks, "inventory", self.controller.get_all_products, self.inventory_filter,
+            self.show_inventory, lambda e: print(f"Inventory Error: {e}"), parent=self)
         self.setWindowTitle("Manager Window")
         self.resize(1200, 800)
 
@@ -264,8 +426,27 @@ class ManagerView(QMainWindow):
         """)
         logout.clicked.connect(self.on_logout_clicked)
 
+        self.btn_trends = QPushButton("📈 Sales Trends")
+        self.btn_trends.setFixedHeight(40)
+        self.btn_trends.setStyleSheet("""
+            QPushButton {
+                background: #e0f2f1;
+                border: 1px solid #b2dfdb;
+                border-radius: 6px;
+                padding: 8px 14px;
+                color: #00796b;
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background: #b2dfdb;
+            }
+        """)
+        self.btn_trends.clicked.connect(self.on_trends_clicked)
+
         top.addLayout(tl)
         top.addStretch()
+        top.addWidget(self.btn_trends)
         top.addWidget(self.btn_profile)
         top.addWidget(logout)
         main_layout.addLayout(top)
@@ -313,10 +494,13 @@ class ManagerView(QMainWindow):
         """)
         main_layout.addWidget(self.tabs)
 
-        self.init_inventory_tab()
-        self.init_services_tab()
-        self.init_history_tab()
-        self.init_sales_tab()
+        # Tabs are built and loaded the first time they are shown
+        self.pages = LazyTabs(self.tabs, self)
+        self.pages.add("inventory", " 📦 Inventory ", self.init_inventory_tab, self.refresh_inventory_tab)
+        self.pages.add("services", " 🛠️ Pending Services ", self.init_services_tab, self.refresh_services)
+        self.pages.add("history", " 📜 Completed Services ", self.init_history_tab, self.refresh_history)
+        self.pages.add("sales", " 💰 Sales Report ", self.init_sales_tab, self.refresh_sales)
+        self.pages.build_current()
 
         QTimer.singleShot(100, self.refresh_all)
 
@@ -390,17 +574,9 @@ class ManagerView(QMainWindow):
             }
         """)
 
-        # Get revenue data
-        sales_revenue = sum([row[4] for row in self.controller.get_all_sales()])
-        # Get completed services revenue from completed_services table
-        completed_services = self.controller.get_completed_services()
-        services_revenue = sum([row[6] for row in completed_services])  # row[6] is price in completed_services
-        total_revenue = sales_revenue + services_revenue
-
-        revenue_data = [
-            ("Product Sales", sales_revenue),
-            ("Services", services_revenue),
-        ]
+        # Get revenue data (aggregated by the database)
+        revenue_data = self.controller.get_revenue_breakdown()
+        total_revenue = sum(amount for _, amount in revenue_data)
 
         for source, amount in revenue_data:
             row = table.rowCount()
@@ -454,17 +630,9 @@ class ManagerView(QMainWindow):
             }
         """)
 
-        # Get orders data
-        sales_count = len(self.controller.get_all_sales())
-        completed_services = len([s for s in self.controller.get_completed_services()])
-        pending_services = len([s for s in self.controller.get_all_services() if s[4] != "Completed"])
-        total_orders = sales_count + completed_services + pending_services
-
-        orders_data = [
-            ("Product Sales", sales_count),
-            ("Completed Services", completed_services),
-            ("Pending Services", pending_services),
-        ]
+        # Get orders data (counted by the database)
+        orders_data = self.controller.get_orders_breakdown()
+        total_orders = sum(count for _, count in orders_data)
 
         for category, count in orders_data:
             row = table.rowCount()
@@ -485,7 +653,7 @@ class ManagerView(QMainWindow):
         dialog.exec()
 
     def show_stock_details(self):
-        """Show detailed stock information with individual items"""
+        """Show stock per category and a paged, searchable list of the products"""
         content = QWidget()
         layout = QVBoxLayout(content)
 
@@ -494,106 +662,42 @@ class ManagerView(QMainWindow):
         summary.setStyleSheet("font-size: 18px; font-weight: bold; color: #1e293b; margin-bottom: 10px;")
         layout.addWidget(summary)
 
-        # Search bar
-        search_layout = QHBoxLayout()
-        search_input = QLineEdit()
-        search_input.setPlaceholderText("🔍 Search products...")
-        search_input.setFixedHeight(40)
-        search_input.setStyleSheet("""
-            QLineEdit {
-                background: white;
-                border: 1px solid #e2e8f0;
-                border-radius: 6px;
-                padding: 10px;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #009688;
-                outline: none;
-            }
-        """)
-        search_layout.addWidget(search_input)
-        layout.addLayout(search_layout)
-
-        # Create table for individual products
-        table = QTableWidget(0, 4)
-        table.setHorizontalHeaderLabels(["Category", "Product Name", "Code", "Stock"])
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        table.setAlternatingRowColors(True)
-        table.verticalHeader().setVisible(False)
-        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
-        table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        table.setStyleSheet("""
-            QTableWidget {
-                border: 1px solid #e2e8f0;
-                border-radius: 8px;
-                background-color: white;
-            }
-            QHeaderView::section {
-                background-color: #f8fafc;
-                padding: 12px;
-                border: none;
-                font-weight: bold;
-                color: #1e293b;
-            }
-        """)
-
-        # Get all products
-        products = self.controller.get_all_products()
-        all_product_data = [(p[5], p[2], p[1], p[4]) for p in products]  # category, name, code, stock
-
-        def populate_table(search_text=""):
-            """Populate table with optional search filter"""
-            table.setRowCount(0)
-            filtered_data = [
-                (cat, name, code, stock) for cat, name, code, stock in all_product_data
-                if
-                search_text.lower() in name.lower() or search_text.lower() in code.lower() or search_text.lower() in cat.lower()
-            ]
-
-            # Sort by category first, then by name
-            filtered_data.sort(key=lambda x: (x[0], x[1]))
-
-            for cat, name, code, stock in filtered_data:
-                row = table.rowCount()
-                table.insertRow(row)
-
-                cat_item = QTableWidgetItem(cat)
-                cat_item.setFont(QFont("Segoe UI", 9, QFont.Weight.Bold))
-                table.setItem(row, 0, cat_item)
-
-                table.setItem(row, 1, QTableWidgetItem(name))
-                table.setItem(row, 2, QTableWidgetItem(code))
-
-                stock_item = QTableWidgetItem(str(stock))
-                if stock <= 5:  # Low stock threshold
-                    stock_item.setForeground(QColor("#ef4444"))
-                    stock_item.setFont(QFont("Segoe UI", 9, QFont.Weight.Bold))
-                else:
-                    stock_item.setForeground(QColor("#10b981"))
-                table.setItem(row, 3, stock_item)
-
-        # Connect search input to table filtering
-        search_input.textChanged.connect(populate_table)
-
-        # Initial population
-        populate_table()
-
-        layout.addWidget(table)
+        # Category filter: one row per category, aggregated by the database
+        stock_breakdown = self.controller.get_stock_breakdown()
+        category = QComboBox()
+        category.setFixedHeight(40)
+        category.addItem("All Categories", None)
+        for cat, c in stock_breakdown.items():
+            category.addItem(f"{cat} ({c['items']} items, {c['total_stock']} units, {c['low_stock']} low)", cat)
+
+        products = PagedTable(
+            self.tasks, "stock_details",
+            [
+                Column("Category", lambda r: str(r[5]), bold=True),
+                Column("Product Name", lambda r: str(r[2])),
+                Column("Code", lambda r: str(r[1])),
+                Column("Stock", lambda r: str(r[4]), color=lambda r: RED if r[4] <= 5 else GREEN, bold=True),
+            ],
+            lambda search, after, limit, cat: self.controller.get_stock_page(cat, search, after, limit),
+            "🔍 Search products...", params=lambda: (category.currentData(),))
+        category.currentIndexChanged.connect(products.reload)
+        products.filters.insertWidget(0, category)
+        layout.addWidget(products)
 
         # Total
-        total_stock = sum([p[4] for p in products])
-        low_stock_count = len([p for p in products if p[4] <= 5])
+        total_stock = sum(c["total_stock"] for c in stock_breakdown.values())
+        low_stock_count = len(self.controller.get_low_stock_products())
         total_label = QLabel(f"Total Stock Units: {total_stock} | Low Stock Items: {low_stock_count}")
         total_label.setStyleSheet("font-size: 20px; font-weight: bold; color: #f59e0b; margin-top: 20px;")
         layout.addWidget(total_label)
 
+        products.reload()
         dialog = StatDetailDialog(self, "📦 Stock Details", content)
         dialog.exec()
+        products.cancel()
 
     def show_customers_details(self):
-        """Show detailed customer information with search"""
+        """Show a paged, searchable list of customer activity"""
         content = QWidget()
         layout = QVBoxLayout(content)
 
@@ -602,30 +706,47 @@ class ManagerView(QMainWindow):
         summary.setStyleSheet("font-size: 18px; font-weight: bold; color: #1e293b; margin-bottom: 10px;")
         layout.addWidget(summary)
 
-        # Search bar
-        search_layout = QHBoxLayout()
-        search_input = QLineEdit()
-        search_input.setPlaceholderText("🔍 Search customers...")
-        search_input.setFixedHeight(40)
-        search_input.setStyleSheet("""
-            QLineEdit {
-                background: white;
-                border: 1px solid #e2e8f0;
-                border-radius: 6px;
-                padding: 10px;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #009688;
-                outline: none;
-            }
-        """)
-        search_layout.addWidget(search_input)
-        layout.addLayout(search_layout)
+        total_label = QLabel("Total Unique Customers: ...")
+        total_label.setStyleSheet("font-size: 20px; font-weight: bold; color: #8b5cf6; margin-top: 20px;")
 
-        # Create table
-        table = QTableWidget(0, 3)
-        table.setHorizontalHeaderLabels(["Customer", "Total Orders", "Total Spent"])
+        def show_total(page):
+            if page["total"] is not None:
+                label = "Matching Customers" if customers.search.text().strip() else "Total Unique Customers"
+                total_label.setText(f"{label}: {page['total']}")
+
+        # Every registered customer plus anyone with orders/services, a page at a time
+        customers = PagedTable(
+            self.tasks, "customer_details",
+            [
+                Column("Customer", lambda r: str(r[0] or "")),
+                Column("Total Orders", lambda r: str(r[1])),
+                Column("Total Spent", lambda r: f"₱{r[2]:,.2f}"),
+            ],
+            lambda search, after, limit: self.controller.get_customer_page(search, after, limit),
+            "🔍 Search customers...", on_page=show_total)
+        layout.addWidget(customers)
+        layout.addWidget(total_label)
+
+        customers.reload()
+        dialog = StatDetailDialog(self, "👥 Customer Details", content)
+        dialog.exec()
+        customers.cancel()
+
+    def on_trends_clicked(self):
+        """Computes the trends in the background (all sales of the last year), then shows them"""
+        self.btn_trends.setEnabled(False)
+        self.btn_trends.setText("📈 Loading...")
+        self.tasks.submit("trends", self.controller.get_sales_trends, self.show_trends_details, self.on_trends_failed)
+
+    def on_trends_failed(self, error):
+        self.btn_trends.setEnabled(True)
+        self.btn_trends.setText("📈 Sales Trends")
+        QMessageBox.warning(self, "Sales Trends", f"Could not compute trends: {error}")
+
+    def trend_table(self, headers, rows):
+        """Read-only table styled like the other detail dialogs"""
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         table.setAlternatingRowColors(True)
         table.verticalHeader().setVisible(False)
@@ -646,64 +767,53 @@ class ManagerView(QMainWindow):
                 color: #1e293b;
             }
         """)
+        for r, values in enumerate(rows):
+            for c, value in enumerate(values):
+                table.setItem(r, c, QTableWidgetItem(value))
+        return table
 
-        # Get ALL registered customers first
-        all_customers = self.controller.get_all_customers()
-        customers = {}
-
-        # Initialize all customers with 0 orders and 0 spent
-        for customer_data in all_customers:
-            full_name = customer_data[0]  # full_name from database
-            customers[full_name] = {"orders": 0, "spent": 0}
-
-        # From sales
-        for sale in self.controller.get_all_sales():
-            date, cust, item, qty, total, payment, bank = sale
-            if cust not in customers:
-                customers[cust] = {"orders": 0, "spent": 0}
-            customers[cust]["orders"] += 1
-            customers[cust]["spent"] += total
-
-        # From completed services
-        for service in self.controller.get_completed_services():
-            cust = service[1]  # full_name is at index 1 in completed_services
-            if cust not in customers:
-                customers[cust] = {"orders": 0, "spent": 0}
-            customers[cust]["orders"] += 1
-            customers[cust]["spent"] += service[6]  # price is at index 6
-
-        # Store all customers data for filtering
-        all_customer_data = sorted(customers.items(), key=lambda x: (-x[1]["spent"], x[0]))
-
-        def populate_table(search_text=""):
-            """Populate table with optional search filter"""
-            table.setRowCount(0)
-            filtered_data = [
-                (customer, data) for customer, data in all_customer_data
-                if search_text.lower() in customer.lower()
-            ]
-
-            for customer, data in filtered_data:
-                row = table.rowCount()
-                table.insertRow(row)
-                table.setItem(row, 0, QTableWidgetItem(customer))
-                table.setItem(row, 1, QTableWidgetItem(str(data["orders"])))
-                table.setItem(row, 2, QTableWidgetItem(f"₱{data['spent']:,.2f}"))
-
-        # Connect search input to table filtering
-        search_input.textChanged.connect(populate_table)
-
-        # Initial population
-        populate_table()
+    @profiled_method
+    def show_trends_details(self, trends):
+        """Show revenue trends, best sellers and payment mix (computed by analytics)"""
+        self.btn_trends.setEnabled(True)
+        self.btn_trends.setText("📈 Sales Trends")
 
-        layout.addWidget(table)
+        def peso(amount):
+            return f"₱{amount:,.2f}" if amount is not None else "-"
 
-        # Total
-        total_label = QLabel(f"Total Unique Customers: {len(customers)}")
-        total_label.setStyleSheet("font-size: 20px; font-weight: bold; color: #8b5cf6; margin-top: 20px;")
-        layout.addWidget(total_label)
+        content = QWidget()
+        layout = QVBoxLayout(content)
+        summary = QLabel(f"Last 12 months: {trends['rows']:,} sales lines and services")
+        summary.setStyleSheet("font-size: 18px; font-weight: bold; color: #1e293b; margin-bottom: 10px;")
+        layout.addWidget(summary)
 
-        dialog = StatDetailDialog(self, "👥 Customer Details", content)
+        tabs = QTabWidget()
+        tabs.addTab(self.trend_table(
+            ["Day", "Revenue", "Units", "7-Day Average"],
+            [(day.strftime("%Y-%m-%d"), peso(revenue), str(units), peso(average))
+             for day, revenue, units, average in reversed(trends["daily"])]), "Daily")
+        tabs.addTab(self.trend_table(
+            ["Week Of", "Revenue", "Units"],
+            [(week.strftime("%Y-%m-%d"), peso(revenue), str(units))
+             for week, revenue, units, _ in reversed(trends["weekly"])]), "Weekly")
+        tabs.addTab(self.trend_table(
+            ["Month", "Revenue", "Units"],
+            [(month.strftime("%B %Y"), peso(revenue), str(units))
+             for month, revenue, units, _ in reversed(trends["monthly"])]), "Monthly")
+        tabs.addTab(self.trend_table(
+            ["Product", "Revenue", "Units"],
+            [(name, peso(revenue), str(units)) for name, revenue, units in trends["top_products"]]), "Top Products")
+        tabs.addTab(self.trend_table(
+            ["Customer", "Total Spent", "Orders", "Services"],
+            [(name, peso(spent), str(orders), str(services))
+             for name, spent, orders, services in trends["top_customers"]]), "Top Customers")
+        tabs.addTab(self.trend_table(
+            ["Payment Method", "Revenue", "Orders", "Share"],
+            [(method, peso(revenue), str(orders), f"{share * 100:.1f}%")
+             for method, revenue, orders, share in trends["payment_mix"]]), "Payment Mix")
+        layout.addWidget(tabs)
+
+        dialog = StatDetailDialog(self, "📈 Sales Trends", content)
         dialog.exec()
 
     def on_logout_clicked(self):
@@ -712,6 +822,10 @@ class ManagerView(QMainWindow):
         self.login_window.show()
         self.close()
 
+    def closeEvent(self, event):
+        self.tasks.cancel_all()
+        super().closeEvent(event)
+
     # === INVENTORY TAB ===
     def init_inventory_tab(self):
         tab = QWidget()
@@ -873,7 +987,7 @@ class ManagerView(QMainWindow):
                 outline: none;
             }
         """)
-        self.filter_cat.currentTextChanged.connect(self.refresh_inventory)
+        self.filter_cat.currentTextChanged.connect(self.inventory_search.run)
         filter_bar.addWidget(self.filter_cat)
 
         self.filter_search = QLineEdit()
@@ -893,15 +1007,28 @@ class ManagerView(QMainWindow):
                 outline: none;
             }
         """)
-        self.filter_search.textChanged.connect(self.refresh_inventory)
+        self.filter_search.textChanged.connect(self.inventory_search.schedule)
         filter_bar.addWidget(self.filter_search)
 
         filter_bar.addStretch()
         l.addLayout(filter_bar)
 
-        self.inv_t = QTableWidget(0, 6)
-        self.inv_t.setHorizontalHeaderLabels(["CODE", "NAME", "PRICE", "STOCK", "CATEGORY", "ACTION"])
+        self.inv_model = RowTableModel([
+            Column("CODE", lambda r: str(r[1])),
+            Column("NAME", lambda r: str(r[2])),
+            Column("PRICE", lambda r: f"₱{r[3]:,.2f}"),
+            Column("STOCK", lambda r: str(r[4]), color=lambda r: RED if r[4] == 0 else GREEN, bold=True),
+            Column("CATEGORY", lambda r: str(r[5])),
+            Column("ACTION", lambda r: ""),
+        ], self)
+
+        self.inv_t = QTableView()
+        self.inv_t.setModel(self.inv_model)
         self.inv_t.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.inv_t.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
+        self.inv_t.setColumnWidth(5, 250)
+        self.inv_t.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.inv_t.verticalHeader().setDefaultSectionSize(70)
         self.inv_t.setAlternatingRowColors(True)
         self.inv_t.verticalHeader().setVisible(False)
         self.inv_t.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
@@ -909,15 +1036,16 @@ class ManagerView(QMainWindow):
         self.inv_t.setFrameShape(QFrame.Shape.NoFrame)
         self.inv_t.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.inv_t.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.inv_t.setMouseTracking(True)
         self.inv_t.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #e2e8f0;
                 border-radius: 8px;
                 outline: none;
                 gridline-color: transparent;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border: none;
                 outline: none;
                 padding: 8px;
@@ -930,14 +1058,18 @@ class ManagerView(QMainWindow):
                 font-weight: bold;
                 color: #1e293b;
             }
-            QLabel {
-                border: none;
-                outline: none;
-            }
         """)
 
+        # ACTION BUTTONS: Restock + Delete, painted by a delegate
+        self.inv_actions = ButtonDelegate([
+            ActionButton("restock", "Restock", "#d1fae5", "#065f46", "#a7f3d0", "#a7f3d0", "#064e3b"),
+            ActionButton("delete", "Delete", "#fee2e2", "#b91c1c", "#fecaca", "#fca5a5", "#7f1d1d"),
+        ], self.inv_t)
+        self.inv_actions.clicked.connect(self.on_inventory_action)
+        self.inv_t.setItemDelegateForColumn(5, self.inv_actions)
+
         l.addWidget(self.inv_t)
-        self.tabs.addTab(tab, " 📦 Inventory ")
+        return tab
 
     # ========================================
     # ALSO UPDATE on_add_product_clicked METHOD
@@ -1027,7 +1159,7 @@ class ManagerView(QMainWindow):
         bl.addWidget(br)
         l.addLayout(bl)
 
-        self.tabs.addTab(tab, " 🛠️ Pending Services ")
+        return tab
 
     def init_history_tab(self):
         tab = QWidget()
@@ -1137,30 +1269,44 @@ class ManagerView(QMainWindow):
         page_layout.addWidget(bp)
         l.addLayout(page_layout)
 
-        self.tabs.addTab(tab, " 📜 Completed Services ")
+        return tab
 
     def init_sales_tab(self):
         tab = QWidget()
         l = QVBoxLayout(tab)
         l.setContentsMargins(30, 30, 30, 30)
 
-        self.sal_t = QTableWidget(0, 7)
-        self.sal_t.setHorizontalHeaderLabels(["DATE", "CUSTOMER", "ITEM", "QTY", "TOTAL", "PAYMENT", "BANK"])
+        def or_na(value):
+            return str(value) if value else "N/A"
+
+        self.sal_model = RowTableModel([
+            Column("DATE", lambda r: or_na(r[0])),
+            Column("CUSTOMER", lambda r: or_na(r[1])),
+            Column("ITEM", lambda r: or_na(r[2])),
+            Column("QTY", lambda r: or_na(r[3])),
+            Column("TOTAL", lambda r: f"₱{r[4]:,.2f}"),
+            Column("PAYMENT", lambda r: or_na(r[5])),
+            Column("BANK", lambda r: or_na(r[6])),
+        ], self)
+
+        self.sal_t = QTableView()
+        self.sal_t.setModel(self.sal_model)
         self.sal_t.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.sal_t.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.sal_t.setAlternatingRowColors(True)
         self.sal_t.verticalHeader().setVisible(False)
         self.sal_t.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.sal_t.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.sal_t.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.sal_t.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #e2e8f0;
                 border-radius: 8px;
                 outline: none;
                 gridline-color: transparent;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border: none;
                 outline: none;
                 padding: 8px;
@@ -1197,24 +1343,22 @@ class ManagerView(QMainWindow):
         bl.addWidget(bp)
         l.addLayout(bl)
 
-        self.tabs.addTab(tab, " 💰 Sales Report ")
+        return tab
 
     def prev_page(self):
-        if self.controller.current_history_page > 0:
-            self.controller.current_history_page -= 1
+        if self.controller.prev_history_page():
             self.refresh_history()
 
     def next_page(self):
-        total_pages = self.controller.get_total_history_pages()
-        if self.controller.current_history_page < total_pages - 1:
-            self.controller.current_history_page += 1
+        if self.controller.next_history_page():
             self.refresh_history()
 
     def on_restock_product_clicked(self, pid):
         """Handle restock button click"""
-        # Get product details
-        products = self.controller.get_all_products()
-        product = next((p for p in products if p[0] == pid), None)
+        # Get product details (from the loaded table, falling back to the database)
+        product = self.inv_model.find(lambda p: p[0] == pid)
+        if not product:
+            product = next((p for p in self.controller.get_all_products() if p[0] == pid), None)
 
         if not product:
             QMessageBox.warning(self, "Error", "Product not found")
@@ -1253,9 +1397,9 @@ class ManagerView(QMainWindow):
     def on_export_sales_clicked(self):
         try:
             headers = ["Date", "Customer", "Item", "Qty", "Total", "Payment", "Bank"]
-            data = self.controller.get_all_sales()
             fn, _ = QFileDialog.getSaveFileName(self, "Export", "Sales_Report.pdf", "PDF (*.pdf)")
             if fn:
+                data = self.controller.iter_all_sales()
                 success, msg = self.controller.export_to_pdf("Sales Report", headers, data, fn)
                 if success:
                     QMessageBox.information(self, "Saved", msg)
@@ -1264,25 +1408,36 @@ class ManagerView(QMainWindow):
 
     def on_export_history_clicked(self):
         try:
-            raw_data = self.controller.get_completed_services()
-            formatted_data = [[row[5], row[1], row[2], "Completed", f"₱{row[6]:,.2f}", row[4]] for row in raw_data]
             headers = ["Date Completed", "Customer", "Service", "Status", "Total", "Date Started"]
             fn, _ = QFileDialog.getSaveFileName(self, "Export", "History.pdf", "PDF (*.pdf)")
             if fn:
+                formatted_data = ([row[5], row[1], row[2], "Completed", f"₱{row[6]:,.2f}", row[4]]
+                                  for row in self.controller.iter_completed_services())
                 success, msg = self.controller.export_to_pdf("Service History", headers, formatted_data, fn)
                 if success:
                     QMessageBox.information(self, "Saved", msg)
         except Exception as e:
             QMessageBox.warning(self, "Error", str(e))
 
+    # === DATA LOADING ===
+    # Each refresh_* reads its inputs on the GUI thread, runs the controller call on
+    # the thread pool and fills its widgets in a show_* method once the data arrives.
+    # refresh_all reloads the stats and the visible tab; other tabs reload when shown.
+    @profiled_method
     def refresh_all(self):
         self.refresh_stats()
+        self.pages.refresh_all()
+
+    def refresh_inventory_tab(self):
+        self.refresh_categories()
         self.refresh_inventory()
-        self.refresh_services()
-        self.refresh_history()
-        self.refresh_sales()
 
-        categories = self.controller.get_categories()
+    @profiled_method
+    def refresh_categories(self):
+        self.tasks.submit("categories", self.controller.get_categories, self.show_categories,
+                          lambda e: print("Categories Error:", e))
+
+    def show_categories(self, categories):
         current_text = self.filter_cat.currentText()
         self.filter_cat.blockSignals(True)
         self.filter_cat.clear()
@@ -1291,107 +1446,56 @@ class ManagerView(QMainWindow):
         if current_text in categories or current_text == "All Categories":
             self.filter_cat.setCurrentText(current_text)
         self.filter_cat.blockSignals(False)
+        if self.filter_cat.currentText() != current_text:
+            # The category we filtered by no longer exists
+            self.inventory_search.run()
 
+    @profiled_method
     def refresh_stats(self):
+        self.tasks.submit("stats", lambda: (self.controller.get_stats(), self.controller.get_next_product_code()),
+                          self.show_stats, lambda e: print("Stats Error:", e))
+
+    def show_stats(self, data):
         try:
-            rev, orders, stk, custs = self.controller.get_stats()
+            (rev, orders, stk, custs), next_code = data
             self.l1.setText(f"₱{rev:,.2f}")
             self.l2.setText(str(orders))
             self.l3.setText(str(stk))
             self.l4.setText(str(custs))
-            self.ic.setText(self.controller.get_next_product_code())
+            self.ic.setText(next_code)
         except Exception as e:
             print("Stats Error:", e)
 
-    def refresh_inventory(self):
-        try:
-            category = None if self.filter_cat.currentText() == "All Categories" else self.filter_cat.currentText()
-            search = self.filter_search.text() if self.filter_search.text() else None
-            products = self.controller.get_all_products(category, search)
-            self.inv_t.setRowCount(0)
-
-            for row_data in products:
-                pid, code, name, price, stock, cat, details = row_data
-                r = self.inv_t.rowCount()
-                self.inv_t.insertRow(r)
-                self.inv_t.setRowHeight(r, 70)
-
-                def make_item(text):
-                    it = QTableWidgetItem(str(text))
-                    it.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    return it
-
-                self.inv_t.setItem(r, 0, make_item(code))
-                self.inv_t.setItem(r, 1, make_item(name))
-                self.inv_t.setItem(r, 2, make_item(f"₱{price:,.2f}"))
-
-                st = make_item(str(stock))
-                st.setForeground(QColor("#ef4444") if stock == 0 else QColor("#10b981"))
-                st.setFont(QFont("Segoe UI", 9, QFont.Weight.Bold))
-                self.inv_t.setItem(r, 3, st)
-
-                self.inv_t.setItem(r, 4, make_item(cat))
-
-                # ACTION BUTTONS: Restock + Delete
-                action_widget = QWidget()
-                action_widget.setStyleSheet("background: transparent;")
-                action_layout = QHBoxLayout(action_widget)
-                action_layout.setContentsMargins(5, 0, 5, 0)
-                action_layout.setSpacing(5)
-                action_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-                # Restock button
-                btn_restock = QPushButton("Restock")
-                btn_restock.setFixedSize(110, 34)
-                btn_restock.setCursor(Qt.CursorShape.PointingHandCursor)
-                btn_restock.setStyleSheet("""
-                    QPushButton {
-                        background: #d1fae5;
-                        color: #065f46;
-                        border: 1px solid #a7f3d0;
-                        border-radius: 6px;
-                        font-weight: bold;
-                        font-size: 13px;
-                    }
-                    QPushButton:hover {
-                        background: #a7f3d0;
-                        color: #064e3b;
-                    }
-                """)
-                btn_restock.clicked.connect(lambda _, x=pid: self.on_restock_product_clicked(x))
-                action_layout.addWidget(btn_restock)
+    def inventory_filter(self):
+        category = None if self.filter_cat.currentText() == "All Categories" else self.filter_cat.currentText()
+        return category, self.filter_search.text()
 
-                # Delete button
-                bd = QPushButton("Delete")
-                bd.setFixedSize(110, 34)
-                bd.setCursor(Qt.CursorShape.PointingHandCursor)
-                bd.setStyleSheet("""
-                    QPushButton {
-                        background: #fee2e2;
-                        color: #b91c1c;
-                        border: 1px solid #fecaca;
-                        border-radius: 6px;
-                        font-weight: bold;
-                        font-size: 13px;
-                    }
-                    QPushButton:hover {
-                        background: #fca5a5;
-                        color: #7f1d1d;
-                    }
-                """)
-                bd.clicked.connect(lambda _, x=pid: self.on_delete_product_clicked(x))
-                action_layout.addWidget(bd)
-
-                self.inv_t.setCellWidget(r, 5, action_widget)
+    @profiled_method
+    def refresh_inventory(self):
+        self.inventory_search.run(force=True)
 
+    def show_inventory(self, products):
+        try:
+            self.inv_model.set_rows(products)
         except Exception as e:
             print(f"Inventory Error: {e}")
             import traceback
             traceback.print_exc()
 
+    def on_inventory_action(self, row, action):
+        pid = self.inv_model.row_at(row)[0]
+        if action == "restock":
+            self.on_restock_product_clicked(pid)
+        elif action == "delete":
+            self.on_delete_product_clicked(pid)
+
+    @profiled_method
     def refresh_services(self):
+        self.tasks.submit("services", self.controller.get_all_services, self.show_services,
+                          lambda e: print("Services Error:", e))
+
+    def show_services(self, services):
         try:
-            services = self.controller.get_all_services()
             self.srv_t.setRowCount(0)
 
             for row_data in services:
@@ -1493,39 +1597,32 @@ class ManagerView(QMainWindow):
         except Exception as e:
             print("Services Error:", e)
 
+    @profiled_method
     def refresh_sales(self):
-        try:
-            sales = self.controller.get_all_sales()
-            self.sal_t.setRowCount(0)
-
-            for row_data in sales:
-                date, cust, item, qty, total, payment, bank = row_data
-                r = self.sal_t.rowCount()
-                self.sal_t.insertRow(r)
-
-                def make_item(text):
-                    it = QTableWidgetItem(str(text) if text else "N/A")
-                    it.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    return it
-
-                self.sal_t.setItem(r, 0, make_item(str(date)))
-                self.sal_t.setItem(r, 1, make_item(cust))
-                self.sal_t.setItem(r, 2, make_item(item))
-                self.sal_t.setItem(r, 3, make_item(str(qty)))
-                self.sal_t.setItem(r, 4, make_item(f"₱{total:,.2f}"))
-                self.sal_t.setItem(r, 5, make_item(payment))
-                self.sal_t.setItem(r, 6, make_item(bank if bank else "N/A"))
+        self.tasks.submit("sales", self.controller.get_all_sales, self.show_sales,
+                          lambda e: print("Sales Error:", e))
 
+    def show_sales(self, sales):
+        try:
+            self.sal_model.set_rows(sales)
         except Exception as e:
             print("Sales Error:", e)
 
+    @profiled_method
     def refresh_history(self):
+        # Paging works from the loaded page's cursors, so hold the buttons until it arrives
+        self.btn_prev.setEnabled(False)
+        self.btn_next.setEnabled(False)
+        self.tasks.submit("history", self.controller.fetch_history_page, self.show_history,
+                          lambda e: print("History Error:", e))
+
+    def show_history(self, page):
         try:
-            history = self.controller.get_completed_services(self.controller.current_history_page)
+            history = self.controller.set_history_page(page)
             total_pages = self.controller.get_total_history_pages()
-            self.lbl_page.setText(f"Page {self.controller.current_history_page + 1} of {total_pages}")
-            self.btn_prev.setEnabled(self.controller.current_history_page > 0)
-            self.btn_next.setEnabled(self.controller.current_history_page < total_pages - 1)
+            self.lbl_page.setText(f"Page {self.controller.current_history_page + 1} of ~{total_pages}")
+            self.btn_prev.setEnabled(self.controller.has_prev_history_page())
+            self.btn_next.setEnabled(self.controller.has_next_history_page())
 
             self.hist_t.setRowCount(0)
 
@@ -0,0 +1,96 @@
+import time
+
+from PyQt6.QtCore import QObject, QTimer
+
+from search_index import rank
+
+# LIKE wildcards: a term containing these can't be narrowed with a plain substring match
+_WILDCARDS = ("%", "_", "\\")
+
+
+def matches(product, term):
+    """Same test as database.get_products: term in name or code, case-insensitive"""
+    term = term.casefold()
+    return term in str(product[2]).casefold() or term in str(product[1]).casefold()
+
+
+def narrow(rows, category, term):
+    """Filters rows like database.search_products and orders them by search_index.rank"""
+    rows = [r for r in rows if (category is None or r[5] == category) and (not term or matches(r, term))]
+    if term:
+        term = term.casefold()
+        rows.sort(key=lambda r: rank(term, r[1], r[2]))
+    return rows
+
+
+class ProductSearch(QObject):
+    """
+    Debounced search for a product table with a category filter and a search box.
+    - schedule(): call on every keystroke; the query runs once typing pauses
+    - run(): search now (category change), run(force=True) also skips the in-memory path
+    The last rows loaded from the database are kept with their (category, term).
+    A new search that only narrows that result (same or no base category, and a
+    term that contains the base term) is filtered in memory instead of queried,
+    unless nothing matches: then the query runs for its typo-tolerant matches.
+    Loaded rows older than max_age seconds are not reused, so stock levels
+    changed by other tills still show up while searching.
+    A query that is still running when a newer search starts is superseded.
+    """
+
+    def __init__(self, tasks, key, fetch, params, on_rows, on_error=None, delay_ms=250,
+                 max_age=30.0, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.key = key
+        self.fetch = fetch  # fetch(category, term) -> rows, runs on the thread pool
+        self.params = params  # params() -> (category or None, term), read on the GUI thread
+        self.on_rows = on_rows
+        self.on_error = on_error
+        self.max_age = max_age
+        self._base = None  # (category, term, rows, loaded_at)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.run)
+
+        self.queries = 0
+        self.narrowed = 0
+
+    def schedule(self, *_):
+        self.timer.start()
+
+    def run(self, *_, force=False):
+        self.timer.stop()
+        category, term = self.params()
+        term = (term or "").strip()
+
+        rows = None if force else self._narrow(category, term)
+        if rows is not None:
+            self.tasks.cancel(self.key)
+            self.narrowed += 1
+            self.on_rows(rows)
+            return
+
+        self.queries += 1
+        self.tasks.submit(
+            self.key,
+            lambda: self.fetch(category, term or None),
+            lambda result: self._loaded(category, term, result),
+            self.on_error)
+
+    def _loaded(self, category, term, rows):
+        self._base = (category, term, list(rows), time.monotonic())
+        self.on_rows(rows)
+
+    def _narrow(self, category, term):
+        if self._base is None:
+            return None
+        base_category, base_term, rows, loaded_at = self._base
+        if time.monotonic() - loaded_at > self.max_age:
+            return None
+        if base_category is not None and base_category != category:
+            return None
+        if base_term.casefold() not in term.casefold() or any(w in term for w in _WILDCARDS):
+            return None
+        return narrow(rows, category, term) or None
@@ -0,0 +1,223 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QSpinBox
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRectF, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPen, QPainter
+
+# Shared paint resources: created once, not per row
+BOLD_FONT = QFont("Segoe UI", 9, QFont.Weight.Bold)
+BUTTON_FONT = QFont("Segoe UI", 10, QFont.Weight.Bold)
+GREEN = QColor("#10b981")
+RED = QColor("#ef4444")
+MUTED = QColor("#94a3b8")
+CENTER = Qt.AlignmentFlag.AlignCenter
+
+
+class Column:
+    """
+    Describes one table column.
+    - text(row): display text
+    - color(row): optional QColor for the text
+    - bold: draw the text with BOLD_FONT
+    - editable(row): optional, makes the cell editable (see RowTableModel.edits)
+    """
+
+    def __init__(self, header, text, color=None, bold=False, editable=None):
+        self.header = header
+        self.text = text
+        self.color = color
+        self.bold = bold
+        self.editable = editable
+
+
+class RowTableModel(QAbstractTableModel):
+    """
+    Table model over a list of row tuples. Views only ask for the cells they
+    draw, so a reload is one beginResetModel/endResetModel no matter how many
+    rows there are.
+    Editable cells keep their values in self.edits, keyed by (key(row), column).
+    """
+
+    def __init__(self, columns, parent=None, key=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.key = key or (lambda row: row[0])
+        self.rows = []
+        self.edits = {}
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.edits = {}
+        self.endResetModel()
+
+    def row_at(self, index):
+        return self.rows[index]
+
+    def find(self, predicate):
+        return next((row for row in self.rows if predicate(row)), None)
+
+    def edit_value(self, row, column, default=None):
+        return self.edits.get((self.key(row), column), default)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section].header
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled
+        column = self.columns[index.column()]
+        if column.editable and column.editable(self.rows[index.row()]):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = self.columns[index.column()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(self.edit_value(row, index.column(), column.text(row)))
+        if role == Qt.ItemDataRole.EditRole:
+            return self.edit_value(row, index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return CENTER
+        if role == Qt.ItemDataRole.ForegroundRole and column.color:
+            return column.color(row)
+        if role == Qt.ItemDataRole.FontRole and column.bold:
+            return BOLD_FONT
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        self.edits[(self.key(self.rows[index.row()]), index.column())] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+
+class ActionButton:
+    """A button painted by ButtonDelegate; visible(row) hides it for some rows"""
+
+    def __init__(self, action, label, background, color, border, hover_background, hover_color,
+                 width=110, height=34, visible=None):
+        self.action = action
+        self.label = label
+        self.background = QColor(background)
+        self.color = QColor(color)
+        self.border = QColor(border)
+        self.hover_background = QColor(hover_background)
+        self.hover_color = QColor(hover_color)
+        self.width = width
+        self.height = height
+        self.visible = visible
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paints one or more buttons inside a cell instead of creating real
+    QPushButton widgets per row, and emits clicked(row, action).
+    The view needs setMouseTracking(True) for the hover colors.
+    """
+    clicked = pyqtSignal(int, str)
+
+    def __init__(self, buttons, parent=None, spacing=5, empty_text=None):
+        super().__init__(parent)
+        self.buttons = buttons
+        self.spacing = spacing
+        self.empty_text = empty_text
+        self._hover = None  # (row, action)
+
+    def _visible_buttons(self, index):
+        row = index.model().row_at(index.row())
+        return [b for b in self.buttons if b.visible is None or b.visible(row)]
+
+    def _button_rects(self, rect, buttons):
+        total = sum(b.width for b in buttons) + self.spacing * max(0, len(buttons) - 1)
+        x = rect.x() + (rect.width() - total) / 2
+        rects = []
+        for b in buttons:
+            y = rect.y() + (rect.height() - b.height) / 2
+            rects.append((b, QRectF(x, y, b.width, b.height)))
+            x += b.width + self.spacing
+        return rects
+
+    def paint(self, painter, option, index):
+        # Background (alternating rows) without any text
+        self.initStyleOption(option, index)
+        option.text = ""
+        style = option.widget.style() if option.widget else None
+        if style:
+            style.drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        buttons = self._visible_buttons(index)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if not buttons and self.empty_text:
+            painter.setPen(MUTED)
+            painter.drawText(QRectF(option.rect), CENTER, self.empty_text)
+        painter.setFont(BUTTON_FONT)
+        for b, r in self._button_rects(option.rect, buttons):
+            hovered = self._hover == (index.row(), b.action)
+            painter.setPen(QPen(b.border, 1))
+            painter.setBrush(b.hover_background if hovered else b.background)
+            painter.drawRoundedRect(r.adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+            painter.setPen(b.hover_color if hovered else b.color)
+            painter.drawText(r, CENTER, b.label)
+        painter.restore()
+
+    def _hit(self, option, index, pos):
+        for b, r in self._button_rects(option.rect, self._visible_buttons(index)):
+            if r.contains(pos.toPointF()):
+                return b
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseMove:
+            b = self._hit(option, index, event.position().toPoint())
+            hover = (index.row(), b.action) if b else None
+            if hover != self._hover:
+                self._hover = hover
+                if option.widget:
+                    option.widget.viewport().update()
+            return False
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            b = self._hit(option, index, event.position().toPoint())
+            if b:
+                self.clicked.emit(index.row(), b.action)
+                return True
+        return False
+
+
+class SpinBoxDelegate(QStyledItemDelegate):
+    """Edits an integer cell with a QSpinBox; maximum(row) bounds the value"""
+
+    def __init__(self, maximum, parent=None, stylesheet=""):
+        super().__init__(parent)
+        self.maximum = maximum
+        self.stylesheet = stylesheet
+
+    def createEditor(self, parent, option, index):
+        spin = QSpinBox(parent)
+        spin.setRange(0, self.maximum(index.model().row_at(index.row())))
+        spin.setAlignment(CENTER)
+        if self.stylesheet:
+            spin.setStyleSheet(self.stylesheet)
+        return spin
+
+    def setEditorData(self, editor, index):
+        editor.setValue(int(index.data(Qt.ItemDataRole.EditRole) or 0))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.ItemDataRole.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        r = option.rect
+        editor.setGeometry(r.x() + (r.width() - 70) // 2, r.y() + (r.height() - 34) // 2, 70, 34)
@@ -3,12 +3,19 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QTabWidget,
     QFrame, QDateEdit, QTextEdit, QComboBox, QAbstractItemView, QDialog,
-    QSpinBox, QLineEdit, QRadioButton, QButtonGroup, QGridLayout
+    QLineEdit, QRadioButton, QButtonGroup, QGridLayout, QTableView
 )
 from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QColor, QFont, QCursor
+from PyQt6.QtGui import QFont, QCursor
 
 from controllers.user_controller import UserController
+from views.workers import TaskRunner
+from views.lazy_tabs import LazyTabs
+from profiling import profiled_method
+from views.search import ProductSearch
+from views.table_models import (
+    RowTableModel, Column, ActionButton, ButtonDelegate, SpinBoxDelegate, GREEN, RED, MUTED
+)
 
 
 # === BANK DETAILS DIALOG ===
@@ -433,9 +440,14 @@ class ReceiptWindow(QDialog):
 
 # === MAIN USER WINDOW ===
 class UserView(QMainWindow):
+    @profiled_method
     def __init__(self, user_id, username, full_name):
         super().__init__()
         self.controller = UserController(self, user_id, username, full_name)
+        self.tasks = TaskRunner(self)
+        self.shop_search_pipeline = ProductSearch(
+            self.tasks, "shop", self.controller.get_all_products, self.shop_filter,
+            self.show_shop, lambda e: print(f"Error in refresh_shop: {e}"), parent=self)
 
         self.setWindowTitle("Customer Window")
         self.resize(1200, 800)
@@ -533,11 +545,15 @@ class UserView(QMainWindow):
         """)
         layout.addWidget(self.tabs)
 
-        self.init_shop_tab()
-        self.init_cart_tab()
-        self.init_orders_tab()
-        self.init_booking_tab()
-        self.init_my_bookings_tab()
+        # Tabs are built and loaded the first time they are shown
+        self.pages = LazyTabs(self.tabs, self)
+        self.pages.add("shop", "  🛒 Shop Products  ", self.init_shop_tab, self.refresh_shop)
+        self.pages.add("cart", "  🛍️ My Cart  ", self.init_cart_tab, self.refresh_cart)
+        self.pages.add("orders", "  📦 My Orders  ", self.init_orders_tab, self.refresh_orders)
+        self.pages.add("booking", "  📅 Request Service  ", self.init_booking_tab)
+        self.pages.add("my_bookings", "  📂 My Bookings  ", self.init_my_bookings_tab, self.refresh_my_bookings)
+        self.pages.build_current()
+        self.pages.refresh_all()
 
     def on_logout_clicked(self):
         from views.login_view import LoginView
@@ -545,6 +561,11 @@ class UserView(QMainWindow):
         self.login_window.show()
         self.close()
 
+    def closeEvent(self, event):
+        self.tasks.cancel_all()
+        self.controller.logout()  # give the cart's reserved stock back
+        super().closeEvent(event)
+
     # === SHOP TAB ===
     def init_shop_tab(self):
         tab = QWidget()
@@ -580,7 +601,7 @@ class UserView(QMainWindow):
                 outline: none;
             }
         """)
-        self.shop_cat_filter.currentTextChanged.connect(self.refresh_shop)
+        self.shop_cat_filter.currentTextChanged.connect(self.shop_search_pipeline.run)
         filter_bar.addWidget(self.shop_cat_filter)
 
         self.shop_search = QLineEdit()
@@ -600,36 +621,55 @@ class UserView(QMainWindow):
                 outline: none;
             }
         """)
-        self.shop_search.textChanged.connect(self.refresh_shop)
+        self.shop_search.textChanged.connect(self.shop_search_pipeline.schedule)
         filter_bar.addWidget(self.shop_search)
 
         filter_bar.addStretch()
         layout.addLayout(filter_bar)
 
-        self.shop_table = QTableWidget(0, 6)
-        self.shop_table.setHorizontalHeaderLabels(["CODE", "NAME", "PRICE", "STOCK", "CATEGORY", "QTY"])
+        self.shop_model = RowTableModel([
+            Column("CODE", lambda r: str(r[1])),
+            Column("NAME", lambda r: str(r[2])),
+            Column("PRICE", lambda r: f"₱{r[3]:,.2f}"),
+            Column("STOCK", lambda r: f"{r[4]} available" if r[4] > 0 else "OUT OF STOCK",
+                   color=lambda r: GREEN if r[4] > 0 else RED, bold=True),
+            Column("CATEGORY", lambda r: str(r[5])),
+            Column("QTY", lambda r: "0" if r[4] > 0 else "N/A",
+                   color=lambda r: None if r[4] > 0 else MUTED, bold=True,
+                   editable=lambda r: r[4] > 0),
+            Column("", lambda r: ""),
+        ], self)
+
+        self.shop_table = QTableView()
+        self.shop_table.setModel(self.shop_model)
 
         header = self.shop_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
-        self.shop_table.setColumnWidth(5, 200)
+        header.setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)
+        self.shop_table.setColumnWidth(5, 90)
+        self.shop_table.setColumnWidth(6, 130)
+        self.shop_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.shop_table.verticalHeader().setDefaultSectionSize(60)
 
         self.shop_table.setAlternatingRowColors(True)
         self.shop_table.verticalHeader().setVisible(False)
-        self.shop_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.shop_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.CurrentChanged | QAbstractItemView.EditTrigger.DoubleClicked)
+        self.shop_table.setMouseTracking(True)
         self.shop_table.setShowGrid(False)
         self.shop_table.setFrameShape(QFrame.Shape.NoFrame)
         self.shop_table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.shop_table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.shop_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #e2e8f0;
                 border-radius: 8px;
                 outline: none;
                 gridline-color: transparent;
                 background-color: white;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border: none;
                 outline: none;
                 padding: 8px;
@@ -647,6 +687,32 @@ class UserView(QMainWindow):
                 outline: none;
             }
         """)
+
+        # QTY: spin box editor, only created for the cell being edited
+        self.shop_qty = SpinBoxDelegate(lambda r: r[4], self.shop_table, """
+            QSpinBox {
+                background: white;
+                border: 1px solid #cbd5e1;
+                border-radius: 5px;
+                padding: 4px;
+                color: #334155;
+                font-weight: bold;
+                font-size: 13px;
+            }
+            QSpinBox:focus {
+                border: 2px solid #009688;
+            }
+        """)
+        self.shop_table.setItemDelegateForColumn(5, self.shop_qty)
+
+        # ADD BUTTON: painted by a delegate, hidden for out-of-stock rows
+        self.shop_actions = ButtonDelegate([
+            ActionButton("add", "➕ Add to Cart", "#009688", "white", "#009688", "#00796b", "white",
+                         visible=lambda r: r[4] > 0),
+        ], self.shop_table)
+        self.shop_actions.clicked.connect(self.on_shop_action)
+        self.shop_table.setItemDelegateForColumn(6, self.shop_actions)
+
         layout.addWidget(self.shop_table)
 
         btn = QPushButton("🔁 Refresh")
@@ -670,13 +736,7 @@ class UserView(QMainWindow):
         bl.addWidget(btn)
         layout.addLayout(bl)
 
-        self.tabs.addTab(tab, "  🛒 Shop Products  ")
-
-        # Load initial data
-        try:
-            self.refresh_shop()
-        except Exception as e:
-            print(f"Error loading shop: {e}")
+        return tab
 
     # === CART TAB ===
     def init_cart_tab(self):
@@ -763,7 +823,7 @@ class UserView(QMainWindow):
         bottom_box.addWidget(btn_checkout)
 
         layout.addLayout(bottom_box)
-        self.tabs.addTab(tab, "  🛍️ My Cart  ")
+        return tab
 
     # === ORDERS TAB ===
     def init_orders_tab(self):
@@ -772,8 +832,8 @@ class UserView(QMainWindow):
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(20)
 
-        self.orders_table = QTableWidget(0, 5)
-        self.orders_table.setHorizontalHeaderLabels(["DATE", "PRODUCT", "QTY", "TOTAL", "PAYMENT"])
+        self.orders_table = QTableWidget(0, 6)
+        self.orders_table.setHorizontalHeaderLabels(["DATE", "ORDER #", "ITEMS", "TOTAL", "PAYMENT", "ACTION"])
         self.orders_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.orders_table.verticalHeader().setVisible(False)
         self.orders_table.setAlternatingRowColors(True)
@@ -827,8 +887,7 @@ class UserView(QMainWindow):
         bl.addWidget(btn)
         layout.addLayout(bl)
 
-        self.tabs.addTab(tab, "  📦 My Orders  ")
-        self.refresh_orders()
+        return tab
 
     # === BOOKING TAB ===
     def init_booking_tab(self):
@@ -940,7 +999,7 @@ class UserView(QMainWindow):
         cl.addWidget(btn)
 
         layout.addWidget(card)
-        self.tabs.addTab(tab, "  📅 Request Service  ")
+        return tab
 
     # === MY BOOKINGS TAB ===
     def init_my_bookings_tab(self):
@@ -1004,132 +1063,76 @@ class UserView(QMainWindow):
         bl.addWidget(btn)
         layout.addLayout(bl)
 
-        self.tabs.addTab(tab, "  📂 My Bookings  ")
-        self.refresh_my_bookings()
+        return tab
 
     # === ACTIONS ===
+    # Data for the shop, orders and bookings tables is loaded on the thread pool;
+    # refresh_* starts the load and show_* fills the table when the rows arrive.
+    def shop_filter(self):
+        current = self.shop_cat_filter.currentText()
+        return (None if current == "All Categories" else current), self.shop_search.text()
+
+    @profiled_method
     def refresh_shop(self):
+        """Reloads the category list and the product table (searching only reloads products)"""
+        self.tasks.submit("shop_categories", self.controller.get_categories, self.show_shop_categories,
+                          lambda e: print(f"Error in refresh_shop: {e}"))
+        self.shop_search_pipeline.run(force=True)
+
+    def show_shop_categories(self, categories):
+        current = self.shop_cat_filter.currentText()
+
+        # Temporarily block signals
+        self.shop_cat_filter.blockSignals(True)
+        self.shop_cat_filter.clear()
+        self.shop_cat_filter.addItem("All Categories")
+        self.shop_cat_filter.addItems(categories)
+        if current in categories or current == "All Categories":
+            self.shop_cat_filter.setCurrentText(current)
+        self.shop_cat_filter.blockSignals(False)
+
+        if self.shop_cat_filter.currentText() != current:
+            # The category we filtered by no longer exists; reload with the reset filter
+            self.shop_search_pipeline.run()
+
+    def show_shop(self, products):
         try:
-            self.shop_table.setRowCount(0)
-
-            # Update category filter safely
-            categories = self.controller.get_categories()
-            current = self.shop_cat_filter.currentText()
-
-            # Temporarily block signals
-            self.shop_cat_filter.blockSignals(True)
-            self.shop_cat_filter.clear()
-            self.shop_cat_filter.addItem("All Categories")
-            self.shop_cat_filter.addItems(categories)
-            if current in categories or current == "All Categories":
-                self.shop_cat_filter.setCurrentText(current)
-            self.shop_cat_filter.blockSignals(False)
-
-            category = None if self.shop_cat_filter.currentText() == "All Categories" else self.shop_cat_filter.currentText()
-            search = self.shop_search.text() if self.shop_search.text() else None
-
-            products = self.controller.get_all_products(category, search)
-
-            for row_data in products:
-                pid, code, name, price, stock, cat, details = row_data
-                r = self.shop_table.rowCount()
-                self.shop_table.insertRow(r)
-                self.shop_table.setRowHeight(r, 60)
-
-                def make_item(val):
-                    i = QTableWidgetItem(str(val))
-                    i.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    return i
-
-                self.shop_table.setItem(r, 0, make_item(code))
-                self.shop_table.setItem(r, 1, make_item(name))
-                self.shop_table.setItem(r, 2, make_item(f"₱{price:,.2f}"))
-
-                s_text = f"{stock} available" if stock > 0 else "OUT OF STOCK"
-                s_color = QColor("#10b981") if stock > 0 else QColor("#ef4444")
-                s_item = QTableWidgetItem(s_text)
-                s_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                s_item.setForeground(s_color)
-                s_item.setFont(QFont("Segoe UI", 9, QFont.Weight.Bold))
-                self.shop_table.setItem(r, 3, s_item)
-
-                self.shop_table.setItem(r, 4, make_item(cat))
-
-                # QTY + ADD BUTTON
-                if stock > 0:
-                    qty_widget = QWidget()
-                    qty_widget.setStyleSheet("background: transparent;")
-                    qty_layout = QHBoxLayout(qty_widget)
-                    qty_layout.setContentsMargins(5, 3, 5, 3)
-                    qty_layout.setSpacing(8)
-                    qty_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-                    spin = QSpinBox()
-                    spin.setRange(0, stock)
-                    spin.setValue(0)
-                    spin.setFixedWidth(60)
-                    spin.setFixedHeight(34)
-                    spin.setStyleSheet("""
-                        QSpinBox {
-                            background: white;
-                            border: 1px solid #cbd5e1;
-                            border-radius: 5px;
-                            padding: 4px;
-                            color: #334155;
-                            font-weight: bold;
-                            font-size: 13px;
-                        }
-                        QSpinBox:focus {
-                            border: 2px solid #009688;
-                        }
-                    """)
-
-                    btn_add = QPushButton("➕ Add to Cart")
-                    btn_add.setFixedWidth(110)
-                    btn_add.setFixedHeight(34)
-                    btn_add.setCursor(Qt.CursorShape.PointingHandCursor)
-                    btn_add.setStyleSheet("""
-                        QPushButton {
-                            background: #009688;
-                            color: white;
-                            border: none;
-                            border-radius: 5px;
-                            font-weight: 700;
-                            font-size: 11px;
-                            padding: 4px 6px;
-                        }
-                        QPushButton:hover { background: #00796b; }
-                    """)
-                    btn_add.clicked.connect(
-                        lambda _, c=code, n=name, p=price, s=stock, sp=spin: self.add_to_cart_inline(c, n, p, s, sp))
-
-                    qty_layout.addWidget(spin)
-                    qty_layout.addWidget(btn_add)
-                    self.shop_table.setCellWidget(r, 5, qty_widget)
-                else:
-                    label = QLabel("N/A")
-                    label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    label.setStyleSheet("color: #94a3b8; background: transparent; border: none;")
-                    self.shop_table.setCellWidget(r, 5, label)
+            self.shop_model.set_rows(products)
         except Exception as e:
-            print(f"Error in refresh_shop: {e}")
+            print(f"Error in show_shop: {e}")
             import traceback
             traceback.print_exc()
 
-    def add_to_cart_inline(self, code, name, price, max_stock, spinner):
-        qty = spinner.value()
+    def on_shop_action(self, row, action):
+        if action == "add":
+            self.add_to_cart_inline(row)
+
+    def add_to_cart_inline(self, row):
+        # Commit a spin box that is still open so its value is counted
+        editor_index = self.shop_table.currentIndex()
+        if editor_index.isValid():
+            editor = self.shop_table.indexWidget(editor_index)
+            if editor:
+                self.shop_table.commitData(editor)
+
+        product = self.shop_model.row_at(row)
+        pid, code, name, price, stock, cat, details = product
+        qty = self.shop_model.edit_value(product, 5, 0)
         if qty <= 0:
             QMessageBox.warning(self, "Invalid", "Please select a quantity")
             return
 
-        success, msg = self.controller.add_to_cart(code, name, price, max_stock, qty)
+        success, msg = self.controller.add_to_cart(code, name, price, qty)
         if success:
-            spinner.setValue(0)
-            self.refresh_cart()
+            self.shop_model.setData(self.shop_model.index(row, 5), 0)
+            self.pages.refresh("cart")
+            self.pages.refresh("shop")  # available stock went down
             QMessageBox.information(self, "Cart", msg)
         else:
+            self.pages.refresh("shop")  # what it showed was out of date
             QMessageBox.warning(self, "Error", msg)
 
+    @profiled_method
     def refresh_cart(self):
         self.cart_table.setRowCount(0)
         cart_items = self.controller.get_cart_items()
@@ -1182,10 +1185,12 @@ class UserView(QMainWindow):
     def remove_from_cart(self, code):
         self.controller.remove_from_cart(code)
         self.refresh_cart()
+        self.pages.refresh("shop")
 
     def on_clear_cart_clicked(self):
         self.controller.clear_cart()
         self.refresh_cart()
+        self.pages.refresh("shop")
 
     def on_checkout_clicked(self):
         if not self.controller.get_cart_items():
@@ -1203,17 +1208,21 @@ class UserView(QMainWindow):
                 receipt_dlg = ReceiptWindow(self, receipt_text)
                 receipt_dlg.exec()
                 self.refresh_cart()
-                self.refresh_shop()
-                self.refresh_orders()
+                self.pages.refresh("shop")
+                self.pages.refresh("orders")
             else:
                 QMessageBox.critical(self, "Error", msg)
 
+    @profiled_method
     def refresh_orders(self):
+        self.tasks.submit("orders", self.controller.get_orders, self.show_orders,
+                          lambda e: print("Orders Error:", e))
+
+    def show_orders(self, orders):
         self.orders_table.setRowCount(0)
-        sales = self.controller.get_order_history()
 
-        for row in sales:
-            d, prod_name, qty, sub, payment = row
+        for row in orders:
+            order_id, d, _, item_count, units, total, payment = row
             r = self.orders_table.rowCount()
             self.orders_table.insertRow(r)
             self.orders_table.setRowHeight(r, 50)
@@ -1224,11 +1233,42 @@ class UserView(QMainWindow):
                 return i
 
             self.orders_table.setItem(r, 0, make_item(str(d)))
-            self.orders_table.setItem(r, 1, make_item(prod_name))
-            self.orders_table.setItem(r, 2, make_item(str(qty)))
-            self.orders_table.setItem(r, 3, make_item(f"₱{sub:,.2f}"))
+            self.orders_table.setItem(r, 1, make_item(f"#{order_id}"))
+            self.orders_table.setItem(r, 2, make_item(f"{item_count} ({units} pcs)"))
+            self.orders_table.setItem(r, 3, make_item(f"₱{total:,.2f}"))
             self.orders_table.setItem(r, 4, make_item(payment))
 
+            btn = QPushButton("Reprint")
+            btn.setFixedSize(90, 34)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background: white;
+                    border: 1px solid #cbd5e1;
+                    color: #475569;
+                    border-radius: 6px;
+                    font-weight: bold;
+                    font-size: 13px;
+                }
+                QPushButton:hover { background: #f1f5f9; }
+            """)
+            btn.clicked.connect(lambda _, x=order_id: self.on_reprint_receipt_clicked(x))
+
+            w = QWidget()
+            w.setStyleSheet("background: transparent;")
+            wl = QHBoxLayout(w)
+            wl.setContentsMargins(0, 0, 0, 0)
+            wl.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            wl.addWidget(btn)
+            self.orders_table.setCellWidget(r, 5, w)
+
+    def on_reprint_receipt_clicked(self, order_id):
+        success, msg, receipt_text = self.controller.reprint_receipt(order_id)
+        if success:
+            ReceiptWindow(self, receipt_text).exec()
+        else:
+            QMessageBox.critical(self, "Error", msg)
+
     def on_submit_booking_clicked(self):
         service_type = self.service_combo.currentText()
         pref_date = self.bk_date.date().toString("yyyy-MM-dd")
@@ -1243,13 +1283,17 @@ class UserView(QMainWindow):
         if success:
             QMessageBox.information(self, "Success", msg)
             self.bk_detail.clear()
-            self.refresh_my_bookings()
+            self.pages.refresh("my_bookings")
         else:
             QMessageBox.critical(self, "Error", msg)
 
+    @profiled_method
     def refresh_my_bookings(self):
+        self.tasks.submit("bookings", self.controller.get_my_bookings, self.show_my_bookings,
+                          lambda e: print("Bookings Error:", e))
+
+    def show_my_bookings(self, rows):
         self.bookings_table.setRowCount(0)
-        rows = self.controller.get_my_bookings()
 
         for row in rows:
             sid, submitted_date, svc_type, raw_desc, status, price = row
@@ -0,0 +1,114 @@
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+import database
+import metrics
+import profiling
+
+
+class WorkerSignals(QObject):
+    """Signals emitted from the worker thread; delivered to the GUI thread by Qt"""
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, object)
+
+
+class Worker(QRunnable):
+    """Runs one callable on a QThreadPool thread and reports the result through signals"""
+
+    def __init__(self, key, generation, fn, source=None):
+        super().__init__()
+        self.key = key
+        self.source = source or key
+        self.submitted = time.perf_counter()
+        self.generation = generation
+        self.fn = fn
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            # Database timings are attributed to the screen and task that asked for them
+            with database.db_stats.source(self.source), profiling.profiled(f"{self.source}.load"):
+                result = self.fn()
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, e)
+        else:
+            self.signals.finished.emit(self.key, self.generation, result)
+
+
+class TaskRunner(QObject):
+    """
+    Runs controller/database calls in the background and hands the results back
+    on the GUI thread.
+    Each task has a key (e.g. "inventory"); submitting a new task with the same
+    key supersedes the old one: if it has not started it is dropped from the
+    queue, and if it is already running its result is ignored.
+    """
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._generations = {}
+        self._workers = {}  # key -> (worker, on_done, on_error)
+
+    def submit(self, key, fn, on_done, on_error=None):
+        """Queues fn() on the pool; on_done(result) / on_error(exc) run on the GUI thread"""
+        self.cancel(key)
+        generation = self._generations.get(key, 0)
+
+        parent = self.parent()
+        source = f"{type(parent).__name__}.{key}" if parent is not None else key
+        worker = Worker(key, generation, fn, source)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        self._workers[key] = (worker, on_done, on_error)
+        self.pool.start(worker)
+        return generation
+
+    def cancel(self, key):
+        """Supersedes any outstanding task for key"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        entry = self._workers.pop(key, None)
+        if entry is not None:
+            try:
+                self.pool.tryTake(entry[0])
+            except RuntimeError:
+                pass  # already finished and deleted by the pool
+
+    def cancel_all(self):
+        for key in list(self._workers):
+            self.cancel(key)
+
+    def is_busy(self, key):
+        return key in self._workers
+
+    def is_idle(self):
+        """True when no task is queued or running"""
+        return not self._workers
+
+    def _take(self, key, generation):
+        if generation != self._generations.get(key):
+            return None
+        return self._workers.pop(key, None)
+
+    @pyqtSlot(str, int, object)
+    def _on_finished(self, key, generation, result):
+        entry = self._take(key, generation)
+        if entry is not None:
+            if profiling.enabled:
+                with profiling.profiled(f"{entry[0].source}.show"):
+                    entry[1](result)
+            else:
+                entry[1](result)
+            if metrics.enabled:
+                metrics.record_refresh(entry[0].source, time.perf_counter() - entry[0].submitted)
+
+    @pyqtSlot(str, int, object)
+    def _on_failed(self, key, generation, error):
+        entry = self._take(key, generation)
+        if entry is None:
+            return
+        if entry[2] is not None:
+            entry[2](error)
+        else:
+            print(f"{key} load error:", error)